@@ -0,0 +1,184 @@
+import argparse
+import sqlite3
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from progression import FAILED, get_rules
+from snapshots import load_changes, record_snapshot, snapshot_recorded
+from tenants import current_data_version, get_tenants, load_tenant_data, select_tenant
+
+# Headless alert job - run from cron (e.g. every 15 minutes):
+#   python alerts.py --all
+# Each run snapshots the current data version and queues an alert for every
+# student who newly breached a threshold since the last run. A mail relay
+# picks up unsent rows from the outbox table.
+# The workbook is only reread when its data version (workbook modification
+# time, journal version and rules) hasn't been recorded yet. A new version is
+# a full reread and a diff of every student against the latest snapshot;
+# otherwise a run only reads the deltas recorded since the last one.
+
+# College attendance requirement (the "Good" band in the app)
+ATTENDANCE_THRESHOLD = 80
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    tenant TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    student_id TEXT NOT NULL,
+    recipients TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    sent_at TEXT
+);
+CREATE INDEX IF NOT EXISTS outbox_unsent ON outbox (sent_at, id);
+CREATE TABLE IF NOT EXISTS progress (
+    tenant TEXT PRIMARY KEY,
+    snapshot_id INTEGER NOT NULL
+);
+"""
+
+
+def _connect(path):
+    """Open the alert outbox, creating the tables if needed"""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def newly_failed(status_deltas):
+    """Student and assessment pairs that are Failed at the end of a window of deltas but weren't before it"""
+    keys = ['student_id', 'assessment']
+    first = status_deltas.drop_duplicates(keys, keep='first')[keys + ['prev_status']]
+    last = status_deltas.drop_duplicates(keys, keep='last')[keys + ['status', 'score']]
+    window = first.merge(last, on=keys)
+    return window[(window['status'] == FAILED) & (window['prev_status'] != FAILED)]
+
+
+def newly_low_attendance(attendance_deltas, threshold=ATTENDANCE_THRESHOLD):
+    """Students whose attendance is below the threshold at the end of a window of deltas but wasn't before it"""
+    first = attendance_deltas.drop_duplicates('student_id', keep='first')[['student_id', 'prev_attendance']]
+    last = attendance_deltas.drop_duplicates('student_id', keep='last')[['student_id', 'attendance']]
+    window = first.merge(last, on='student_id')
+    return window[(window['attendance'] < threshold) & ~(window['prev_attendance'] < threshold)]
+
+
+def build_alerts(tenant, failed, low_attendance, students):
+    """Outbox messages for new breaches, with each student's name and course"""
+    names = students.set_index('StudentID')['Name'].to_dict()
+    courses = students.set_index('StudentID')['Course'].to_dict()
+    college = tenant['short_name']
+
+    alerts = []
+    for student_id, assessment, score in zip(failed['student_id'], failed['assessment'], failed['score']):
+        name = names.get(student_id, student_id)
+        score_text = f" with a score of {score:g}" if pd.notna(score) else ""
+        alerts.append((
+            'failed_test', student_id,
+            f"[{college}] {name} failed {assessment}",
+            f"{name} ({student_id}, {courses.get(student_id, 'unknown course')}) failed {assessment}{score_text}. "
+            f"The assessment needs to be retaken."
+        ))
+    for student_id, attendance in zip(low_attendance['student_id'], low_attendance['attendance']):
+        name = names.get(student_id, student_id)
+        alerts.append((
+            'attendance', student_id,
+            f"[{college}] {name} attendance below {ATTENDANCE_THRESHOLD}%",
+            f"{name} ({student_id}, {courses.get(student_id, 'unknown course')}) attendance is now {attendance:g}%, "
+            f"below the {ATTENDANCE_THRESHOLD}% college requirement."
+        ))
+    return alerts
+
+
+def run_alerts(tenant, include_existing=False):
+    """Snapshot the tenant's current data and queue alerts for breaches since the last run
+
+    On the first run nothing is queued unless include_existing is set - the
+    current state becomes the baseline. Returns the number of alerts queued.
+    """
+    rules = get_rules(tenant['rules'])
+    df = None
+    if not snapshot_recorded(current_data_version(tenant, rules), tenant['snapshots']):
+        df, data_version = load_tenant_data(tenant, rules)
+        record_snapshot(df, data_version, tenant['snapshots'], rules=rules)
+
+    conn = _connect(tenant['alerts'])
+    try:
+        row = conn.execute("SELECT snapshot_id FROM progress WHERE tenant = ?", (tenant['id'],)).fetchone()
+        since = row[0] if row else 0
+        status_deltas, attendance_deltas, latest = load_changes(since, tenant['snapshots'])
+
+        if latest == since:
+            return 0
+
+        failed, low_attendance = newly_failed(status_deltas), newly_low_attendance(attendance_deltas)
+        if (row is None and not include_existing) or (failed.empty and low_attendance.empty):
+            alerts = []
+        else:
+            # Names and courses for the messages - only read here if this run didn't already load the data
+            if df is None:
+                df = load_tenant_data(tenant, rules)[0]
+            alerts = build_alerts(tenant, failed, low_attendance, df)
+
+        created_at = datetime.now().isoformat(timespec='seconds')
+        recipients = ", ".join(tenant['alert_recipients'])
+        with conn:
+            conn.executemany(
+                """
+                INSERT INTO outbox (created_at, tenant, kind, student_id, recipients, subject, body)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                [(created_at, tenant['id'], kind, student_id, recipients, subject, body)
+                 for kind, student_id, subject, body in alerts]
+            )
+            conn.execute("INSERT OR REPLACE INTO progress VALUES (?, ?)", (tenant['id'], latest))
+        return len(alerts)
+    finally:
+        conn.close()
+
+
+def unsent_alerts(path):
+    """Queued alerts the mail relay hasn't sent yet, oldest first"""
+    conn = _connect(path)
+    try:
+        return pd.read_sql_query("SELECT * FROM outbox WHERE sent_at IS NULL ORDER BY id", conn)
+    finally:
+        conn.close()
+
+
+def mark_sent(alert_ids, path):
+    """Mark alerts as sent once the mail relay has delivered them"""
+    sent_at = datetime.now().isoformat(timespec='seconds')
+    conn = _connect(path)
+    try:
+        with conn:
+            conn.executemany("UPDATE outbox SET sent_at = ? WHERE id = ?", [(sent_at, int(i)) for i in alert_ids])
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Queue alerts for newly failed tests and attendance below the requirement")
+    parser.add_argument("--tenant", help="college from tenants.json (defaults to SMEI_TENANT or the default tenant)")
+    parser.add_argument("--all", action="store_true", help="run for every college in tenants.json")
+    parser.add_argument("--include-existing", action="store_true",
+                        help="on the first run, alert on every recorded change instead of starting from the current state")
+    parser.add_argument("--every", type=float, help="keep running, checking every this many minutes")
+    args = parser.parse_args()
+
+    while True:
+        tenants = get_tenants()
+        selected = tenants['tenants'].values() if args.all else [select_tenant(tenants, args.tenant)]
+        for tenant in selected:
+            try:
+                queued = run_alerts(tenant, args.include_existing)
+                print(f"{datetime.now():%Y-%m-%d %H:%M:%S} {tenant['id']}: {queued} alerts queued")
+            except (OSError, ValueError, sqlite3.Error) as e:
+                print(f"{datetime.now():%Y-%m-%d %H:%M:%S} {tenant['id']}: alert run failed: {e}")
+        if not args.every:
+            break
+        time.sleep(args.every * 60)
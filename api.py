@@ -0,0 +1,430 @@
+import argparse
+import hashlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+import requests
+import uvicorn
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Route
+
+from progression import FAILED, PASSED, build_required_matrix, build_status_matrix, calculate_test_status
+from roster_cache import STATUS_FILTERS, get_roster_entry, warm_roster_cache
+from synthetic import write_tenant
+from telemetry import record_event, register_cache, render_metrics, shared_telemetry
+from tenants import cached, get_tenants, get_view_rosters, new_tenant_state, refresh_tenant_data, select_tenant
+from views import get_view_frame, select_view
+
+# Read-only JSON API over the progression engine for other college systems
+# (student management, timetabling), built on the same per-tenant store,
+# view projections and roster cache as the app.
+#   python api.py --port 8600
+#   GET /students?q=kim  /students/<id>  /rosters/<assessment>?status=Pending  /cohorts
+# Responses carry the data version as an ETag - send If-None-Match to get a
+# 304 until the data changes. ?tenant= works as it does in the app, and so does
+# the view: SMEI_VIEW pins it, and ?view= is ignored unless the college allows it.
+#   python api.py --benchmark
+# measures requests per second against a synthetic roster. Every request is
+# written to the tenant's API audit log (api_audit_log, kept apart from the app's
+# because log rotation isn't safe across processes), and GET /metrics reports request counts,
+# latency histograms and cache sizes in the Prometheus text format.
+
+API_PORT = 8600
+
+# Polling clients don't each need to check the workbook and journal for changes
+REFRESH_SECONDS = 1.0
+
+PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 500
+
+STUDENT_COLUMNS = ['StudentID', 'Name', 'Course', 'Start Date', 'Finish Date', 'Duration (weeks)',
+                   'Attendance', 'Progression Rate', 'Phone']
+
+_tenant_states = {}
+_tenant_states_lock = threading.Lock()
+_refreshed_at = {}
+
+
+def get_telemetry():
+    """The API's audit log writer and metrics, started by the first request"""
+    return shared_telemetry('api_audit_log')
+
+
+def get_tenant_state(tenant):
+    """Shared state for a tenant, created on its first request"""
+    with _tenant_states_lock:
+        if tenant['id'] not in _tenant_states:
+            _tenant_states[tenant['id']] = new_tenant_state(tenant['cache_entries'], tenant['cache_mb'])
+            register_cache(get_telemetry(), tenant['id'], 'api', _tenant_states[tenant['id']]['cache'])
+        return _tenant_states[tenant['id']]
+
+
+def current_data(tenant, view):
+    """The view's student frame and version, refreshed from the workbook and journal at most every REFRESH_SECONDS"""
+    state = get_tenant_state(tenant)
+    store = state['store']
+
+    with store['lock']:
+        now = time.monotonic()
+        if store['df'] is None or now - _refreshed_at.get(tenant['id'], 0) >= REFRESH_SECONDS:
+            refresh_tenant_data(tenant, store)
+            _refreshed_at[tenant['id']] = now
+        df, data_version, rules = store['df'], store['data_version'], store['rules']
+
+    frame = get_view_frame(state['views'], view, df, data_version)
+    version = f"{data_version}:{view['name']}"
+    courses = [course for course in rules['courses'] if not view['courses'] or course in view['courses']]
+
+    rosters = get_view_rosters(state, view['name'])
+    warm_roster_cache(rosters, frame, version, rules['assessment_order'], courses, rules)
+
+    return {'state': state, 'df': frame, 'version': version, 'rules': rules, 'courses': courses, 'rosters': rosters}
+
+
+def _records(frame):
+    """Frame rows as JSON-ready dicts - dates as YYYY-MM-DD, missing values as null"""
+    dates = {
+        col: frame[col].dt.strftime('%Y-%m-%d')
+        for col in frame.columns if pd.api.types.is_datetime64_any_dtype(frame[col])
+    }
+    # pandas' JSON writer converts whole columns at once, much faster than building the dicts row by row
+    return json.loads(frame.assign(**dates).to_json(orient='records'))
+
+
+def _limit_offset(request):
+    limit = int(request.query_params.get('limit', PAGE_LIMIT))
+    offset = int(request.query_params.get('offset', 0))
+    if not 1 <= limit <= MAX_PAGE_LIMIT or offset < 0:
+        raise ValueError(f"limit must be 1-{MAX_PAGE_LIMIT} and offset at least 0")
+    return limit, offset
+
+
+def _course(request, context):
+    course = request.query_params.get('course', 'All')
+    if course != 'All' and course not in context['courses']:
+        raise ValueError(f"Unknown course '{course}'")
+    return course
+
+
+def _flag(request, name):
+    return request.query_params.get(name, '').lower() in ('1', 'true', 'yes')
+
+
+def index(request, context):
+    """Data version plus the courses, assessments and status filters the other endpoints accept"""
+    return {
+        'data_version': context['version'],
+        'students': len(context['df']),
+        'courses': context['courses'],
+        'assessments': context['rules']['assessment_order'],
+        'status_filters': list(STATUS_FILTERS)
+    }
+
+
+def search_students(request, context):
+    """Students whose name or ID contains q, optionally in one course"""
+    df = context['df']
+    limit, offset = _limit_offset(request)
+    course = _course(request, context)
+    term = request.query_params.get('q', '').strip()
+
+    mask = np.ones(len(df), dtype=bool)
+    if term:
+        # Lower-cased "name|id" keys, built once per data version, so a search is one substring scan
+        search_keys = cached(
+            context['state']['cache'],
+            ('api_search_keys', context['version']),
+            lambda: (df['Name'].fillna('') + '|' + df['StudentID']).str.lower()
+        )
+        mask &= search_keys.str.contains(term.lower(), regex=False).to_numpy()
+    if course != 'All':
+        mask &= (df['Course'] == course).to_numpy()
+
+    matches = df[mask]
+    columns = [col for col in STUDENT_COLUMNS if col in df.columns]
+    return {'total': len(matches), 'limit': limit, 'offset': offset,
+            'students': _records(matches.iloc[offset:offset + limit][columns])}
+
+
+def get_student(request, context):
+    """One student's details with their required, passed, failed and pending assessments"""
+    df = context['df']
+    student_id = request.path_params['student_id'].strip()
+
+    # Hash index over the StudentIDs, built once per data version
+    student_index = cached(
+        context['state']['cache'],
+        ('api_student_index', context['version']),
+        lambda: pd.Index(df['StudentID'])
+    )
+    positions = student_index.get_indexer_for([student_id])
+    if len(positions) == 0 or positions[0] < 0:
+        raise LookupError(f"Unknown student '{student_id}'")
+
+    rows = df.iloc[positions[:1]]
+    student = rows.iloc[0]
+    test_status = calculate_test_status(student, context['rules'])
+    columns = [col for col in STUDENT_COLUMNS if col in df.columns]
+
+    return {
+        'student': _records(rows.iloc[:1][columns])[0],
+        'required': test_status['required_tests'],
+        'passed': test_status['passed_tests'],
+        'failed': test_status['failed_tests'],
+        'pending': test_status['pending_tests'],
+        'remaining_tests': int(test_status['remaining_tests']),
+        'assessments': [
+            {'assessment': test, 'status': detail['status'], 'value': str(detail['value']) if detail['value'] != '' else None}
+            for test, detail in test_status['test_details'].items()
+        ]
+    }
+
+
+def assessment_roster(request, context):
+    """Students required to take an assessment, by course, status and finishing within 30 days"""
+    assessment = request.path_params['assessment']
+    if assessment not in context['rules']['assessment_order']:
+        raise LookupError(f"Unknown assessment '{assessment}'")
+    status = request.query_params.get('status', 'All')
+    if status not in STATUS_FILTERS:
+        raise ValueError(f"status must be one of {', '.join(STATUS_FILTERS)}")
+    course = _course(request, context)
+    upcoming = _flag(request, 'upcoming')
+    limit, offset = _limit_offset(request)
+
+    entry, _ = get_roster_entry(
+        context['rosters'], context['df'], context['version'], assessment, course, upcoming, context['rules']
+    )
+    roster = entry['roster'][entry['masks'][status]]
+
+    return {
+        'assessment': assessment,
+        'course': course,
+        'status': status,
+        'upcoming': upcoming,
+        'metrics': entry['metrics'][status],
+        'limit': limit,
+        'offset': offset,
+        'students': _records(roster.iloc[offset:offset + limit])
+    }
+
+
+def cohort_summary(request, context):
+    """Student counts, attendance and progression per course, and status counts per assessment"""
+    df = context['df']
+    rules = context['rules']
+    course = _course(request, context)
+
+    def summary():
+        cohort = df if course == 'All' else df[df['Course'] == course]
+        status = build_status_matrix(cohort, rules=rules)
+        required = build_required_matrix(cohort, rules=rules)
+
+        courses = {}
+        for name, group in cohort.groupby('Course', sort=False):
+            attendance = pd.to_numeric(group['Attendance'], errors='coerce')
+            courses[name] = {
+                'students': len(group),
+                'mean_attendance': round(float(attendance.mean()), 1) if attendance.notna().any() else None,
+                'below_80_attendance': int((attendance < 80).sum()),
+                'mean_progression_rate': round(float(group['Progression Rate'].mean()), 1)
+            }
+
+        assessments = {}
+        for test in required.columns:
+            needed = required[test].to_numpy()
+            if needed.any():
+                codes = status[test].to_numpy()[needed]
+                passed, failed = int((codes == PASSED).sum()), int((codes == FAILED).sum())
+                assessments[test] = {
+                    'required': int(needed.sum()),
+                    'passed': passed,
+                    'failed': failed,
+                    'pending': int(needed.sum()) - passed - failed
+                }
+
+        return {'course': course, 'students': len(cohort), 'courses': courses, 'assessments': assessments}
+
+    return cached(context['state']['cache'], ('api_cohorts', context['version'], course), summary)
+
+
+def _etag(version, request):
+    """Weak ETag for a response: the data version, today's date (for the finishing-soon filters) and the request"""
+    key = f"{version}|{pd.Timestamp.now().date()}|{request.url.path}?{request.url.query}"
+    return f'W/"{hashlib.sha1(key.encode()).hexdigest()[:20]}"'
+
+
+def api_endpoint(handler):
+    """Wrap a handler taking (request, context) with tenant/view selection, ETags, error responses and auditing
+
+    The pandas work runs in the thread pool so the event loop keeps serving other requests.
+    """
+    async def endpoint(request):
+        started = time.perf_counter()
+        try:
+            tenant = select_tenant(get_tenants(), request.query_params.get('tenant'))
+            view = select_view(tenant, request.query_params.get('view'))
+        except (OSError, ValueError) as e:
+            return JSONResponse({'error': str(e)}, status_code=400)
+
+        try:
+            context = await run_in_threadpool(current_data, tenant, view)
+        except (OSError, ValueError) as e:
+            return JSONResponse({'error': f"Student data unavailable: {e}"}, status_code=503)
+
+        etag = _etag(context['version'], request)
+        headers = {'ETag': etag, 'X-Data-Version': context['version'], 'Cache-Control': 'no-cache'}
+
+        def audit(status, cache=None):
+            record_event(
+                get_telemetry(), tenant, f"api_{handler.__name__}", time.perf_counter() - started, cache,
+                view=view['name'], data_version=context['version'], path=request.url.path,
+                query=request.url.query, status=status, client=request.client.host if request.client else None
+            )
+
+        if etag in request.headers.get('if-none-match', ''):
+            audit(304, 'hit')
+            return Response(status_code=304, headers=headers)
+
+        try:
+            body = await run_in_threadpool(handler, request, context)
+        except LookupError as e:
+            audit(404)
+            return JSONResponse({'error': e.args[0]}, status_code=404)
+        except ValueError as e:
+            audit(400)
+            return JSONResponse({'error': str(e)}, status_code=400)
+
+        response = JSONResponse(body, headers=headers)
+        audit(200)
+        return response
+
+    return endpoint
+
+
+async def health(request):
+    return JSONResponse({'status': 'ok'})
+
+
+async def metrics(request):
+    return PlainTextResponse(render_metrics(get_telemetry()), media_type="text/plain; version=0.0.4")
+
+
+app = Starlette(routes=[
+    Route("/", api_endpoint(index)),
+    Route("/health", health),
+    Route("/metrics", metrics),
+    Route("/students", api_endpoint(search_students)),
+    Route("/students/{student_id}", api_endpoint(get_student)),
+    Route("/rosters/{assessment}", api_endpoint(assessment_roster)),
+    Route("/cohorts", api_endpoint(cohort_summary))
+])
+
+
+# Requests replayed by the benchmark, against a synthetic roster
+BENCHMARK_PATHS = {
+    'search': "/students?q=an",
+    'student': "/students/SYN000042",
+    'roster': "/rosters/" + quote("Intermediate Mid Course Test") + "?status=Pending",
+    'roster (upcoming)': "/rosters/" + quote("Intermediate End Course Test") + "?upcoming=true&course=EAP",
+    'cohorts': "/cohorts",
+    'not modified': None
+}
+
+
+def benchmark(students=2000, clients=8, seconds=5.0, port=API_PORT + 1):
+    """Requests per second and latency of each endpoint against a local server on synthetic data"""
+    with tempfile.TemporaryDirectory() as directory:
+        write_tenant(directory, students)
+        server = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--port", str(port)],
+            cwd=directory,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        base_url = f"http://127.0.0.1:{port}"
+        try:
+            deadline = time.monotonic() + 60
+            while True:
+                try:
+                    if requests.get(base_url + "/health", timeout=1).ok:
+                        break
+                except requests.RequestException:
+                    if time.monotonic() > deadline:
+                        raise RuntimeError("API server did not start within 60 seconds")
+                    time.sleep(0.2)
+
+            # Warm the tenant state so the runs measure the cached engine
+            etag = requests.get(base_url + "/", timeout=60).headers['ETag']
+            results = {}
+            for name, path in BENCHMARK_PATHS.items():
+                headers = {'If-None-Match': etag} if path is None else {}
+                url = base_url + (path or "/")
+                requests.get(url, headers=headers, timeout=60)
+                results[name] = _hammer(url, headers, clients, seconds)
+            return results
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def _hammer(url, headers, clients, seconds):
+    """Send requests to one URL from concurrent clients for a fixed time"""
+    stop = time.monotonic() + seconds
+    latencies = []
+    errors = []
+
+    def client():
+        with requests.Session() as session:
+            while time.monotonic() < stop:
+                started = time.perf_counter()
+                response = session.get(url, headers=headers, timeout=60)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code not in (200, 304):
+                    errors.append(response.status_code)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        for future in [executor.submit(client) for _ in range(clients)]:
+            future.result()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(statistics.median(latencies) * 1000, 1),
+        'p95_ms': round(latencies[int(0.95 * (len(latencies) - 1))] * 1000, 1),
+        'errors': len(errors)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve student progression data as JSON")
+    parser.add_argument("--host", default="127.0.0.1", help="interface to listen on")
+    parser.add_argument("--port", type=int, default=API_PORT, help="port to listen on")
+    parser.add_argument("--benchmark", action="store_true", help="measure requests per second on synthetic data instead")
+    parser.add_argument("--students", type=int, default=2000, help="synthetic roster size for --benchmark")
+    parser.add_argument("--clients", type=int, default=8, help="concurrent clients for --benchmark")
+    parser.add_argument("--seconds", type=float, default=5.0, help="seconds per endpoint for --benchmark")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        print(f"Benchmarking {args.clients} clients against {args.students} synthetic students...")
+        for name, result in benchmark(args.students, args.clients, args.seconds).items():
+            print(f"  {name:<18} {result['rps']:>8} req/s  p50 {result['p50_ms']:>7} ms  "
+                  f"p95 {result['p95_ms']:>7} ms  errors {result['errors']}")
+    else:
+        uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -7,14 +7,45 @@ import base64
 from PIL import Image
 import requests
 import re
+import os
+import sqlite3
+import time
+import uuid
+from progression import (
+    get_rules, get_test_status, get_required_assessments,
+    calculate_test_status, build_status_matrix,
+    build_required_matrix, build_score_matrix, score_statistics, PASSED, FAILED
+)
+from results_journal import record_results, superseded_count, compact_journal
+from score_import import read_score_file, validate_scores, apply_scores
+from snapshots import record_snapshot, load_trend, snapshot_count
+from roster_cache import STATUS_FILTERS, warm_roster_cache, get_roster_entry
+from tenants import (
+    get_tenants, select_tenant, new_tenant_state, get_view_rosters, refresh_tenant_data, cached, is_cached
+)
+from views import select_view, get_view_frame
+from data_quality import scan_data_quality, quality_summary
+from session_planner import PLAN_WEEKS, plan_test_sessions
+from telemetry import TELEMETRY_PORT, TELEMETRY_PORT_ENV_VAR, record_event, register_cache, serve_metrics, shared_telemetry
+
+# Tenant (college) - from ?tenant= in the URL, the SMEI_TENANT environment variable or the default in tenants.json
+try:
+    TENANT = select_tenant(get_tenants(), st.query_params.get("tenant"))
+    tenant_error = None
+except (OSError, ValueError) as e:
+    TENANT, tenant_error = None, e
 
 # Page configuration
 st.set_page_config(
-    page_title="SMEI Student Progression",
+    page_title=f"{TENANT['short_name']} Student Progression" if TENANT else "Student Progression",
     page_icon="🎓",
     layout="wide"
 )
 
+if tenant_error is not None:
+    st.error(f"Error selecting college: {tenant_error}")
+    st.stop()
+
 # Custom CSS for better styling - UPDATED with progression rate colors
 st.markdown("""
 <style>
@@ -172,298 +203,57 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Assessment rules - Updated with complete descriptions and proper order
-ASSESSMENT_RULES = {
-    'EAP': {
-        'assessments': [
-            'Intermediate Mid Course Test',
-            'Intermediate End Course Test',
-            'Upper Intermediate Mid Course Test',
-            'Upper Intermediate End Course Test',
-            'Advanced Mid Course Test',
-            'Advanced End Course Test'
-        ],
-        'duration_ranges': [
-            (1, 8, ['Intermediate Mid Course Test']),
-            (9, 14, ['Intermediate Mid Course Test', 'Intermediate End Course Test']),
-            (15, 20, ['Intermediate Mid Course Test', 'Intermediate End Course Test', 'Upper Intermediate Mid Course Test']),
-            (21, 26, ['Intermediate Mid Course Test', 'Intermediate End Course Test', 'Upper Intermediate Mid Course Test', 'Upper Intermediate End Course Test']),
-            (27, 32, ['Intermediate Mid Course Test', 'Intermediate End Course Test', 'Upper Intermediate Mid Course Test', 'Upper Intermediate End Course Test', 'Advanced Mid Course Test']),
-            (33, 36, ['Intermediate Mid Course Test', 'Intermediate End Course Test', 'Upper Intermediate Mid Course Test', 'Upper Intermediate End Course Test', 'Advanced Mid Course Test', 'Advanced End Course Test'])
-        ]
-    },
-    'General English': {
-        'assessments': [
-            'Elementary Mid Course Test',
-            'Elementary End Course Test',
-            'Pre Intermediate Mid Course Test',
-            'Pre Intermediate End Course Test',
-            'Intermediate Mid Course Test',
-            'Intermediate End Course Test',
-            'Upper Intermediate Mid Course Test',
-            'Upper Intermediate End Course Test',
-            'Advanced Mid Course Test',
-            'Advanced End Course Test'
-        ],
-        'duration_ranges': [
-            (1, 8, ['Intermediate Mid Course Test']),
-            (9, 14, ['Intermediate Mid Course Test', 'Intermediate End Course Test']),
-            (15, 20, ['Intermediate Mid Course Test', 'Intermediate End Course Test', 'Upper Intermediate Mid Course Test']),
-            (21, 26, ['Intermediate Mid Course Test', 'Intermediate End Course Test', 'Upper Intermediate Mid Course Test', 'Upper Intermediate End Course Test']),
-            (27, 32, ['Elementary Mid Course Test', 'Elementary End Course Test', 'Pre Intermediate Mid Course Test', 'Pre Intermediate End Course Test', 'Intermediate Mid Course Test']),
-            (33, 38, ['Elementary Mid Course Test', 'Elementary End Course Test', 'Pre Intermediate Mid Course Test', 'Pre Intermediate End Course Test', 'Intermediate Mid Course Test', 'Intermediate End Course Test']),
-            (39, 44, ['Elementary Mid Course Test', 'Elementary End Course Test', 'Pre Intermediate Mid Course Test', 'Pre Intermediate End Course Test', 'Intermediate Mid Course Test', 'Intermediate End Course Test', 'Upper Intermediate Mid Course Test']),
-            (45, 50, ['Elementary Mid Course Test', 'Elementary End Course Test', 'Pre Intermediate Mid Course Test', 'Pre Intermediate End Course Test', 'Intermediate Mid Course Test', 'Intermediate End Course Test', 'Upper Intermediate Mid Course Test', 'Upper Intermediate End Course Test']),
-            (51, 56, ['Elementary Mid Course Test', 'Elementary End Course Test', 'Pre Intermediate Mid Course Test', 'Pre Intermediate End Course Test', 'Intermediate Mid Course Test', 'Intermediate End Course Test', 'Upper Intermediate Mid Course Test', 'Upper Intermediate End Course Test', 'Advanced Mid Course Test']),
-            (57, 60, ['Elementary Mid Course Test', 'Elementary End Course Test', 'Pre Intermediate Mid Course Test', 'Pre Intermediate End Course Test', 'Intermediate Mid Course Test', 'Intermediate End Course Test', 'Upper Intermediate Mid Course Test', 'Upper Intermediate End Course Test', 'Advanced Mid Course Test', 'Advanced End Course Test'])
-        ]
-    }
-}
-
-# Define assessment order for consistent sorting
-ASSESSMENT_ORDER = [
-    'Elementary Mid Course Test',
-    'Elementary End Course Test',
-    'Pre Intermediate Mid Course Test',
-    'Pre Intermediate End Course Test',
-    'Intermediate Mid Course Test',
-    'Intermediate End Course Test',
-    'Upper Intermediate Mid Course Test',
-    'Upper Intermediate End Course Test',
-    'Advanced Mid Course Test',
-    'Advanced End Course Test'
-]
-
-# Load student data - FIXED: Now reads Excel file instead of CSV
-@st.cache_data
-def load_student_data():
-    try:
-        # Load from Excel file - FIXED: Changed from CSV to Excel
-        df = pd.read_excel("SMEI Student Progression.xlsx", sheet_name="SMEI")
-
-        # Ensure date columns are datetime
-        df['Start Date'] = pd.to_datetime(df['Start Date'], errors='coerce')
-        df['Finish Date'] = pd.to_datetime(df['Finish Date'], errors='coerce')
-
-        # Standardize course names
-        df['Course'] = df['Course'].replace({
-            'General English': 'General English',
-            'EAP': 'EAP'
-        })
-        
-        # Calculate progression rate for each student
-        df = calculate_progression_rate(df)
-
-        return df
-    except Exception as e:
-        st.error(f"Error loading student data: {e}")
-        st.info("Please ensure 'SMEI Student Progression.xlsx' is in the same folder as the app with a sheet named 'SMEI'")
-        return pd.DataFrame()
-
-def calculate_progression_rate(df):
-    """Calculate progression rate for each student and add to DataFrame"""
-    progression_rates = []
-    
-    for idx, student in df.iterrows():
-        # Get required assessments based on course and duration
-        required_tests = get_required_assessments(
-            student['Course'],
-            student['Duration (weeks)']
-        )
-        
-        # Count passed assessments
-        passed_count = 0
-        total_attempted = 0
-        
-        for test in required_tests:
-            test_value = student.get(test, '')
-            status, status_type = get_test_status(test_value)
-            
-            if status_type in ['passed', 'failed']:  # Test has been attempted
-                total_attempted += 1
-                if status_type == 'passed':
-                    passed_count += 1
-        
-        # Calculate progression rate
-        if total_attempted > 0:
-            progression_rate = (passed_count / len(required_tests)) * 100
-        else:
-            progression_rate = 0
-            
-        progression_rates.append(progression_rate)
-    
-    # Add progression rate column to DataFrame
-    df['Progression Rate'] = progression_rates
-    
-    return df
-
-def extract_score(value_str):
-    """Extract numeric score from a string"""
-    if pd.isna(value_str) or value_str == '':
-        return None
-        
-    # Convert to string and clean
-    value_str = str(value_str).strip()
-    
-    # Remove all non-digit characters (except decimal point)
-    cleaned = re.sub(r'[^\d.]', '', value_str)
-    
-    try:
-        score = float(cleaned)
-        return score
-    except (ValueError, TypeError):
-        return None
-
+# Per-tenant state shared by all sessions of that tenant (see tenants.new_tenant_state)
+@st.cache_resource
+def get_tenant_state(tenant_id, cache_entries, cache_mb):
+    return new_tenant_state(cache_entries, cache_mb)
 
-def get_test_status(test_value):
-    """Determine the status of a test based on its value"""
-    if pd.isna(test_value) or str(test_value).strip() == '':
-        return 'Pending', 'pending'
-
-    value_str = str(test_value).strip()
-    
-    # Convert to lowercase for case-insensitive matching
-    value_lower = value_str.lower()
-
-    # First, check if it's a numeric score
-    score = extract_score(value_str)
-    if score is not None:
-        if score >= 50:
-            return 'Passed', 'passed'
-        else:
-            return 'Failed', 'failed'
-
-    # Passed status keywords
-    passed_keywords = ['passed', 'pass', 'completed', 'complete']
-    # Failed status keywords
-    failed_keywords = ['failed', 'fail']
-
-    # Check passed status (case-insensitive)
-    if any(keyword in value_lower for keyword in passed_keywords):
-        return 'Passed', 'passed'
-
-    # Check failed status (case-insensitive)
-    if any(keyword in value_lower for keyword in failed_keywords):
-        return 'Failed', 'failed'
-
-    # Default to pending if any value exists but doesn't match patterns
-    return 'Pending', 'pending'
 
+# Audit log writer and metrics endpoint, shared by all sessions and tenants (see telemetry.py).
+# The recorder outlives cache clears; after one the endpoint already holding the port keeps serving it.
+@st.cache_resource
+def get_telemetry():
+    telemetry = shared_telemetry()
+    serve_metrics(telemetry, int(os.environ.get(TELEMETRY_PORT_ENV_VAR, TELEMETRY_PORT)))
+    return telemetry
 
-def get_required_assessments(course, duration_weeks):
-    """Get required tests based on course and duration"""
-    if course not in ASSESSMENT_RULES:
-        return []
 
-    rules = ASSESSMENT_RULES[course]
+def load_student_data(tenant, state):
+    """Load student data with recorded results merged in
 
-    for min_weeks, max_weeks, assessments in rules['duration_ranges']:
-        if min_weeks <= duration_weeks <= max_weeks:
-            return assessments
+    The workbook is only reread when the file changes. New journal records and
+    assessment rule changes are applied on top of the current frame and only the
+    affected students' progression rates are recalculated.
+    """
+    try:
+        rules = get_rules(tenant['rules'])
+        store = state['store']
 
-    # If beyond max range, return all assessments
-    return rules['assessments']
+        with store['lock']:
+            if not refresh_tenant_data(tenant, store, rules):
+                return store['df']
 
+            # Data quality report for this version, scanned in the background so loading isn't slowed
+            store['quality'] = state['roster_executor'].submit(scan_data_quality, store['df'], rules, store['unreadable'])
 
-def calculate_test_status(student_data):
-    """Calculate student's test status"""
-    required_tests = get_required_assessments(
-        student_data['Course'],
-        student_data['Duration (weeks)']
-    )
+            # Keep a compact history of each data version for the trend view
+            try:
+                record_snapshot(store['df'], store['data_version'], tenant['snapshots'], rules=rules)
+            except sqlite3.Error as e:
+                st.warning(f"Could not record data snapshot: {e}")
 
-    passed_tests = []
-    failed_tests = []
-    pending_tests = []
-    test_details = {}
-
-    for test in required_tests:
-        test_value = student_data.get(test, '')
-        status, status_type = get_test_status(test_value)
-
-        test_details[test] = {
-            'status': status,
-            'type': status_type,
-            'value': test_value if pd.notna(test_value) else ''
-        }
-
-        if status_type == 'passed':
-            passed_tests.append(test)
-        elif status_type == 'failed':
-            failed_tests.append(test)
-        else:
-            pending_tests.append(test)
-
-    total_completed = len(passed_tests) + len(failed_tests)
-    total_required = len(required_tests)
-    
-    # Calculate remaining tests (required - passed)
-    remaining_tests = total_required - len(passed_tests)
-
-    return {
-        'required_tests': required_tests,
-        'passed_tests': passed_tests,
-        'failed_tests': failed_tests,
-        'pending_tests': pending_tests,
-        'remaining_tests': remaining_tests,
-        'test_details': test_details,
-        'completion_rate': total_completed / total_required * 100 if total_required > 0 else 0,
-        'pass_rate': len(passed_tests) / total_required * 100 if total_required > 0 else 0
-    }
-
-
-def get_students_by_assessment(df, assessment_name, course_filter="All", status_filter="All", show_upcoming=False):
-    """Get all students who should take a specific assessment"""
-    students_with_assessment = []
-    
-    # Apply date filter if selected
-    if show_upcoming:
-        today = pd.Timestamp.now()
-        thirty_days_later = today + pd.Timedelta(days=30)
-    
-    for idx, student in df.iterrows():
-        # Apply course filter
-        if course_filter != "All" and student['Course'] != course_filter:
-            continue
-            
-        # Apply date filter if selected
-        if show_upcoming:
-            if not ((student['Finish Date'] >= today) & (student['Finish Date'] <= thirty_days_later)):
-                continue
-            
-        required_tests = get_required_assessments(
-            student['Course'],
-            student['Duration (weeks)']
-        )
-        
-        if assessment_name in required_tests:
-            test_value = student.get(assessment_name, '')
-            status, status_type = get_test_status(test_value)
-            
-            # Apply status filter
-            if status_filter == "All" or status == status_filter:
-                students_with_assessment.append({
-                    'StudentID': student['StudentID'],
-                    'Name': student['Name'],
-                    'Course': student['Course'],
-                    'Start Date': student['Start Date'],
-                    'Finish Date': student['Finish Date'],
-                    'Duration (weeks)': student['Duration (weeks)'],
-                    'Attendance': student.get('Attendance', 0),
-                    'Phone': student['Phone'],
-                    'Status': status,
-                    'Recorded Value': test_value if pd.notna(test_value) else 'Not Recorded',
-                    'Progression Rate': student.get('Progression Rate', 0)
-                })
-    
-    return pd.DataFrame(students_with_assessment)
+            return store['df']
+    except Exception as e:
+        st.error(f"Error loading student data: {e}")
+        st.info(f"Please ensure '{tenant['workbook']}' is in the same folder as the app with a sheet named '{tenant['sheet_name']}'")
+        return pd.DataFrame()
 
 
-def format_phone(phone):
-    """Format phone number to ensure it starts with 0"""
-    if isinstance(phone, str) and phone.startswith('+61') and not phone.startswith('+61 0'):
-        return phone.replace('+61 ', '+61 0')
-    return phone
+def format_date(value):
+    """Format a date as YYYY-MM-DD, or 'Not Recorded' for a missing or unreadable date"""
+    if pd.isna(value):
+        return "Not Recorded"
+    return value.strftime('%Y-%m-%d')
 
 
 def get_attendance_status(attendance):
@@ -490,11 +280,14 @@ def get_progression_status(progression_rate):
         return "Poor", "progression-poor"
 
 
-def load_and_display_logo():
-    """Load and display the SMEI logo"""
+def load_and_display_logo(tenant):
+    """Load and display the tenant's logo"""
+    contact = "<br>\n".join(tenant['contact'])
     try:
         # Try to load the logo image
-        logo = Image.open("SMEI Header.png")
+        if not tenant['logo']:
+            raise FileNotFoundError
+        logo = Image.open(tenant['logo'])
         
         # Resize logo to appropriate size
         logo = logo.resize((400, 150))
@@ -503,47 +296,43 @@ def load_and_display_logo():
         st.image(logo, use_container_width=False)
         
         # Display contact information below the logo
-        st.markdown("""
+        st.markdown(f"""
         <div class="contact-info">
-            CRICOS 03846G | Sydney Metropolitan Group Pty Ltd<br>
-            Suite 2, Level 5, 545 Kent Street, Sydney NSW 2000<br>
-            Tel: +61 02 9744 1356 | Email: info@smel.nsw.edu.au
+            {contact}
         </div>
         """, unsafe_allow_html=True)
         
         return True
     except FileNotFoundError:
         # Fallback to text header if logo not found
-        st.markdown("""
+        st.markdown(f"""
         <div class="logo-header">
             <div class="smei-logo">
-                SYDNEY METROPOLITAN ENGLISH INSTITUTE
+                {tenant['name'].upper()}
             </div>
             <div class="smei-subtitle">
-                CRICOS 03846G | Sydney Metropolitan Group Pty Ltd<br>
-                Suite 2, Level 5, 545 Kent Street, Sydney NSW 2000<br>
-                Tel: +61 02 9744 1356 | Email: info@smel.nsw.edu.au
+                {contact}
             </div>
         </div>
         """, unsafe_allow_html=True)
         return False
 
 
-def create_excel_download(df):
-    """Create Excel file for download with SMEI sheet name"""
+def create_excel_download(df, sheet_name):
+    """Create Excel file for download with the tenant's sheet name"""
     try:
         # Create a BytesIO buffer
         buffer = io.BytesIO()
         
         # Try to use xlsxwriter first, fall back to openpyxl if not available
         try:
-            # Write DataFrame to Excel with sheet name 'SMEI'
+            # Write DataFrame to Excel with the tenant's sheet name
             with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
-                df.to_excel(writer, sheet_name='SMEI', index=False)
+                df.to_excel(writer, sheet_name=sheet_name, index=False)
                 
                 # Get the workbook and worksheet
                 workbook = writer.book
-                worksheet = writer.sheets['SMEI']
+                worksheet = writer.sheets[sheet_name]
                 
                 # Add some formatting
                 header_format = workbook.add_format({
@@ -560,7 +349,7 @@ def create_excel_download(df):
         except ImportError:
             # Fall back to openpyxl if xlsxwriter is not available
             with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='SMEI', index=False)
+                df.to_excel(writer, sheet_name=sheet_name, index=False)
         
         buffer.seek(0)
         return buffer
@@ -569,417 +358,916 @@ def create_excel_download(df):
         return None
 
 
+def parse_pasted_results(text):
+    """Parse pasted 'StudentID, value' lines (comma or tab separated) into pairs"""
+    pairs = []
+    skipped = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        parts = re.split(r'[,\t]', line, maxsplit=1)
+        if len(parts) == 2 and parts[0].strip() and parts[1].strip():
+            pairs.append((parts[0].strip(), parts[1].strip()))
+        else:
+            skipped.append(line)
+    return pairs, skipped
+
+
+def rerun_with_messages(messages):
+    """Rerun the page so newly recorded results show everywhere, keeping the messages to show after the rerun"""
+    st.session_state['record_messages'] = messages
+    st.rerun()
+
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+
+def format_attendance(val):
+    """Format attendance with color coding"""
+    if pd.isna(val):
+        return "No Data"
+    elif val >= 80:
+        return f"🟢 {val}%"
+    elif val >= 50:
+        return f"🟡 {val}%"
+    else:
+        return f"🔴 {val}%"
+
+
+def format_progression(val):
+    """Format progression rate with color coding"""
+    if pd.isna(val):
+        return "No Data"
+    elif val >= 90:
+        return f"🟢 {val:.1f}%"
+    elif val >= 50:
+        return f"🟡 {val:.1f}%"
+    else:
+        return f"🔴 {val:.1f}%"
+
+
+def format_student_rows(page_df):
+    """Format dates, attendance and progression for display"""
+    page_df = page_df.copy()
+    page_df['Start Date'] = page_df['Start Date'].dt.strftime('%Y-%m-%d')
+    page_df['Finish Date'] = page_df['Finish Date'].dt.strftime('%Y-%m-%d')
+    page_df['Attendance'] = page_df['Attendance'].apply(format_attendance)
+    page_df['Progression Rate'] = page_df['Progression Rate'].apply(format_progression)
+    return page_df
+
+
+# Sort orders are cached as row permutations so paging and re-sorting never re-sort the frame
+def get_sort_order(frame, frame_key, sort_column, ascending):
+    def sort_order():
+        if sort_column is None:
+            return np.arange(len(frame))
+        ordered = frame[sort_column].reset_index(drop=True).sort_values(
+            ascending=ascending, kind='stable', na_position='last'
+        )
+        return ordered.index.to_numpy()
+
+    return cached(TENANT_STATE['cache'], ('sort_order', frame_key, sort_column, ascending), sort_order)
+
+
+def show_paginated_table(frame, frame_key, display_cols, key, mask=None):
+    """Show one page of a frame - only the visible rows are formatted and sent to the browser
+
+    mask is an optional boolean array selecting the rows of frame to include.
+    """
+    sort_col1, sort_col2, sort_col3, sort_col4 = st.columns([2, 1, 1, 1])
+    with sort_col1:
+        sort_column = st.selectbox(
+            "Sort by:",
+            [None] + display_cols,
+            format_func=lambda col: "Default Order" if col is None else col,
+            key=f"{key}_sort_column"
+        )
+    with sort_col2:
+        descending = st.checkbox("Descending", key=f"{key}_descending")
+    with sort_col3:
+        page_size = st.selectbox("Rows per page:", PAGE_SIZES, key=f"{key}_page_size")
+
+    order = get_sort_order(frame, frame_key, sort_column, not descending)
+    if mask is not None:
+        order = order[mask[order]]
+
+    total_rows = len(order)
+    total_pages = max(1, -(-total_rows // page_size))
+
+    # Keep the page in range when filters shrink the table
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > total_pages:
+        st.session_state[page_key] = total_pages
+
+    with sort_col4:
+        page = st.number_input("Page:", min_value=1, max_value=total_pages, step=1, key=page_key)
+
+    start = (page - 1) * page_size
+    positions = order[start:start + page_size]
+
+    page_df = format_student_rows(frame.iloc[positions][display_cols])
+    page_df.index = page_df.index + 1
+    st.dataframe(page_df, use_container_width=True)
+    st.caption(f"Showing {min(start + 1, total_rows)}-{start + len(positions)} of {total_rows} students (page {page} of {total_pages})")
+
+
+# Status, required-assessment and score matrices for every student, computed once per data version
+def get_status_matrices(df, data_version, rules):
+    return cached(
+        TENANT_STATE['cache'],
+        ('matrices', data_version),
+        lambda: (build_status_matrix(df, rules=rules), build_required_matrix(df, rules=rules), build_score_matrix(df, rules=rules))
+    )
+
+
+# Score statistics are cached per data version and course
+def get_score_statistics(df, data_version, course, rules):
+    def statistics():
+        scores = get_status_matrices(df, data_version, rules)[2]
+        if course in rules['courses']:
+            scores = scores[(df['Course'] == course).to_numpy()]
+            return score_statistics(scores, rules['courses'][course]['pass_mark'])
+        return score_statistics(scores, rules['pass_mark'])
+
+    return cached(TENANT_STATE['cache'], ('score_statistics', data_version, course), statistics)
+
+
+# An uploaded examiner file is parsed and validated once per upload and data version
+def get_import_report(uploaded_file, df, data_version, rules):
+    def import_report():
+        uploaded_file.seek(0)
+        score_column, score_chunks = read_score_file(uploaded_file, uploaded_file.name, rules=rules)
+        return score_column, validate_scores(score_chunks, df[['StudentID', 'Course']], rules)
+
+    return cached(TENANT_STATE['cache'], ('score_import', uploaded_file.file_id, data_version), import_report)
+
+
+def show_progress_matrix(students, status_matrix, required_matrix):
+    """Show a pass/fail/pending matrix of students x required assessments"""
+    status = status_matrix.loc[students.index]
+    required = required_matrix.loc[students.index]
+
+    # Only show assessments that at least one of these students needs
+    columns = [test for test in required.columns if required[test].any()]
+    status = status[columns].to_numpy()
+    required = required[columns].to_numpy()
+
+    cells = np.select(
+        [~required, status == PASSED, status == FAILED],
+        ["", "✅", "❌"],
+        default="⏳"
+    )
+
+    matrix_df = pd.DataFrame(cells, columns=columns, index=students['StudentID'].to_numpy())
+    matrix_df.index.name = 'StudentID'
+    matrix_df.insert(0, 'Name', students['Name'].to_numpy())
+    matrix_df.insert(1, 'Course', students['Course'].to_numpy())
+    matrix_df['Passed'] = [f"{p}/{r}" for p, r in zip((required & (status == PASSED)).sum(axis=1), required.sum(axis=1))]
+    matrix_df['Progression Rate'] = students['Progression Rate'].apply(format_progression).to_numpy()
+
+    st.dataframe(matrix_df, use_container_width=True)
+    st.caption("✅ Passed | ❌ Failed | ⏳ Pending | blank = not required for the student's course and duration")
+
+
+def describe_assessment_rules(rules):
+    """Describe each course's duration ranges and required assessments as markdown"""
+    lines = []
+    for course, course_rules in rules['courses'].items():
+        lines.append(f"    **{course} Course:**")
+        if course_rules['pass_mark'] != rules['pass_mark']:
+            lines.append(f"    - Pass mark: {course_rules['pass_mark']:g}")
+        for min_weeks, max_weeks, assessments in course_rules['duration_ranges']:
+            noun = "assessment" if len(assessments) == 1 else "assessments"
+            lines.append(f"    - {min_weeks}-{max_weeks} weeks: {len(assessments)} {noun} ({' + '.join(assessments)})")
+        lines.append("")
+    return "\n".join(lines)
+
+
+# Session plans are cached per data version, planning settings and day
+def get_session_plan(df, data_version, capacity, weeks, rules):
+    def session_plan():
+        status_matrix, required_matrix, _ = get_status_matrices(df, data_version, rules)
+        return plan_test_sessions(df, capacity, weeks, status_matrix, required_matrix, rules=rules)
+
+    return cached(
+        TENANT_STATE['cache'],
+        ('session_plan', data_version, capacity, weeks, pd.Timestamp.now().date()),
+        session_plan
+    )
+
+
+# Trends only change when a new data version is recorded
+def get_trend(assessment_name, data_version):
+    return cached(
+        TENANT_STATE['cache'],
+        ('trend', data_version, assessment_name),
+        lambda: (load_trend(assessment_name, TENANT['snapshots']), snapshot_count(TENANT['snapshots']))
+    )
+
+
+# The Excel export of a view is built once per data version and shared by every session
+def get_excel_download(df, data_version, sheet_name):
+    def excel_bytes():
+        buffer = create_excel_download(df, sheet_name)
+        return buffer.getvalue() if buffer else None
+
+    return cached(TENANT_STATE['cache'], ('excel', data_version), excel_bytes)
+
+
+def audit(event, started, params, cache=None, **fields):
+    """Record a search, filter change, roster query or export, once per change of its parameters in this session"""
+    audit_key = f"audit_{event}"
+    if st.session_state.get(audit_key) == (data_version, params):
+        return
+    st.session_state[audit_key] = (data_version, params)
+    record_event(
+        TELEMETRY, TENANT, event, time.perf_counter() - started, cache,
+        session=st.session_state.setdefault('audit_session', uuid.uuid4().hex[:12]),
+        view=VIEW['name'], data_version=data_version, **params, **fields
+    )
+
+
+def redraw_if_data_changed(data_version):
+    """Rerun the whole page if another session has loaded newer data since this page was drawn"""
+    if TENANT_STATE['store']['data_version'] != data_version:
+        st.rerun()
+
+
 # Main application
 
-# Display SMEI Logo and Header
+# Caches and shared data for this tenant only, so one college's working set can't evict another's
+TENANT_STATE = get_tenant_state(TENANT['id'], TENANT['cache_entries'], TENANT['cache_mb'])
+TELEMETRY = get_telemetry()
+register_cache(TELEMETRY, TENANT['id'], 'app', TENANT_STATE['cache'])
+
+# Staff view - which courses, students and columns this page works on (pinned by SMEI_VIEW, or ?view= where the college allows it)
+try:
+    VIEW = select_view(TENANT, st.query_params.get("view"))
+except ValueError as e:
+    st.error(f"Error selecting view: {e}")
+    st.stop()
+
+# Assessment rules - loaded from the tenant's rules file, recompiled only when the file changes
+try:
+    rules = get_rules(TENANT['rules'])
+except (OSError, ValueError) as e:
+    st.error(f"Error loading assessment rules: {e}")
+    st.stop()
+
+ASSESSMENT_RULES = rules['courses']
+ASSESSMENT_ORDER = rules['assessment_order']
+COURSES = [course for course in ASSESSMENT_RULES if not VIEW['courses'] or course in VIEW['courses']]
+
+# Display Tenant Logo and Header
 st.markdown('<div class="logo-container">', unsafe_allow_html=True)
-logo_displayed = load_and_display_logo()
+logo_displayed = load_and_display_logo(TENANT)
 st.markdown('</div>', unsafe_allow_html=True)
 
-st.title("🎓 SMEI Student Progression")
+st.title(f"🎓 {TENANT['short_name']} Student Progression")
 
 # Load data
-df = load_student_data()
+all_students_df = load_student_data(TENANT, TENANT_STATE)
+data_version = TENANT_STATE['store']['data_version']
+
+# The rest of the page works on this view's projection - restricted rows, hidden columns already dropped
+if not all_students_df.empty:
+    df = get_view_frame(TENANT_STATE['views'], VIEW, all_students_df, data_version)
+else:
+    df = all_students_df
+view_version = f"{data_version}:{VIEW['name']}"
+view_rosters = get_view_rosters(TENANT_STATE, VIEW['name'])
+
+# Start precomputing assessment rosters for this data version (no-op if already warm)
+if not df.empty:
+    warm_roster_cache(view_rosters, df, view_version, ASSESSMENT_ORDER, COURSES, rules)
 
 # Quick Stats in Sidebar - UPDATED: Removed Avg Attendance and Avg Progression
 st.sidebar.header("📊 Quick Stats")
+st.sidebar.caption(f"View: {VIEW['label']}")
 
 if not df.empty:
     total_students = len(df)
-    eap_students = len(df[df['Course'] == 'EAP'])
-    ge_students = len(df[df['Course'] == 'General English'])
+    course_counts = df['Course'].value_counts()
 
     st.sidebar.metric("Total Students", total_students)
-    st.sidebar.metric("EAP Students", eap_students)
-    st.sidebar.metric("GE Students", ge_students)
+    for course in COURSES:
+        st.sidebar.metric(f"{ASSESSMENT_RULES[course]['short_name']} Students", int(course_counts.get(course, 0)))
 
 # Search and Filter Section - IMPROVED VERSION
-st.markdown('<div class="filter-section">', unsafe_allow_html=True)
 st.subheader("🔍 Search & Filter Options")
 
-# Main search type selection
-col1, col2 = st.columns([1, 2])
+filter_col, _ = st.columns([1, 2])
 
-with col1:
-    search_type = st.radio("Search by:", ["Student Name/ID", "Assessment Test"])
-
-with col2:
-    # Course filter (common for both search types)
+with filter_col:
+    # Course filter (common for both search types and the Score Statistics below) - changing it redraws the whole page
     course_filter = st.selectbox(
         "Filter by Course:",
-        ["All Courses", "General English", "EAP"]
+        ["All Courses"] + COURSES
     )
 
-# Conditional filters based on search type - UPDATED: Moved date filter to Student search
-if search_type == "Student Name/ID":
-    col3, col4, col5 = st.columns(3)  # Added extra column for date filter
-    
-    with col3:
-        # Attendance filter only for Student search
-        attendance_filter = st.selectbox(
-            "Filter by Attendance:",
-            ["All", "Good (≥80%)", "Warning (50-79%)", "Poor (0-49%)"]
-        )
-    
-    with col4:
-        # Progression rate filter
-        progression_filter = st.selectbox(
-            "Filter by Progression:",
-            ["All", "Excellent (90-100%)", "Good (50-89%)", "Poor (0-49%)"]
-        )
-    
-    with col5:
-        # Date filter for upcoming completions - MOVED to Student search
-        show_upcoming = st.checkbox("Show students finishing soon (within 30 days)")
 
-else:  # Assessment Test search
-    col3, col4 = st.columns(2)
-    
-    with col3:
-        # Status filter only for Assessment search
-        status_filter = st.radio(
-            "Show students with status:",
-            ["All", "Pending + Failed", "Pending", "Failed", "Passed"],
-            horizontal=True
-        )
-    
-    with col4:
-        # Date filter for upcoming completions - Now available for Assessment search too
-        show_upcoming_assessment = st.checkbox("Show students finishing soon (within 30 days)")
+# Search, filters and results - UPDATED: a fragment, so widget changes here only rerun this section
+@st.fragment
+def show_search_section(df, data_version, view_version, view_rosters, course_filter):
+    redraw_if_data_changed(data_version)
 
-st.markdown('</div>', unsafe_allow_html=True)
+    # Opened and closed inside the fragment, so a fragment rerun writes both tags
+    st.markdown('<div class="filter-section">', unsafe_allow_html=True)
 
-# Apply course filter to base dataset - FIXED: Added check for empty dataframe
-if not df.empty:
-    if course_filter == "General English":
-        base_filtered_df = df[df['Course'] == 'General English']
-    elif course_filter == "EAP":
-        base_filtered_df = df[df['Course'] == 'EAP']
-    else:
-        base_filtered_df = df.copy()
-else:
-    base_filtered_df = pd.DataFrame()  # Empty dataframe if no data loaded
+    # Main search type selection
+    search_type = st.radio("Search by:", ["Student Name/ID", "Assessment Test"], horizontal=True)
 
-# For Student search: apply attendance and progression filters - FIXED: Added check for empty dataframe
-if search_type == "Student Name/ID" and not df.empty:
-    filtered_df = base_filtered_df.copy()
-    
-    # Apply attendance filter
-    if attendance_filter == "Good (≥80%)":
-        filtered_df = filtered_df[filtered_df['Attendance'] >= 80]
-    elif attendance_filter == "Warning (50-79%)":
-        filtered_df = filtered_df[(filtered_df['Attendance'] >= 50) & (filtered_df['Attendance'] < 80)]
-    elif attendance_filter == "Poor (0-49%)":
-        filtered_df = filtered_df[filtered_df['Attendance'] < 50]
-    
-    # Apply progression filter
-    if progression_filter == "Excellent (90-100%)":
-        filtered_df = filtered_df[filtered_df['Progression Rate'] >= 90]
-    elif progression_filter == "Good (50-89%)":
-        filtered_df = filtered_df[(filtered_df['Progression Rate'] >= 50) & (filtered_df['Progression Rate'] < 90)]
-    elif progression_filter == "Poor (0-49%)":
-        filtered_df = filtered_df[filtered_df['Progression Rate'] < 50]
-    
-    # Apply date filter if selected - ADDED for Student search
-    if show_upcoming:
-        today = pd.Timestamp.now()
-        thirty_days_later = today + pd.Timedelta(days=30)
-        filtered_df = filtered_df[
-            (filtered_df['Finish Date'] >= today) & 
-            (filtered_df['Finish Date'] <= thirty_days_later)
-        ]
-
-# For Assessment search: we'll handle filtering in the assessment function
-else:
-    filtered_df = base_filtered_df.copy()
+    # Conditional filters based on search type - UPDATED: Moved date filter to Student search
+    if search_type == "Student Name/ID":
+        col3, col4, col5 = st.columns(3)  # Added extra column for date filter
 
-# Display results based on search type - FIXED: Added check for empty dataframe
-if search_type == "Student Name/ID":
-    # Simplified search interface - single search box for both name and ID
-    search_term = st.text_input("Enter student name/ID:")
-    
-    if search_term and not df.empty:
-        # Search in both Name and StudentID columns
-        name_results = filtered_df[filtered_df['Name'].str.contains(search_term, case=False, na=False)]
-        id_results = filtered_df[filtered_df['StudentID'].astype(str).str.contains(search_term, case=False, na=False)]
-        
-        # Combine results and remove duplicates
-        results = pd.concat([name_results, id_results]).drop_duplicates().reset_index(drop=True)
-        
-        if not results.empty:
-            # Student selection
-            if len(results) > 1:
-                selected_student_name = st.selectbox(
-                    "Select Student:",
-                    results['Name'].tolist()
-                )
-                student_data = results[results['Name'] == selected_student_name].iloc[0]
-            else:
-                student_data = results.iloc[0]
+        with col3:
+            # Attendance filter only for Student search
+            attendance_filter = st.selectbox(
+                "Filter by Attendance:",
+                ["All", "Good (≥80%)", "Warning (50-79%)", "Poor (0-49%)"]
+            )
+
+        with col4:
+            # Progression rate filter
+            progression_filter = st.selectbox(
+                "Filter by Progression:",
+                ["All", "Excellent (90-100%)", "Good (50-89%)", "Poor (0-49%)"]
+            )
 
-            # Calculate test status
-            test_status = calculate_test_status(student_data)
+        with col5:
+            # Date filter for upcoming completions - MOVED to Student search
+            show_upcoming = st.checkbox("Show students finishing soon (within 30 days)")
 
-            # Display student information
-            st.markdown(f'<div class="student-info">', unsafe_allow_html=True)
+    else:  # Assessment Test search
+        col3, col4 = st.columns(2)
 
-            st.subheader(f"Student Information: {student_data['Name']}")
+        with col3:
+            # Status filter only for Assessment search
+            status_filter = st.radio(
+                "Show students with status:",
+                list(STATUS_FILTERS),
+                horizontal=True
+            )
 
-            col1, col2, col3, col4 = st.columns(4)
+        with col4:
+            # Date filter for upcoming completions - Now available for Assessment search too
+            show_upcoming_assessment = st.checkbox("Show students finishing soon (within 30 days)")
 
-            with col1:
-                st.write(f"**Student ID:** {student_data['StudentID']}")
-                st.write(f"**Course:** {student_data['Course']}")
+    st.markdown('</div>', unsafe_allow_html=True)
 
-            with col2:
-                st.write(f"**Start Date:** {student_data['Start Date'].strftime('%Y-%m-%d')}")
-                st.write(f"**End Date:** {student_data['Finish Date'].strftime('%Y-%m-%d')}")
+    # Apply course filter to base dataset - FIXED: Added check for empty dataframe
+    filter_started = time.perf_counter()
+    if not df.empty:
+        if course_filter in ASSESSMENT_RULES:
+            base_filtered_df = df[df['Course'] == course_filter]
+        else:
+            base_filtered_df = df.copy()
+    else:
+        base_filtered_df = pd.DataFrame()  # Empty dataframe if no data loaded
+
+    # For Student search: apply attendance and progression filters - FIXED: Added check for empty dataframe
+    if search_type == "Student Name/ID" and not df.empty:
+        filtered_df = base_filtered_df.copy()
+
+        # Apply attendance filter
+        if attendance_filter == "Good (≥80%)":
+            filtered_df = filtered_df[filtered_df['Attendance'] >= 80]
+        elif attendance_filter == "Warning (50-79%)":
+            filtered_df = filtered_df[(filtered_df['Attendance'] >= 50) & (filtered_df['Attendance'] < 80)]
+        elif attendance_filter == "Poor (0-49%)":
+            filtered_df = filtered_df[filtered_df['Attendance'] < 50]
+
+        # Apply progression filter
+        if progression_filter == "Excellent (90-100%)":
+            filtered_df = filtered_df[filtered_df['Progression Rate'] >= 90]
+        elif progression_filter == "Good (50-89%)":
+            filtered_df = filtered_df[(filtered_df['Progression Rate'] >= 50) & (filtered_df['Progression Rate'] < 90)]
+        elif progression_filter == "Poor (0-49%)":
+            filtered_df = filtered_df[filtered_df['Progression Rate'] < 50]
+
+        # Apply date filter if selected - ADDED for Student search
+        if show_upcoming:
+            today = pd.Timestamp.now()
+            thirty_days_later = today + pd.Timedelta(days=30)
+            filtered_df = filtered_df[
+                (filtered_df['Finish Date'] >= today) & 
+                (filtered_df['Finish Date'] <= thirty_days_later)
+            ]
+
+        audit('filter', filter_started, {
+            'course': course_filter, 'attendance': attendance_filter,
+            'progression': progression_filter, 'upcoming': show_upcoming
+        }, students=len(filtered_df))
+
+    # For Assessment search: we'll handle filtering in the assessment function
+    else:
+        filtered_df = base_filtered_df.copy()
+
+    # Display results based on search type - FIXED: Added check for empty dataframe
+    if search_type == "Student Name/ID":
+        # Simplified search interface - single search box for both name and ID
+        search_term = st.text_input("Enter student name/ID:")
+
+        if search_term and not df.empty:
+            search_started = time.perf_counter()
+            # Search in both Name and StudentID columns
+            name_matches = filtered_df['Name'].str.contains(search_term, case=False, na=False)
+            id_matches = filtered_df['StudentID'].str.contains(search_term, case=False, na=False)
+
+            # Combine results in one pass, keeping the original row labels so students are selected by ID
+            results = filtered_df[name_matches | id_matches]
+            audit('search', search_started, {'term': search_term, 'course': course_filter}, matches=len(results))
+
+            if not results.empty:
+                # Bulk detail mode - compare every matching student at once
+                compare_mode = len(results) > 1 and st.checkbox(f"Compare all {len(results)} matching students")
+
+                if compare_mode:
+                    status_matrix, required_matrix, _ = get_status_matrices(df, view_version, rules)
+                    show_progress_matrix(results, status_matrix, required_matrix)
+                    student_data = None
+                # Student selection - by StudentID so students sharing a name can be told apart
+                elif len(results) > 1:
+                    selected_label = st.selectbox(
+                        "Select Student:",
+                        results.index.tolist(),
+                        format_func=lambda label: f"{results.at[label, 'StudentID']} - {results.at[label, 'Name']}"
+                    )
+                    student_data = results.loc[selected_label]
+                else:
+                    student_data = results.iloc[0]
+
+                if student_data is not None:
+                    # Calculate test status
+                    test_status = calculate_test_status(student_data, rules)
+
+                    # Display student information
+                    st.markdown(f'<div class="student-info">', unsafe_allow_html=True)
+
+                    st.subheader(f"Student Information: {student_data['Name']}")
+
+                    col1, col2, col3, col4 = st.columns(4)
+
+                    with col1:
+                        st.write(f"**Student ID:** {student_data['StudentID']}")
+                        st.write(f"**Course:** {student_data['Course']}")
+
+                    with col2:
+                        st.write(f"**Start Date:** {format_date(student_data['Start Date'])}")
+                        st.write(f"**End Date:** {format_date(student_data['Finish Date'])}")
+
+                    with col3:
+                        st.write(f"**Duration:** {student_data['Duration (weeks)']} weeks")
+                        # Phone numbers are read as text with their leading 0 (not shown in views that hide it)
+                        if 'Phone' in student_data:
+                            st.write(f"**Phone:** {student_data['Phone']}")
+
+                    with col4:
+                        attendance = student_data.get('Attendance', 0)
+                        attendance_status, attendance_class = get_attendance_status(attendance)
+                        st.write(f"**Attendance:** <span class='{attendance_class}'>{attendance}% ({attendance_status})</span>", unsafe_allow_html=True)
+
+                        progression_rate = student_data.get('Progression Rate', 0)
+                        progression_status, progression_class = get_progression_status(progression_rate)
+                        st.write(f"**Progression:** <span class='{progression_class}'>{progression_rate:.1f}% ({progression_status})</span>", unsafe_allow_html=True)
+
+                    st.markdown('</div>', unsafe_allow_html=True)
+
+                    # Display test status summary with Remaining Tests
+                    st.subheader("📋 Assessment Status Summary")
+
+                    col1, col2, col3, col4 = st.columns(4)
+
+                    with col1:
+                        st.metric("Required Tests", len(test_status['required_tests']))
+                    with col2:
+                        st.metric("Passed", len(test_status['passed_tests']))
+                    with col3:
+                        st.metric("Failed", len(test_status['failed_tests']))
+                    with col4:
+                        st.metric("Remaining Tests", test_status['remaining_tests'])
+
+                    # Display simplified test status table
+                    st.subheader("📝 Assessment Status")
+
+                    # Create a table with all required tests and their status
+                    test_data = []
+                    for test in test_status['required_tests']:
+                        detail = test_status['test_details'][test]
+
+                        # Determine status display and row class
+                        if detail['type'] == 'passed':
+                            status_display = "✅ Passed"
+                            row_class = "status-passed-row"
+                        elif detail['type'] == 'failed':
+                            status_display = "❌ Failed"
+                            row_class = "status-failed-row"
+                        else:
+                            status_display = "⏳ Pending"
+                            row_class = "status-pending-row"
+
+                        test_data.append({
+                            'Assessment': test,
+                            'Status': status_display,
+                            'Recorded Value': detail['value'] if detail['value'] else 'Not Recorded'
+                        })
+
+                    if test_data:
+                        # Create a DataFrame for the table
+                        test_df = pd.DataFrame(test_data)
+
+                        # Display as a styled table
+                        st.markdown("""
+                        <table class="test-table">
+                            <thead>
+                                <tr>
+                                    <th>Assessment</th>
+                                    <th>Status</th>
+                                    <th>Recorded Value</th>
+                                </tr>
+                            </thead>
+                            <tbody>
+                        """, unsafe_allow_html=True)
+
+                        for idx, row in test_df.iterrows():
+                            # Determine row class based on status
+                            if "✅" in row['Status']:
+                                row_class = "status-passed-row"
+                            elif "❌" in row['Status']:
+                                row_class = "status-failed-row"
+                            else:
+                                row_class = "status-pending-row"
+
+                            st.markdown(f"""
+                            <tr class="{row_class}">
+                                <td>{row['Assessment']}</td>
+                                <td>{row['Status']}</td>
+                                <td>{row['Recorded Value']}</td>
+                            </tr>
+                            """, unsafe_allow_html=True)
+
+                        st.markdown("</tbody></table>", unsafe_allow_html=True)
+                    else:
+                        st.info("No assessment data available")
 
-            with col3:
-                st.write(f"**Duration:** {student_data['Duration (weeks)']} weeks")
-                # Format phone number to ensure it starts with 0
-                phone = format_phone(student_data['Phone'])
-                st.write(f"**Phone:** {phone}")
+            else:
+                st.warning("No matching students found")
 
-            with col4:
-                attendance = student_data.get('Attendance', 0)
-                attendance_status, attendance_class = get_attendance_status(attendance)
-                st.write(f"**Attendance:** <span class='{attendance_class}'>{attendance}% ({attendance_status})</span>", unsafe_allow_html=True)
-                
-                progression_rate = student_data.get('Progression Rate', 0)
-                progression_status, progression_class = get_progression_status(progression_rate)
-                st.write(f"**Progression:** <span class='{progression_class}'>{progression_rate:.1f}% ({progression_status})</span>", unsafe_allow_html=True)
+        elif search_term:
+            st.warning("No data available. Please check if the Excel file is properly loaded.")
+        else:
+            st.info("👆 Enter a student name or ID to search")
 
-            st.markdown('</div>', unsafe_allow_html=True)
+    else:  # Assessment Test search
+        # Get assessments in correct order
+        all_assessments = [assessment for assessment in ASSESSMENT_ORDER 
+                          if any(assessment in course_rules['assessments'] for course_rules in ASSESSMENT_RULES.values())]
 
-            # Display test status summary with Remaining Tests
-            st.subheader("📋 Assessment Status Summary")
+        assessment_search = st.selectbox(
+            "Select Assessment to Search:",
+            ["Select an assessment"] + all_assessments
+        )
 
-            col1, col2, col3, col4 = st.columns(4)
+        if assessment_search != "Select an assessment" and not df.empty:
+            # Rosters come from the warm cache (or are built on demand); the status filter is a precomputed row mask
+            roster_course = course_filter if course_filter in ASSESSMENT_RULES else "All"
+            roster_started = time.perf_counter()
+            roster_entry, from_cache = get_roster_entry(
+                view_rosters,
+                df,
+                view_version,
+                assessment_search,
+                roster_course,
+                show_upcoming_assessment,  # Pass the date filter to the function
+                rules
+            )
+            roster = roster_entry['roster']
+            status_mask = roster_entry['masks'][status_filter]
+            roster_metrics = roster_entry['metrics'][status_filter]
+            audit('roster', roster_started, {
+                'assessment': assessment_search, 'course': roster_course,
+                'status': status_filter, 'upcoming': show_upcoming_assessment
+            }, 'hit' if from_cache else 'miss', students=roster_metrics['Total Students'])
+            roster_key = (view_version, assessment_search, roster_course, show_upcoming_assessment, pd.Timestamp.now().date())
+
+            if roster_metrics['Total Students'] > 0:
+                st.subheader(f"📊 Students Requiring: {assessment_search}")
+
+                # Display summary
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("Total Students", roster_metrics['Total Students'])
+                with col2:
+                    st.metric("Passed", roster_metrics['Passed'])
+                with col3:
+                    st.metric("Failed", roster_metrics['Failed'])
+                with col4:
+                    st.metric("Pending", roster_metrics['Pending'])
+
+                # Display detailed table with all requested columns including attendance and progression
+                display_cols = ['StudentID', 'Name', 'Course', 'Start Date', 'Finish Date', 'Duration (weeks)', 'Attendance', 'Progression Rate', 'Phone', 'Status', 'Recorded Value']
+                display_cols = [col for col in display_cols if col in roster.columns]
+                show_paginated_table(roster, roster_key, display_cols, "assessment_table", mask=status_mask)
+            else:
+                st.info(f"No students require {assessment_search} with current filters")
+        elif assessment_search != "Select an assessment":
+            st.warning("No data available. Please check if the Excel file is properly loaded.")
 
-            with col1:
-                st.metric("Required Tests", len(test_status['required_tests']))
-            with col2:
-                st.metric("Passed", len(test_status['passed_tests']))
-            with col3:
-                st.metric("Failed", len(test_status['failed_tests']))
-            with col4:
-                st.metric("Remaining Tests", test_status['remaining_tests'])
+    # Display all students with enhanced information including progression rate - FIXED: Added check for empty dataframe
+    if not df.empty and search_type == "Student Name/ID" and not search_term:
+        st.subheader("👥 All Students")
 
-            # Display simplified test status table
-            st.subheader("📝 Assessment Status")
+        # Enhanced display with all requested columns including attendance and progression
+        display_cols = ['StudentID', 'Name', 'Course', 'Start Date', 'Finish Date', 'Duration (weeks)', 'Attendance', 'Progression Rate', 'Phone']
+        display_cols = [col for col in display_cols if col in df.columns]
+        show_paginated_table(df, view_version, display_cols, "students_table", mask=df.index.isin(filtered_df.index))
 
-            # Create a table with all required tests and their status
-            test_data = []
-            for test in test_status['required_tests']:
-                detail = test_status['test_details'][test]
-                
-                # Determine status display and row class
-                if detail['type'] == 'passed':
-                    status_display = "✅ Passed"
-                    row_class = "status-passed-row"
-                elif detail['type'] == 'failed':
-                    status_display = "❌ Failed"
-                    row_class = "status-failed-row"
-                else:
-                    status_display = "⏳ Pending"
-                    row_class = "status-pending-row"
-                
-                test_data.append({
-                    'Assessment': test,
-                    'Status': status_display,
-                    'Recorded Value': detail['value'] if detail['value'] else 'Not Recorded'
-                })
+        # Class list comparison - paste StudentIDs to see their assessment matrix side by side
+        with st.expander("📋 Compare a Class List"):
+            class_list = st.text_area("Paste StudentIDs (one per line or comma separated):", key="class_list")
+            class_ids = [sid.strip() for sid in re.split(r'[,\s]+', class_list) if sid.strip()]
 
-            if test_data:
-                # Create a DataFrame for the table
-                test_df = pd.DataFrame(test_data)
-                
-                # Display as a styled table
-                st.markdown("""
-                <table class="test-table">
-                    <thead>
-                        <tr>
-                            <th>Assessment</th>
-                            <th>Status</th>
-                            <th>Recorded Value</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-                """, unsafe_allow_html=True)
-                
-                for idx, row in test_df.iterrows():
-                    # Determine row class based on status
-                    if "✅" in row['Status']:
-                        row_class = "status-passed-row"
-                    elif "❌" in row['Status']:
-                        row_class = "status-failed-row"
+            if class_ids:
+                class_students = df[df['StudentID'].isin(class_ids)]
+                missing_ids = sorted(set(class_ids) - set(class_students['StudentID']))
+
+                if not class_students.empty:
+                    status_matrix, required_matrix, _ = get_status_matrices(df, view_version, rules)
+                    show_progress_matrix(class_students, status_matrix, required_matrix)
+                if missing_ids:
+                    st.warning(f"Unknown Student IDs: {', '.join(missing_ids)}")
+
+        # Summary statistics - UPDATED: Removed Avg Progression
+        st.subheader("📈 Summary Statistics")
+        summary_cols = st.columns(len(COURSES) + 1)
+        filtered_counts = filtered_df['Course'].value_counts()
+
+        with summary_cols[0]:
+            st.metric("Total Students", len(filtered_df))
+        for summary_col, course in zip(summary_cols[1:], COURSES):
+            with summary_col:
+                st.metric(f"{ASSESSMENT_RULES[course]['short_name']} Students", int(filtered_counts.get(course, 0)))
+
+
+show_search_section(df, data_version, view_version, view_rosters, course_filter)
+
+# Record Results Section - appends to the results journal instead of rewriting the workbook
+if not df.empty:
+    st.markdown("---")
+    st.subheader("📝 Record Assessment Results")
+
+    with st.expander("Enter results for a student or paste a whole assessment"):
+        # Messages from the recording that triggered this rerun
+        for message_type, message in st.session_state.pop('record_messages', []):
+            getattr(st, message_type)(message)
+
+        single_tab, bulk_tab, import_tab = st.tabs(["Single Student", "Bulk Paste", "Import File"])
+        student_names = dict(zip(df['StudentID'], df['Name']))
+
+        with single_tab:
+            with st.form("record_single_result", clear_on_submit=True):
+                entry_col1, entry_col2, entry_col3 = st.columns(3)
+                with entry_col1:
+                    entry_student = st.selectbox(
+                        "Student:",
+                        list(student_names),
+                        format_func=lambda sid: f"{sid} - {student_names[sid]}"
+                    )
+                with entry_col2:
+                    entry_assessment = st.selectbox("Assessment:", ASSESSMENT_ORDER)
+                with entry_col3:
+                    entry_value = st.text_input("Result (score or Passed/Failed):")
+
+                if st.form_submit_button("Record Result"):
+                    if entry_value.strip():
+                        record_results([(entry_student, entry_assessment, entry_value)], TENANT['journal'])
+                        rerun_with_messages([('success', f"Recorded {entry_assessment} for {entry_student}")])
                     else:
-                        row_class = "status-pending-row"
-                        
-                    st.markdown(f"""
-                    <tr class="{row_class}">
-                        <td>{row['Assessment']}</td>
-                        <td>{row['Status']}</td>
-                        <td>{row['Recorded Value']}</td>
-                    </tr>
-                    """, unsafe_allow_html=True)
-                
-                st.markdown("</tbody></table>", unsafe_allow_html=True)
-            else:
-                st.info("No assessment data available")
+                        st.warning("Please enter a result value")
+
+        with bulk_tab:
+            with st.form("record_bulk_results"):
+                bulk_assessment = st.selectbox("Assessment:", ASSESSMENT_ORDER, key="bulk_assessment")
+                bulk_text = st.text_area(
+                    "Paste one 'StudentID, result' per line:",
+                    height=200,
+                    placeholder="SMEI25828, 72\nSMEI25681, Passed"
+                )
+
+                if st.form_submit_button("Record Results"):
+                    pairs, skipped = parse_pasted_results(bulk_text)
+                    unknown = [sid for sid, _ in pairs if sid not in student_names]
+                    records = [(sid, bulk_assessment, value) for sid, value in pairs if sid in student_names]
+
+                    messages = []
+                    if records:
+                        record_results(records, TENANT['journal'])
+                        messages.append(('success', f"Recorded {len(records)} results for {bulk_assessment}"))
+                    if unknown:
+                        messages.append(('warning', f"Unknown Student IDs skipped: {', '.join(unknown)}"))
+                    if skipped:
+                        messages.append(('warning', f"Unreadable lines skipped: {len(skipped)}"))
+                    if not messages:
+                        messages.append(('warning', "Nothing to record"))
+
+                    if records:
+                        rerun_with_messages(messages)
+                    for message_type, message in messages:
+                        getattr(st, message_type)(message)
+
+        with import_tab:
+            uploaded_scores = st.file_uploader(
+                "Examiner file with StudentID and score columns:",
+                type=["csv", "xlsx"]
+            )
+
+            if uploaded_scores is not None:
+                try:
+                    score_column, import_report = get_import_report(uploaded_scores, df, view_version, rules)
+                except ValueError as e:
+                    st.error(f"Could not read the uploaded file: {e}")
+                    import_report = None
+
+                if import_report is not None:
+                    default_assessment = ASSESSMENT_ORDER.index(score_column) if score_column in ASSESSMENT_ORDER else 0
+                    import_assessment = st.selectbox(
+                        "Assessment:",
+                        ASSESSMENT_ORDER,
+                        index=default_assessment,
+                        key="import_assessment"
+                    )
+
+                    valid_scores = import_report['valid']
+                    import_col1, import_col2, import_col3, import_col4 = st.columns(4)
+                    with import_col1:
+                        st.metric("Rows Read", import_report['total_rows'])
+                    with import_col2:
+                        st.metric("Valid Results", len(valid_scores))
+                    with import_col3:
+                        st.metric("Unknown IDs", len(import_report['unknown_ids']))
+                    with import_col4:
+                        st.metric("Unparseable Values", len(import_report['unparseable']))
+
+                    if not valid_scores.empty:
+                        st.caption(
+                            f"Passed: {(valid_scores['Status'] == 'Passed').sum()} | "
+                            f"Failed: {(valid_scores['Status'] == 'Failed').sum()}"
+                        )
+                    if import_report['unknown_ids']:
+                        st.warning(f"Unknown Student IDs: {', '.join(import_report['unknown_ids'])}")
+                    if not import_report['unparseable'].empty:
+                        st.warning("Values that are neither a score nor Passed/Failed:")
+                        st.dataframe(import_report['unparseable'], use_container_width=True)
+                    if import_report['missing_id_count']:
+                        st.warning(f"{import_report['missing_id_count']} rows with a score but no Student ID were skipped")
+                    if import_report['duplicate_ids']:
+                        st.info(f"Listed more than once (last value used): {', '.join(import_report['duplicate_ids'])}")
+                    if import_report['blank_count']:
+                        st.info(f"{import_report['blank_count']} rows with no score were skipped")
+
+                    if st.button(f"Apply {len(valid_scores)} Results", disabled=valid_scores.empty):
+                        apply_scores(import_report, import_assessment, TENANT['journal'])
+                        rerun_with_messages([('success', f"Imported {len(valid_scores)} results for {import_assessment}")])
+
+        pending_compaction = superseded_count(TENANT['journal'])
+        if pending_compaction > 0:
+            st.caption(f"{pending_compaction} superseded result records in the journal")
+            if st.button("Compact Results Journal"):
+                removed = compact_journal(TENANT['journal'])
+                st.success(f"Removed {removed} superseded records")
+
+# Data Quality Section - admin only, problems in the workbook that would otherwise give wrong results quietly
+@st.fragment
+def show_quality_problems(quality_report):
+    st.dataframe(quality_summary(quality_report), use_container_width=True)
+
+    quality_check = st.selectbox(
+        "Show problems:",
+        ["All"] + quality_report['Check'].unique().tolist(),
+        key="quality_check"
+    )
+    shown = quality_report if quality_check == "All" else quality_report[quality_report['Check'] == quality_check]
+    st.dataframe(shown, use_container_width=True, hide_index=True)
+    st.caption(
+        "Scanned after results recorded in the app are merged in: fix workbook values in the workbook and "
+        "re-record results entered in the app - the app never changes the source data"
+    )
+
+
+quality_future = TENANT_STATE['store']['quality']
+if not df.empty and VIEW['role'] == 'admin' and quality_future is not None:
+    st.markdown("---")
+    st.subheader("🩺 Data Quality")
+
+    try:
+        quality_report = quality_future.result()
+    except Exception as e:
+        quality_report = None
+        st.error(f"Data quality scan failed: {e}")
 
+    if quality_report is not None:
+        if quality_report.empty:
+            st.success("No data quality problems found in the current data")
         else:
-            st.warning("No matching students found")
-    
-    elif search_term:
-        st.warning("No data available. Please check if the Excel file is properly loaded.")
+            with st.expander(f"{quality_report['StudentID'].nunique()} students with {len(quality_report)} data problems"):
+                show_quality_problems(quality_report)
+
+# Score Statistics Section - distribution of numeric scores per assessment
+@st.fragment
+def show_score_statistics(df, view_version, course_filter):
+    stats_df, histograms_df = get_score_statistics(df, view_version, course_filter, rules)
+
+    if stats_df.empty:
+        st.info("No numeric scores have been recorded yet (Passed/Failed entries have no score)")
     else:
-        st.info("👆 Enter a student name or ID to search")
+        st.caption(f"Course: {course_filter}. Only numeric scores are included; Passed/Failed entries without a score are excluded.")
+        st.dataframe(stats_df, use_container_width=True)
 
-else:  # Assessment Test search
-    # Get assessments in correct order
-    all_assessments = [assessment for assessment in ASSESSMENT_ORDER 
-                      if assessment in ASSESSMENT_RULES['General English']['assessments'] or 
-                      assessment in ASSESSMENT_RULES['EAP']['assessments']]
-    
-    assessment_search = st.selectbox(
-        "Select Assessment to Search:",
-        ["Select an assessment"] + all_assessments
+        histogram_assessment = st.selectbox("Score distribution for:", stats_df.index.tolist(), key="histogram_assessment")
+        st.bar_chart(histograms_df[histogram_assessment])
+
+
+if not df.empty:
+    st.markdown("---")
+    st.subheader("📊 Score Statistics")
+
+    with st.expander("Score distribution for each assessment"):
+        show_score_statistics(df, view_version, course_filter)
+
+# Test Session Planner Section - next due assessment for every student, batched into rooms
+@st.fragment
+def show_session_planner(df, view_version):
+    weeks_col, capacity_col, _ = st.columns([1, 1, 2])
+    with weeks_col:
+        plan_weeks = st.number_input("Weeks to plan:", min_value=1, max_value=26, value=PLAN_WEEKS, key="plan_weeks")
+    with capacity_col:
+        room_capacity = st.number_input("Room capacity:", min_value=1, value=TENANT['room_capacity'], key="room_capacity")
+
+    plan_df, sessions_df = get_session_plan(df, view_version, int(room_capacity), int(plan_weeks), rules)
+
+    if sessions_df.empty:
+        st.info("No students are due to sit an assessment in this period")
+        return
+
+    session_table = sessions_df.copy()
+    session_table['Week Starting'] = session_table['Week Starting'].apply(format_date)
+    st.dataframe(session_table, use_container_width=True, hide_index=True)
+    st.caption(f"{len(plan_df)} students in {len(sessions_df)} sessions. Overdue tests and resits are placed in this week's sessions.")
+
+    session_labels = [
+        f"{format_date(week)} - {assessment} - Session {session}"
+        for week, assessment, session in zip(sessions_df['Week Starting'], sessions_df['Assessment'], sessions_df['Session'])
+    ]
+    selected = st.selectbox("Students in session:", range(len(session_labels)), format_func=session_labels.__getitem__, key="plan_session")
+    week, assessment, session = sessions_df.iloc[selected][['Week Starting', 'Assessment', 'Session']]
+    session_students = plan_df[
+        (plan_df['Week Starting'] == week) & (plan_df['Assessment'] == assessment) & (plan_df['Session'] == session)
+    ]
+    session_students = session_students[['StudentID', 'Name', 'Course', 'Due Date', 'Reason']].copy()
+    session_students['Due Date'] = session_students['Due Date'].apply(format_date)
+    st.dataframe(session_students, use_container_width=True, hide_index=True)
+
+    st.download_button(
+        label="Download Session Plan as CSV",
+        data=plan_df.to_csv(index=False).encode('utf-8'),
+        file_name=f"{TENANT['short_name']} Test Sessions.csv",
+        mime="text/csv",
+        on_click="ignore"
     )
-    
-    if assessment_search != "Select an assessment" and not df.empty:
-        # Map the status filter to the actual status values
-        actual_status_filter = "All"
-        if status_filter == "Pending + Failed":
-            actual_status_filter = "All"  # We'll filter manually for this case
-        elif status_filter != "All":
-            actual_status_filter = status_filter
-        
-        assessment_results = get_students_by_assessment(
-            base_filtered_df,  # Use base_filtered_df (only course filtered)
-            assessment_search, 
-            "General English" if course_filter == "General English" else 
-            "EAP" if course_filter == "EAP" else "All",
-            actual_status_filter,
-            show_upcoming_assessment  # Pass the date filter to the function
-        )
-        
-        # If "Pending + Failed" is selected, filter the results
-        if status_filter == "Pending + Failed":
-            assessment_results = assessment_results[assessment_results['Status'].isin(['Pending', 'Failed'])]
-        
-        if not assessment_results.empty:
-            st.subheader(f"📊 Students Requiring: {assessment_search}")
-            
-            # Display summary
-            total_students = len(assessment_results)
-            passed_students = len(assessment_results[assessment_results['Status'] == 'Passed'])
-            failed_students = len(assessment_results[assessment_results['Status'] == 'Failed'])
-            pending_students = len(assessment_results[assessment_results['Status'] == 'Pending'])
-            
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
-                st.metric("Total Students", total_students)
-            with col2:
-                st.metric("Passed", passed_students)
-            with col3:
-                st.metric("Failed", failed_students)
-            with col4:
-                st.metric("Pending", pending_students)
-            
-            # Format dates and phone numbers
-            display_results = assessment_results.copy()
-            display_results['Start Date'] = display_results['Start Date'].dt.strftime('%Y-%m-%d')
-            display_results['Finish Date'] = display_results['Finish Date'].dt.strftime('%Y-%m-%d')
-            display_results['Phone'] = display_results['Phone'].apply(format_phone)
-            
-            # Display detailed table with all requested columns including attendance and progression
-            display_cols = ['StudentID', 'Name', 'Course', 'Start Date', 'Finish Date', 'Duration (weeks)', 'Attendance', 'Progression Rate', 'Phone', 'Status', 'Recorded Value']
-            assessment_display_df = display_results[display_cols].copy()
-            
-            # Format attendance and progression with color coding
-            def format_attendance(val):
-                if pd.isna(val):
-                    return "No Data"
-                elif val >= 80:
-                    return f"🟢 {val}%"
-                elif val >= 50:
-                    return f"🟡 {val}%"
-                else:
-                    return f"🔴 {val}%"
-            
-            def format_progression(val):
-                if pd.isna(val):
-                    return "No Data"
-                elif val >= 90:
-                    return f"🟢 {val:.1f}%"
-                elif val >= 50:
-                    return f"🟡 {val:.1f}%"
-                else:
-                    return f"🔴 {val:.1f}%"
-            
-            assessment_display_df['Attendance'] = assessment_display_df['Attendance'].apply(format_attendance)
-            assessment_display_df['Progression Rate'] = assessment_display_df['Progression Rate'].apply(format_progression)
-            assessment_display_df.index = assessment_display_df.index + 1
-            st.dataframe(assessment_display_df, use_container_width=True)
-        else:
-            st.info(f"No students require {assessment_search} with current filters")
-    elif assessment_search != "Select an assessment":
-        st.warning("No data available. Please check if the Excel file is properly loaded.")
 
-# Display all students with enhanced information including progression rate - FIXED: Added check for empty dataframe
-if not df.empty and search_type == "Student Name/ID" and not search_term:
-    st.subheader("👥 All Students")
-    
-    # Enhanced display with all requested columns including attendance and progression
-    display_cols = ['StudentID', 'Name', 'Course', 'Start Date', 'Finish Date', 'Duration (weeks)', 'Attendance', 'Progression Rate', 'Phone']
-    display_df = filtered_df[display_cols].copy()
-    
-    # Format dates
-    display_df['Start Date'] = display_df['Start Date'].dt.strftime('%Y-%m-%d')
-    display_df['Finish Date'] = display_df['Finish Date'].dt.strftime('%Y-%m-%d')
-    
-    # Format phone numbers
-    display_df['Phone'] = display_df['Phone'].apply(format_phone)
-    
-    # Format attendance and progression with color coding
-    def format_attendance(val):
-        if pd.isna(val):
-            return "No Data"
-        elif val >= 80:
-            return f"🟢 {val}%"
-        elif val >= 50:
-            return f"🟡 {val}%"
-        else:
-            return f"🔴 {val}%"
-    
-    def format_progression(val):
-        if pd.isna(val):
-            return "No Data"
-        elif val >= 90:
-            return f"🟢 {val:.1f}%"
-        elif val >= 50:
-            return f"🟡 {val:.1f}%"
-        else:
-            return f"🔴 {val:.1f}%"
-    
-    display_df['Attendance'] = display_df['Attendance'].apply(format_attendance)
-    display_df['Progression Rate'] = display_df['Progression Rate'].apply(format_progression)
-    
-    display_df.index = display_df.index + 1
-    st.dataframe(display_df, use_container_width=True)
 
-    # Summary statistics - UPDATED: Removed Avg Progression
-    st.subheader("📈 Summary Statistics")
-    col1, col2, col3 = st.columns(3)
+if not df.empty:
+    st.markdown("---")
+    st.subheader("🗓️ Test Session Planner")
+
+    with st.expander("Plan the next test sessions by assessment and week"):
+        show_session_planner(df, view_version)
+
+# Progression Trends Section - rebuilt from the snapshot deltas, not from old workbooks
+@st.fragment
+def show_trends(data_version):
+    trend_assessment = st.selectbox("Assessment:", ASSESSMENT_ORDER, key="trend_assessment")
+    trend_df, recorded_versions = get_trend(trend_assessment, data_version)
+
+    if len(trend_df) > 1:
+        st.line_chart(trend_df[['Passed', 'Failed', 'Pending']])
+        st.line_chart(trend_df[['Pass Rate']])
+        trend_table = trend_df.copy()
+        trend_table.index = trend_table.index.strftime('%Y-%m-%d')
+        st.dataframe(trend_table.iloc[::-1], use_container_width=True)
+    else:
+        st.info("Trends appear once the data has been loaded in more than one week")
+    st.caption(f"Built from {recorded_versions} recorded data versions. Pass Rate = Passed / (Passed + Failed) among students required to take the assessment.")
 
-    with col1:
-        st.metric("Total Students", len(filtered_df))
-    with col2:
-        st.metric("EAP Students", len(filtered_df[filtered_df['Course'] == 'EAP']))
-    with col3:
-        st.metric("GE Students", len(filtered_df[filtered_df['Course'] == 'General English']))
+
+if not df.empty:
+    st.markdown("---")
+    st.subheader("📈 Progression Trends")
+
+    with st.expander("Weekly pass/fail/pending history for an assessment"):
+        show_trends(data_version)
 
 # Download Section - Added between main content and instructions
 if not df.empty:
@@ -987,17 +1275,21 @@ if not df.empty:
     st.markdown('<div class="download-section">', unsafe_allow_html=True)
     st.subheader("📥 Download Complete Student Data")
     
-    # Create Excel download
-    excel_buffer = create_excel_download(df)
-    if excel_buffer:
+    # Create Excel download - UPDATED: built once per data version, and downloading doesn't rerun the page
+    export_started = time.perf_counter()
+    export_cached = is_cached(TENANT_STATE['cache'], ('excel', view_version))
+    excel_data = get_excel_download(df, view_version, TENANT['sheet_name'])
+    audit('export', export_started, {'format': 'xlsx'}, 'hit' if export_cached else 'miss', students=len(df))
+    if excel_data:
         st.download_button(
             label="Download Full Dataset as Excel",
-            data=excel_buffer,
-            file_name="SMEI Student Progression.xlsx",
+            data=excel_data,
+            file_name=f"{TENANT['short_name']} Student Progression.xlsx",
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            help="Download the complete student dataset in Excel format without any filters applied"
+            help="Download the complete student dataset in Excel format without any filters applied",
+            on_click="ignore"
         )
-        st.caption("Excel file with sheet named 'SMEI' containing all student data without any filters applied")
+        st.caption(f"Excel file with sheet named '{TENANT['sheet_name']}' containing all student data in the {VIEW['label']} view without any filters applied")
     else:
         st.warning("Excel download is currently unavailable")
     
@@ -1010,10 +1302,12 @@ with st.expander("ℹ️ Instructions & Assessment Rules"):
     
     **Student Search Options:**
     1. **Search by Student Name/ID**: Find individual students and view their detailed progression
+        - When several students match, pick one by Student ID or tick **Compare all matching students** to see a pass/fail/pending matrix
+        - **Compare a Class List** (below All Students) shows the same matrix for pasted Student IDs
     2. **Search by Assessment Test**: Find all students who need to complete a specific assessment
     
     **Filter Options:**
-    - **Course Filter**: Filter by General English or EAP
+    - **Course Filter**: Filter by course
     - **Attendance Filter** (Student Search only): 
         - **Good (≥80%)**: Students meeting college attendance requirements
         - **Warning (50-79%)**: Students with moderate attendance
@@ -1056,14 +1350,50 @@ with st.expander("ℹ️ Instructions & Assessment Rules"):
     ## Data Export
     
     **Download Options:**
-    - **Excel Download**: Download all student data in Excel format with sheet name "SMEI"
+    - **Excel Download**: Download all student data in Excel format with sheet name '""" + TENANT['sheet_name'] + """'
     - The download contains the complete dataset including progression rates
     - Useful for backup purposes or further analysis in other tools
+    - Only the students and columns of your view are included
+    - Recorded results are included in the download
+    
+    ## Staff Views
+    
+    - Each college defines staff views in `tenants.json`. Pages open in the college's default view (the least privileged one unless `default_view` is set); run a deployment with `SMEI_VIEW=<name>` to pin another view, for example an admin instance behind the college login
+    - Choosing a view with `?view=<name>` in the URL only works for colleges that set `view_from_url`
+    - **Administrator** views show every column; **Course Coordinator** and **Teacher** views hide phone numbers
+    - A view can be limited to some courses and, for a teacher, to a class list of Student IDs
+    - Current view: **""" + VIEW['label'] + """**
+    
+    ## Data Quality
+    
+    - Administrators see a **Data Quality** report listing missing or duplicate Student IDs, unreadable dates, durations that don't match the Start and Finish Dates, attendance outside 0-100% and recorded results that are neither a score nor Passed/Failed
+    - The report is rebuilt in the background whenever the data changes
+    
+    ## Score Statistics
+    
+    - Mean, median, percentiles and score distribution for each assessment with numeric scores
+    - **Near Pass Mark** counts students who scored within 5 marks of the pass mark
+    - Follows the Course Filter above
+    
+    ## Progression Trends
+    
+    - Each time the data changes (workbook edit or recorded results) the app stores only the changed statuses and scores
+    - The trend view rebuilds weekly Passed/Failed/Pending counts, pass rate and mean score for an assessment from those changes
+    - `python alerts.py --all` (run from a scheduler) queues an alert for each student who newly failed a test or fell below 80% attendance since its last run; a mail relay sends them from the alerts outbox
+    - Older workbook copies can be added with `python snapshots.py <old workbook>.xlsx --taken-at <date> --tenant """ + TENANT['id'] + """`, oldest first and only for dates after the latest recorded snapshot
+    
+    ## Recording Results
+    
+    - **Single Student**: Record one result for a student and assessment
+    - **Bulk Paste**: Paste one `StudentID, result` line per student for an assessment (e.g. after a test day)
+    - **Import File**: Upload the examiners' CSV or Excel file with `StudentID` and score columns; unknown IDs and unreadable values are reported before anything is saved
+    - Results are saved to a results journal and shown immediately; the Excel file is not rewritten
+    - A newer result for the same student and assessment replaces the older one
     
     ## Assessment Status Definitions
     
-    - **✅ Passed**: Assessment completed successfully (keywords OR score ≥ 50)
-    - **❌ Failed**: Assessment completed but not passed (keywords OR score < 50)
+    - **✅ Passed**: Assessment completed successfully (keywords OR score ≥ """ + f"{rules['pass_mark']:g}" + """)
+    - **❌ Failed**: Assessment completed but not passed (keywords OR score < """ + f"{rules['pass_mark']:g}" + """)
     - **⏳ Pending**: Assessment not yet attempted
     
     ## Remaining Tests Calculation
@@ -1073,33 +1403,21 @@ with st.expander("ℹ️ Instructions & Assessment Rules"):
     
     ## Assessment Rules
     
-    **EAP Course:**
-    - 1-8 weeks: 1 assessment (Intermediate Mid Course Test)
-    - 9-14 weeks: 2 assessments (Intermediate Mid Course Test + Intermediate End Course Test)
-    - 15-20 weeks: 3 assessments (Intermediate Mid Course Test + Intermediate End Course Test + Upper Intermediate Mid Course Test)
-    - 21-26 weeks: 4 assessments (Intermediate Mid Course Test + Intermediate End Course Test + Upper Intermediate Mid Course Test + Upper Intermediate End Course Test)
-    - 27-32 weeks: 5 assessments (Intermediate Mid Course Test + Intermediate End Course Test + Upper Intermediate Mid Course Test + Upper Intermediate End Course Test + Advanced Mid Course Test)
-    - 33-36 weeks: 6 assessments (Intermediate Mid Course Test + Intermediate End Course Test + Upper Intermediate Mid Course Test + Upper Intermediate End Course Test + Advanced Mid Course Test + Advanced End Course Test)
-
-    **General English Course:**
-    - 1-8 weeks: 1 assessment (Intermediate Mid Course Test)
-    - 9-14 weeks: 2 assessments (Intermediate Mid Course Test + Intermediate End Course Test)
-    - 15-20 weeks: 3 assessments (Intermediate Mid Course Test + Intermediate End Course Test + Upper Intermediate Mid Course Test)
-    - 21-26 weeks: 4 assessments (Intermediate Mid Course Test + Intermediate End Course Test + Upper Intermediate Mid Course Test + Upper Intermediate End Course Test)
-    - 27-32 weeks: 5 assessments (Elementary Mid Course Test + Elementary End Course Test + Pre Intermediate Mid Course Test + Pre Intermediate End Course Test + Intermediate Mid Course Test)
-    - 33-38 weeks: 6 assessments (Elementary Mid Course Test + Elementary End Course Test + Pre Intermediate Mid Course Test + Pre Intermediate End Course Test + Intermediate Mid Course Test + Intermediate End Course Test)
-    - 39-44 weeks: 7 assessments (Elementary Mid Course Test + Elementary End Course Test + Pre Intermediate Mid Course Test + Pre Intermediate End Course Test + Intermediate Mid Course Test + Intermediate End Course Test + Upper Intermediate Mid Course Test)
-    - 45-50 weeks: 8 assessments (Elementary Mid Course Test + Elementary End Course Test + Pre Intermediate Mid Course Test + Pre Intermediate End Course Test + Intermediate Mid Course Test + Intermediate End Course Test + Upper Intermediate Mid Course Test + Upper Intermediate End Course Test)
-    - 51-56 weeks: 9 assessments (Elementary Mid Course Test + Elementary End Course Test + Pre Intermediate Mid Course Test + Pre Intermediate End Course Test + Intermediate Mid Course Test + Intermediate End Course Test + Upper Intermediate Mid Course Test + Upper Intermediate End Course Test + Advanced Mid Course Test)
-    - 57-60 weeks: 10 assessments (Elementary Mid Course Test + Elementary End Course Test + Pre Intermediate Mid Course Test + Pre Intermediate End Course Test + Intermediate Mid Course Test + Intermediate End Course Test + Upper Intermediate Mid Course Test + Upper Intermediate End Course Test + Advanced Mid Course Test + Advanced End Course Test)
-    
+""" + describe_assessment_rules(rules) + """
     ## Technical Notes
     
     - The app automatically calculates progression rates for all students
     - All date formats are standardized as YYYY-MM-DD
-    - Phone numbers are automatically formatted to ensure they start with 0
+    - Large tables are shown a page at a time; use the sort and page controls above each table
+    - Searching, filtering and paging only redraw the search section; changing the Course Filter redraws the whole page
+    - The student sheet is read with a declared column schema: phone numbers and Student IDs stay text (phone numbers keep their leading 0) and dates, durations and attendance are typed once on load
     - The system caches data for performance but will reload when changes are detected
     - For data accuracy, ensure the Excel file follows the correct structure
+    - Assessment rules are read from `""" + TENANT['rules'] + """` (rules version """ + str(rules['version']) + """); edits are picked up without restarting the app
+    - Each college in `tenants.json` has its own workbook, rules, results and caches; open the app with `?tenant=<id>` to choose one
+    - The Test Session Planner spreads each student's required assessments evenly over their course to find when the next one is due, then splits the students sitting each assessment in a week into sessions that fit the room capacity (`room_capacity` in `tenants.json`)
+    - Searches, filter changes, roster queries and exports are logged to `""" + TENANT['audit_log'] + """` with their latency and cache hit/miss; event counts, latency histograms and cache sizes are served for Prometheus at `http://127.0.0.1:""" + os.environ.get(TELEMETRY_PORT_ENV_VAR, str(TELEMETRY_PORT)) + """/metrics`
+    - Other systems can read student progression, assessment rosters and cohort totals as JSON from `python api.py`, with the same tenants and views
     """)
 
 # Footer
@@ -1107,7 +1425,7 @@ st.markdown("---")
 st.markdown(
     """
     <div style='text-align: center; color: #666;'>
-        📧 SMEI Student Progression | Contact Administrator for data updates
+        📧 """ + TENANT['short_name'] + """ Student Progression | Contact Administrator for data updates
     </div>
     """,
     unsafe_allow_html=True
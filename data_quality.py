@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+from progression import PENDING, classify_test_values, extract_scores, get_rules
+
+# Calendar weeks between Start and Finish Date may exceed Duration (weeks) by
+# up to this many weeks of holiday breaks before the duration is flagged
+DURATION_BREAK_WEEKS = 4
+
+QUALITY_COLUMNS = ['Check', 'StudentID', 'Name', 'Column', 'Value', 'Detail']
+
+
+def _issues(df, rows, check, column, detail, values=None):
+    """Issue rows for the students selected by a boolean mask"""
+    if not rows.any():
+        return None
+    if values is None:
+        values = df[column] if column in df.columns else pd.Series('', index=df.index)
+    return pd.DataFrame({
+        'Check': check,
+        'StudentID': df['StudentID'].to_numpy()[rows],
+        'Name': df['Name'].to_numpy()[rows],
+        'Column': column,
+        'Value': values.astype(object).where(values.notna(), '').astype(str).to_numpy()[rows],
+        'Detail': detail if isinstance(detail, str) else np.asarray(detail, dtype=object)[rows]
+    })
+
+
+def _workbook_values(df, column, unreadable):
+    """A column's values with the workbook text put back where it couldn't be converted"""
+    values = df[column].astype(object)
+    if unreadable is not None:
+        cells = unreadable.loc[unreadable['Column'] == column, 'Value']
+        values = values.copy()
+        values[cells.index] = cells
+    return values
+
+
+def scan_data_quality(df, rules=None, unreadable=None):
+    """Vectorized checks of the student data, one row per problem found
+
+    Covers student IDs, dates, durations, attendance, courses and recorded
+    assessment values. unreadable is the loader's table of date and number
+    cells it couldn't convert (see read_student_workbook), so they are reported
+    with their workbook text. Nothing is changed - the report only shows where
+    the workbook needs fixing.
+    """
+    rules = rules or get_rules()
+    parts = []
+
+    student_ids = df['StudentID']
+    missing_id = (student_ids == '').to_numpy()
+    parts.append(_issues(df, missing_id, "Missing StudentID", 'StudentID', "Row has no Student ID"))
+    duplicate_id = (student_ids.duplicated(keep=False) & (student_ids != '')).to_numpy()
+    parts.append(_issues(df, duplicate_id, "Duplicate StudentID", 'StudentID', "Student ID appears on more than one row"))
+
+    # Dates that were blank or unreadable became NaT when the workbook was read
+    start = df['Start Date']
+    finish = df['Finish Date']
+    for column, dates in (('Start Date', start), ('Finish Date', finish)):
+        values = _workbook_values(df, column, unreadable)
+        detail = np.where(values.notna(), "Unreadable date", "Missing date")
+        parts.append(_issues(df, dates.isna().to_numpy(), "Bad date", column, detail, values))
+    parts.append(_issues(
+        df, (finish < start).to_numpy(), "Bad date", 'Finish Date', "Finish Date is before Start Date"
+    ))
+
+    duration = pd.to_numeric(df['Duration (weeks)'], errors='coerce')
+    bad_duration = duration.isna() | (duration <= 0)
+    parts.append(_issues(
+        df, bad_duration.to_numpy(), "Bad duration", 'Duration (weeks)',
+        "Missing or not a positive number of weeks - all course assessments are treated as required",
+        _workbook_values(df, 'Duration (weeks)', unreadable)
+    ))
+    # Only compared when the duration and dates are themselves valid, so a problem is reported once
+    calendar_weeks = ((finish - start).dt.days + 1) / 7
+    mismatch = (duration > calendar_weeks.round()) | (calendar_weeks.round() - duration > DURATION_BREAK_WEEKS)
+    mismatch &= ~bad_duration & (finish >= start)
+    parts.append(_issues(
+        df, mismatch.fillna(False).to_numpy(dtype=bool), "Duration mismatch", 'Duration (weeks)',
+        "Start to Finish Date spans " + calendar_weeks.round().astype('Int64').astype(str) + " calendar weeks"
+    ))
+
+    if 'Attendance' in df.columns:
+        values = _workbook_values(df, 'Attendance', unreadable)
+        attendance = pd.to_numeric(values, errors='coerce')
+        out_of_range = ((attendance < 0) | (attendance > 100)).to_numpy()
+        parts.append(_issues(df, out_of_range, "Attendance out of range", 'Attendance', "Attendance must be 0-100%"))
+        not_number = (attendance.isna() & values.notna()).to_numpy()
+        parts.append(_issues(df, not_number, "Attendance out of range", 'Attendance', "Attendance is not a number", values))
+
+    unknown_course = (~df['Course'].isin(list(rules['courses']))).to_numpy()
+    parts.append(_issues(
+        df, unknown_course, "Unknown course", 'Course',
+        "Course is not in the assessment rules - no assessments are required"
+    ))
+
+    # Values that are neither a score nor a pass/fail keyword silently count as Pending
+    for test in rules['assessment_order']:
+        if test not in df.columns:
+            continue
+        values = df[test]
+        text = values.astype(object).where(values.notna(), '').astype(str).str.strip()
+        scores = extract_scores(text)
+        unrecognised = (text != '') & scores.isna() & (classify_test_values(text, rules=rules) == PENDING)
+        parts.append(_issues(
+            df, unrecognised.to_numpy(), "Unrecognised result", test,
+            "Neither a score nor Passed/Failed - counted as Pending"
+        ))
+        parts.append(_issues(
+            df, (scores > 100).to_numpy(), "Score out of range", test, "Score above 100"
+        ))
+
+    parts = [part for part in parts if part is not None]
+    if not parts:
+        return pd.DataFrame(columns=QUALITY_COLUMNS)
+    return pd.concat(parts, ignore_index=True)
+
+
+def quality_summary(report):
+    """Number of problems and students affected for each check"""
+    if report.empty:
+        return pd.DataFrame(columns=['Problems', 'Students'])
+    grouped = report.groupby('Check', sort=False)
+    return pd.DataFrame({'Problems': grouped.size(), 'Students': grouped['StudentID'].nunique()})
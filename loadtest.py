@@ -0,0 +1,367 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from websockets.sync.client import connect
+
+from synthetic import write_tenant
+
+# Concurrent-session load test - starts the app on a local Streamlit server
+# with a synthetic roster and replays a mix of staff interactions from many
+# simulated browser sessions over the websocket protocol the browser uses.
+#   python loadtest.py --students 2000 --sessions 1 5 10 20 40
+# Reports throughput, tail latency and server memory for each session count.
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+SESSION_COUNTS = [1, 5, 10, 20, 40]
+
+# Share of each interaction in a simulated session
+INTERACTION_MIX = {
+    'search': 0.35,
+    'filter': 0.25,
+    'roster': 0.30,
+    'download': 0.10
+}
+
+# Name fragments and IDs typed into the student search (synthetic roster IDs are SYN000001...)
+SEARCH_TERMS = ['an', 'ma', 'li', 'son', 'SYN0000', 'SYN00001', 'SYN000042']
+FILTER_LABELS = ['Filter by Course:', 'Filter by Attendance:', 'Filter by Progression:']
+
+
+def start_server(directory, port, timeout=60):
+    """Start the app on a headless Streamlit server and wait for its health check"""
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", APP_PATH,
+         "--server.headless", "true", "--server.port", str(port),
+         "--browser.gatherUsageStats", "false"],
+        cwd=directory,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"http://localhost:{port}/_stcore/health", timeout=1).ok:
+                return server
+        except requests.RequestException:
+            pass
+        time.sleep(0.25)
+    server.terminate()
+    raise RuntimeError(f"Streamlit server did not start within {timeout} seconds")
+
+
+def server_rss_mb(pid):
+    """Resident memory of a process in MB, or None where /proc isn't available"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def connect_session(base_url, timeout):
+    """Open the websocket a browser tab uses to talk to the server"""
+    return connect(
+        base_url.replace("http", "ws", 1) + "/_stcore/stream",
+        subprotocols=["streamlit"],
+        origin=base_url,
+        max_size=None,
+        open_timeout=timeout
+    )
+
+
+def new_session(ws, base_url, timeout):
+    """State of a simulated browser session - widgets on the page and the values set in them"""
+    return {'ws': ws, 'base_url': base_url, 'timeout': timeout, 'widgets': {}, 'states': {},
+            'mode': "Student Name/ID", 'download_url': None}
+
+
+def rerun(session, fragment_id=""):
+    """Send the session's widget states and wait for the script run to finish
+
+    A widget inside a fragment only reruns that fragment, as in the browser.
+    Records the widgets on the page for the next interaction. Returns the
+    rerun time in seconds and whether the app showed an exception.
+    """
+    msg = BackMsg()
+    msg.rerun_script.query_string = ""
+    msg.rerun_script.fragment_id = fragment_id
+    msg.rerun_script.widget_states.widgets.extend(session['states'].values())
+
+    started = time.perf_counter()
+    session['ws'].send(msg.SerializeToString())
+
+    widgets = {}
+    failed = False
+    while True:
+        forward = ForwardMsg()
+        forward.ParseFromString(session['ws'].recv(timeout=session['timeout']))
+        kind = forward.WhichOneof("type")
+
+        if kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+            element_type = forward.delta.new_element.WhichOneof("type")
+            element = getattr(forward.delta.new_element, element_type)
+            if element_type == "exception":
+                failed = True
+            elif element_type == "download_button":
+                session['download_url'] = element.url
+            elif getattr(element, "id", "") and getattr(element, "label", ""):
+                widgets.setdefault(element.label, (
+                    element_type, element.id, list(getattr(element, "options", [])), forward.delta.fragment_id
+                ))
+        elif kind == "script_finished":
+            # A fragment that calls st.rerun() is followed by a full run of the page
+            if forward.script_finished == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                fragment_id = ""
+                widgets = {}
+                continue
+            if fragment_id:
+                widgets.update(
+                    (label, widget) for label, widget in session['widgets'].items()
+                    if widget[3] != fragment_id and label not in widgets
+                )
+            session['widgets'] = widgets
+            return time.perf_counter() - started, failed
+
+
+def set_widget(session, label, value):
+    """Change a widget shown in the last rerun
+
+    Returns the id of the fragment the widget is in ("" for the main page),
+    or None if it isn't on the page.
+    """
+    if label not in session['widgets']:
+        return None
+    element_type, widget_id, _, fragment_id = session['widgets'][label]
+    state = WidgetState(id=widget_id)
+    if element_type == "checkbox":
+        state.bool_value = value
+    else:
+        state.string_value = value
+    session['states'][widget_id] = state
+    return fragment_id
+
+
+def interact(session, interaction, rng):
+    """Perform one interaction, returning the time it took and whether it failed"""
+    if interaction == 'download':
+        if not session['download_url']:
+            return 0.0, True
+        started = time.perf_counter()
+        response = requests.get(session['base_url'] + session['download_url'], timeout=session['timeout'])
+        return time.perf_counter() - started, not response.ok
+
+    elapsed = 0.0
+    failed = False
+
+    # Switching search mode is its own rerun, as it is for a real user
+    mode = "Assessment Test" if interaction == 'roster' else "Student Name/ID"
+    if session['mode'] != mode:
+        fragment_id = set_widget(session, "Search by:", mode)
+        if fragment_id is not None:
+            session['mode'] = mode
+            elapsed, failed = rerun(session, fragment_id)
+
+    fragment_id = None
+    if interaction == 'search':
+        fragment_id = set_widget(session, "Enter student name/ID:", rng.choice(SEARCH_TERMS))
+    elif interaction == 'filter':
+        labels = [label for label in FILTER_LABELS if label in session['widgets']]
+        if labels:
+            label = rng.choice(labels)
+            fragment_id = set_widget(session, label, rng.choice(session['widgets'][label][2]))
+    elif interaction == 'roster':
+        label = "Select Assessment to Search:"
+        if label in session['widgets']:
+            fragment_id = set_widget(session, label, rng.choice(session['widgets'][label][2][1:]))
+
+    seconds, step_failed = rerun(session, fragment_id or "")
+    return elapsed + seconds, failed or step_failed
+
+
+def simulate_user(base_url, actions, think_seconds, seed, timeout, opened, start, record):
+    """One staff member - open the app, then work through a random mix of interactions"""
+    rng = random.Random(seed)
+    interactions = list(INTERACTION_MIX)
+    weights = list(INTERACTION_MIX.values())
+    released = False
+    try:
+        with connect_session(base_url, timeout) as ws:
+            session = new_session(ws, base_url, timeout)
+            record['open'], failed = rerun(session)
+            record['errors'] += failed
+
+            opened.release()
+            released = True
+            start.wait()
+
+            for _ in range(actions):
+                if think_seconds > 0:
+                    time.sleep(rng.expovariate(1 / think_seconds))
+                interaction = rng.choices(interactions, weights)[0]
+                seconds, failed = interact(session, interaction, rng)
+                record['latencies'].append((interaction, seconds))
+                record['errors'] += failed
+    except Exception as e:
+        record['errors'] += 1
+        record['exception'] = f"{type(e).__name__}: {e}"
+    finally:
+        if not released:
+            opened.release()
+
+
+def _percentile(values, p):
+    return round(values[min(len(values) - 1, int(p / 100 * len(values)))], 3) if values else None
+
+
+def run_load(base_url, sessions, actions=10, think_seconds=1.0, timeout=120, server_pid=None):
+    """Run concurrent sessions against the server and summarise their latencies
+
+    Every session opens the app before the timed interactions start, so the
+    server memory is measured with all sessions connected.
+    """
+    records = [{'open': None, 'latencies': [], 'errors': 0} for _ in range(sessions)]
+    opened = threading.Semaphore(0)
+    start = threading.Event()
+    threads = [
+        threading.Thread(
+            target=simulate_user,
+            args=(base_url, actions, think_seconds, i, timeout, opened, start, records[i])
+        )
+        for i in range(sessions)
+    ]
+
+    rss_before = server_rss_mb(server_pid) if server_pid else None
+    for thread in threads:
+        thread.start()
+    for _ in range(sessions):
+        opened.acquire()
+    rss_open = server_rss_mb(server_pid) if server_pid else None
+
+    started = time.perf_counter()
+    start.set()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    latencies = sorted(seconds for record in records for _, seconds in record['latencies'])
+    opens = [record['open'] for record in records if record['open'] is not None]
+    by_interaction = {}
+    for record in records:
+        for interaction, seconds in record['latencies']:
+            by_interaction.setdefault(interaction, []).append(seconds)
+
+    return {
+        'sessions': sessions,
+        'actions': len(latencies),
+        'errors': sum(record['errors'] for record in records),
+        'throughput': round(len(latencies) / wall, 2) if wall > 0 else None,
+        'p50': _percentile(latencies, 50),
+        'p95': _percentile(latencies, 95),
+        'p99': _percentile(latencies, 99),
+        'max': round(latencies[-1], 3) if latencies else None,
+        'open_median': round(statistics.median(opens), 3) if opens else None,
+        'by_interaction': {name: round(statistics.median(values), 3) for name, values in by_interaction.items()},
+        'rss_mb': round(rss_open, 1) if rss_open else None,
+        'rss_per_session_mb': round((rss_open - rss_before) / sessions, 2) if rss_open and rss_before else None,
+        'exceptions': sorted({record['exception'] for record in records if 'exception' in record})
+    }
+
+
+def write_markdown(report, path):
+    """Write the load test results as a markdown table"""
+    lines = [
+        f"# Load test - {report['students']} students",
+        "",
+        f"Cold first open: {report['cold_open']}s. Each session runs {report['actions']} interactions "
+        f"with {report['think']}s mean think time.",
+        "",
+        "| Sessions | Actions/s | p50 (s) | p95 (s) | p99 (s) | Max (s) | First open (s) | Errors | Server RSS (MB) | MB / session |",
+        "| --- | --- | --- | --- | --- | --- | --- | --- | --- | --- |"
+    ]
+    for run in report['runs']:
+        lines.append(
+            f"| {run['sessions']} | {run['throughput']} | {run['p50']} | {run['p95']} | {run['p99']} | {run['max']} "
+            f"| {run['open_median']} | {run['errors']} | {run['rss_mb']} | {run['rss_per_session_mb']} |"
+        )
+
+    lines += ["", "## Median latency by interaction", "", "| Sessions | " + " | ".join(INTERACTION_MIX) + " |",
+              "| --- |" + " --- |" * len(INTERACTION_MIX)]
+    for run in report['runs']:
+        lines.append(f"| {run['sessions']} | " + " | ".join(
+            str(run['by_interaction'].get(name, '')) for name in INTERACTION_MIX
+        ) + " |")
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines) + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the app with many concurrent staff sessions")
+    parser.add_argument("--students", type=int, default=2000, help="synthetic roster size")
+    parser.add_argument("--sessions", type=int, nargs="+", default=SESSION_COUNTS, help="concurrent session counts to test")
+    parser.add_argument("--actions", type=int, default=10, help="interactions per session")
+    parser.add_argument("--think", type=float, default=1.0, help="mean think time between interactions in seconds")
+    parser.add_argument("--port", type=int, default=8599, help="port for the local test server")
+    parser.add_argument("--url", help="test an already running server instead (memory isn't measured)")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds allowed for one rerun")
+    parser.add_argument("--report", default="loadtest_report.md", help="markdown report to write")
+    parser.add_argument("--json", help="also write the raw measurements as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        server = None
+        if args.url:
+            base_url = args.url.rstrip("/")
+        else:
+            print(f"Starting a test server with {args.students} synthetic students...")
+            write_tenant(directory, args.students)
+            server = start_server(directory, args.port)
+            base_url = f"http://localhost:{args.port}"
+
+        try:
+            # The first session pays for loading the workbook; later sessions share the cached data
+            cold = run_load(base_url, 1, 0, 0, args.timeout)
+            report = {
+                'students': args.students,
+                'actions': args.actions,
+                'think': args.think,
+                'cold_open': cold['open_median'],
+                'runs': []
+            }
+            print(f"Cold first open: {cold['open_median']}s")
+
+            for sessions in args.sessions:
+                run = run_load(base_url, sessions, args.actions, args.think, args.timeout, server.pid if server else None)
+                report['runs'].append(run)
+                print(
+                    f"  {sessions:>3} sessions  {run['throughput']:>6} actions/s  "
+                    f"p50 {run['p50']}s  p95 {run['p95']}s  p99 {run['p99']}s  "
+                    f"errors {run['errors']}  RSS {run['rss_mb']} MB"
+                )
+                for exception in run['exceptions']:
+                    print(f"      {exception}")
+        finally:
+            if server:
+                server.terminate()
+                server.wait()
+
+    write_markdown(report, args.report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    print(f"Report written to {args.report}")
@@ -0,0 +1,346 @@
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import pandas as pd
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from progression import EXCEL_ENGINE, get_rules, read_student_workbook
+from synthetic import write_tenant
+
+# Scalability harness - drives app.py headlessly with AppTest against
+# synthetic rosters of growing size and records rerun latency, peak memory
+# and the slowest app functions for each interaction.
+#   python profile_app.py --sizes 500 2000 10000
+# Exits with status 1 if a path is slower than profile_thresholds.json allows.
+#   python profile_app.py --loader --sizes 2000 10000 50000
+# times only the student sheet loader instead.
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+REPO_DIR = os.path.dirname(APP_PATH)
+THRESHOLDS_PATH = os.path.join(REPO_DIR, "profile_thresholds.json")
+PROFILE_SIZES = [500, 2000, 10000]
+
+# Headroom given to measurements written with --update-thresholds
+THRESHOLD_HEADROOM = 1.5
+
+# Sessions kept open at once to estimate the memory each session adds
+SESSION_SAMPLE = 5
+
+
+def _widget(elements, label):
+    return next(element for element in elements if element.label.startswith(label))
+
+
+def _search(term):
+    return lambda at: _widget(at.text_input, "Enter student name/ID").set_value(term)
+
+
+def _select(label, value):
+    return lambda at: _widget(at.selectbox, label).set_value(value)
+
+
+def _radio(label, value):
+    return lambda at: _widget(at.radio, label).set_value(value)
+
+
+def _check(label):
+    return lambda at: _widget(at.checkbox, label).check()
+
+
+def _keyed(kind, key, value):
+    return lambda at: getattr(at, kind)(key=key).set_value(value)
+
+
+# First open of the app with every cache empty - the workbook is read and all caches filled
+COLD_START = "Cold start"
+
+# Each interaction path: the steps that set it up, then the step whose rerun is measured
+SCENARIOS = {
+    "Open app": ([], None),
+    "Rerun (no change)": ([], lambda at: None),
+    "Name search": ([], _search("an")),
+    "ID search": ([], _search("SYN000042")),
+    "Compare matches": ([_search("Suji")], _check("Compare all")),
+    "Course filter": ([], _select("Filter by Course", "EAP")),
+    "Attendance filter": ([], _select("Filter by Attendance", "Poor (0-49%)")),
+    "Progression filter": ([], _select("Filter by Progression", "Poor (0-49%)")),
+    "Finishing soon": ([], _check("Show students finishing soon")),
+    "Sort table": ([], _keyed("selectbox", "students_table_sort_column", "Attendance")),
+    "Next page": ([], _keyed("number_input", "students_table_page", 2)),
+    "Assessment roster": ([_radio("Search by", "Assessment Test")],
+                          _select("Select Assessment", "Intermediate Mid Course Test")),
+    "Roster status filter": ([_radio("Search by", "Assessment Test"),
+                              _select("Select Assessment", "Intermediate Mid Course Test")],
+                             _radio("Show students with status", "Pending + Failed")),
+}
+
+
+def _session(timeout):
+    return AppTest.from_file(APP_PATH, default_timeout=timeout)
+
+
+def _prepare(steps, timeout):
+    """Open a session and apply the setup steps of a path"""
+    at = _session(timeout).run()
+    for step in steps:
+        step(at)
+        at.run()
+    return at
+
+
+def _run_measured(at, step):
+    """Apply the measured step and rerun, returning the rerun time in seconds"""
+    if step is None:
+        started = time.perf_counter()
+        at.run()
+    else:
+        step(at)
+        started = time.perf_counter()
+        at.run()
+    elapsed = time.perf_counter() - started
+    if at.exception:
+        raise RuntimeError(f"App raised: {at.exception[0].message}")
+    return elapsed
+
+
+def _profile_run(at, step):
+    """Rerun once with cProfile on the script thread and tracemalloc on, returning peak MB and stats"""
+    profiler = cProfile.Profile()
+
+    def start_profiler(frame, event, arg):
+        sys.setprofile(None)
+        if threading.current_thread().name.startswith("ScriptRunner"):
+            profiler.enable()
+
+    tracemalloc.start()
+    threading.setprofile(start_profiler)
+    try:
+        _run_measured(at, step)
+    finally:
+        threading.setprofile(None)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    profiler.create_stats()
+    return peak / 1024 / 1024, pstats.Stats(profiler)
+
+
+def _hotspots(stats, limit=5):
+    """Slowest functions defined in this repo by cumulative time, excluding the script body itself"""
+    rows = []
+    for (filename, line, name), (_, calls, _, cumtime, _) in stats.stats.items():
+        if filename.startswith(REPO_DIR) and name != '<module>':
+            rows.append((cumtime, f"{os.path.basename(filename)}:{line}({name})", calls))
+    return [
+        {'function': function, 'seconds': round(cumtime, 4), 'calls': calls}
+        for cumtime, function, calls in sorted(rows, reverse=True)[:limit]
+    ]
+
+
+def _session_memory(timeout):
+    """Average traced memory held by each additional open session"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [_prepare([_search("an")], timeout) for _ in range(SESSION_SAMPLE)]
+    per_session = (tracemalloc.get_traced_memory()[0] - before) / len(sessions)
+    tracemalloc.stop()
+    return per_session / 1024 / 1024
+
+
+def _clear_caches():
+    st.cache_resource.clear()
+    st.cache_data.clear()
+
+
+def profile_size(students, repeat, timeout):
+    """Measure every interaction path against a synthetic roster of the given size"""
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        write_tenant(directory, students)
+        previous_dir = os.getcwd()
+        os.chdir(directory)
+        try:
+            timings = []
+            for _ in range(repeat):
+                _clear_caches()
+                timings.append(_run_measured(_session(timeout), None))
+            _clear_caches()
+            peak_mb, stats = _profile_run(_session(timeout), None)
+            results[COLD_START] = {
+                'seconds': round(statistics.median(timings), 4),
+                'peak_mb': round(peak_mb, 2),
+                'hotspots': _hotspots(stats)
+            }
+
+            for name, (steps, step) in SCENARIOS.items():
+                timings = []
+                for _ in range(repeat):
+                    at = _session(timeout) if step is None else _prepare(steps, timeout)
+                    timings.append(_run_measured(at, step))
+
+                at = _session(timeout) if step is None else _prepare(steps, timeout)
+                peak_mb, stats = _profile_run(at, step)
+                results[name] = {
+                    'seconds': round(statistics.median(timings), 4),
+                    'peak_mb': round(peak_mb, 2),
+                    'hotspots': _hotspots(stats)
+                }
+
+            results['_session_mb'] = round(_session_memory(timeout), 2)
+        finally:
+            os.chdir(previous_dir)
+    return results
+
+
+def _legacy_read(path, sheet_name):
+    # The loader before the typed schema: read every column, then fix up types afterwards
+    df = pd.read_excel(path, sheet_name=sheet_name)
+    df['Start Date'] = pd.to_datetime(df['Start Date'], errors='coerce')
+    df['Finish Date'] = pd.to_datetime(df['Finish Date'], errors='coerce')
+    df['StudentID'] = df['StudentID'].astype(str).str.strip()
+    return df
+
+
+def profile_loader(students, repeat):
+    """Time the student sheet loader against the untyped read it replaced, per Excel engine"""
+    loaders = {'untyped read (openpyxl)': lambda path, sheet, rules: _legacy_read(path, sheet)}
+    for engine in dict.fromkeys(['openpyxl', EXCEL_ENGINE]):
+        loaders[f"typed schema ({engine})"] = (
+            lambda path, sheet, rules, engine=engine: read_student_workbook(path, sheet, rules, engine)
+        )
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        write_tenant(directory, students, rules_path=os.path.join(REPO_DIR, "assessment_rules.json"))
+        path = os.path.join(directory, f"Synthetic {students} Students.xlsx")
+        rules = get_rules(os.path.join(REPO_DIR, "assessment_rules.json"))
+        for name, load in loaders.items():
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                df = load(path, 'SYN', rules)
+                timings.append(time.perf_counter() - started)
+            results[name] = {
+                'seconds': round(statistics.median(timings), 4),
+                'frame_mb': round(df.memory_usage(deep=True).sum() / 1e6, 2)
+            }
+    return results
+
+
+def check_thresholds(report, thresholds):
+    """Paths slower (or hungrier) than the thresholds allow at the threshold roster size"""
+    size = str(thresholds['students'])
+    if size not in report:
+        return []
+    failures = []
+    for name, limits in thresholds['scenarios'].items():
+        measured = report[size].get(name)
+        if measured is None:
+            continue
+        if measured['seconds'] > limits['seconds']:
+            failures.append(f"{name}: {measured['seconds']:.3f}s > {limits['seconds']:.3f}s at {size} students")
+        if 'peak_mb' in limits and measured['peak_mb'] > limits['peak_mb']:
+            failures.append(f"{name}: peak {measured['peak_mb']:.1f} MB > {limits['peak_mb']:.1f} MB at {size} students")
+    return failures
+
+
+def write_markdown(report, path):
+    """Scaling report: latency and peak memory per path and roster size, plus hotspots at the largest size"""
+    sizes = list(report)
+    names = [COLD_START] + list(SCENARIOS)
+    lines = ["# App Scaling Report", "", "Median rerun seconds.", ""]
+    lines.append("| Path | " + " | ".join(f"{size} students" for size in sizes) + " |")
+    lines.append("|---|" + "---|" * len(sizes))
+    for name in names:
+        lines.append(f"| {name} | " + " | ".join(f"{report[size][name]['seconds']:.3f}" for size in sizes) + " |")
+
+    lines += ["", "Peak memory allocated during one rerun (MB).", ""]
+    lines.append("| Path | " + " | ".join(f"{size} students" for size in sizes) + " |")
+    lines.append("|---|" + "---|" * len(sizes))
+    for name in names:
+        lines.append(f"| {name} | " + " | ".join(f"{report[size][name]['peak_mb']:.1f}" for size in sizes) + " |")
+    lines.append("| Memory per open session | " + " | ".join(f"{report[size]['_session_mb']:.1f}" for size in sizes) + " |")
+
+    largest = sizes[-1]
+    lines += ["", f"## Hotspots at {largest} students", ""]
+    for name in names:
+        hotspots = report[largest][name]['hotspots']
+        lines.append(f"**{name}**: " + ", ".join(f"`{h['function']}` {h['seconds']:.3f}s" for h in hotspots))
+        lines.append("")
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile app reruns against synthetic rosters of growing size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=PROFILE_SIZES, help="roster sizes to test")
+    parser.add_argument("--repeat", type=int, default=3, help="timed reruns per path (the median is reported)")
+    parser.add_argument("--timeout", type=float, default=600, help="seconds allowed for one rerun")
+    parser.add_argument("--report", default="profile_report.md", help="markdown scaling report to write")
+    parser.add_argument("--json", help="also write the raw measurements as JSON")
+    parser.add_argument("--thresholds", default=THRESHOLDS_PATH, help="regression threshold file")
+    parser.add_argument("--update-thresholds", action="store_true",
+                        help=f"write this run's timings (x{THRESHOLD_HEADROOM}) as the new thresholds")
+    parser.add_argument("--loader", action="store_true", help="time only the student sheet loader")
+    args = parser.parse_args()
+
+    if args.loader:
+        report = {}
+        for students in args.sizes:
+            print(f"Loading {students} students...")
+            report[str(students)] = profile_loader(students, args.repeat)
+            for name, measured in report[str(students)].items():
+                print(f"  {name:<28} {measured['seconds']:8.3f}s  frame {measured['frame_mb']:7.2f} MB")
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+        sys.exit(0)
+
+    report = {}
+    for students in args.sizes:
+        print(f"Profiling {students} students...")
+        report[str(students)] = profile_size(students, args.repeat, args.timeout)
+        for name in [COLD_START] + list(SCENARIOS):
+            measured = report[str(students)][name]
+            print(f"  {name:<24} {measured['seconds']:8.3f}s  peak {measured['peak_mb']:7.1f} MB")
+
+    write_markdown(report, args.report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    print(f"Report written to {args.report}")
+
+    if args.update_thresholds:
+        size = str(args.sizes[min(1, len(args.sizes) - 1)])
+        thresholds = {
+            'students': int(size),
+            'scenarios': {
+                name: {
+                    'seconds': round(report[size][name]['seconds'] * THRESHOLD_HEADROOM, 3),
+                    'peak_mb': round(report[size][name]['peak_mb'] * THRESHOLD_HEADROOM, 1)
+                }
+                for name in [COLD_START] + list(SCENARIOS)
+            }
+        }
+        with open(args.thresholds, 'w', encoding='utf-8') as f:
+            json.dump(thresholds, f, indent=2)
+        print(f"Thresholds for {size} students written to {args.thresholds}")
+    elif os.path.exists(args.thresholds):
+        with open(args.thresholds, encoding='utf-8') as f:
+            failures = check_thresholds(report, json.load(f))
+        if failures:
+            print("Slower than the thresholds allow:")
+            for failure in failures:
+                print(f"  {failure}")
+            sys.exit(1)
+        print("All paths within thresholds")
@@ -0,0 +1,635 @@
+import hashlib
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+# Assessment rules - loaded from a versioned JSON file and compiled into
+# interval arrays and assessment bitmasks, cached on the file's hash
+RULES_PATH = "assessment_rules.json"
+RULES_SCHEMA_VERSION = 1
+
+_RULE_KEYS = {'schema_version', 'version', 'pass_mark', 'passed_keywords', 'failed_keywords', 'assessment_order', 'courses'}
+_COURSE_KEYS = {'short_name', 'assessments', 'duration_ranges', 'pass_mark'}
+_RANGE_KEYS = {'weeks', 'assessments', 'start', 'count'}
+
+# Compiled rules keyed by file hash, and the last seen state of each rules file
+_compiled_rules = {}
+_rules_file_state = {}
+
+
+def _check(condition, message):
+    if not condition:
+        raise ValueError(f"Invalid assessment rules: {message}")
+
+
+def _check_names(names, where, allowed=None):
+    _check(isinstance(names, list) and names, f"{where} must be a non-empty list")
+    _check(all(isinstance(name, str) and name.strip() for name in names), f"{where} must only contain names")
+    _check(len(set(names)) == len(names), f"{where} contains duplicates")
+    if allowed is not None:
+        unknown = [name for name in names if name not in allowed]
+        _check(not unknown, f"{where} has unknown assessments: {', '.join(unknown)}")
+
+
+def _check_pass_mark(value, where):
+    _check(isinstance(value, (int, float)) and not isinstance(value, bool) and 0 <= value <= 100,
+           f"{where} must be a number between 0 and 100")
+
+
+def validate_rules(raw):
+    """Check a parsed rules file against the schema, raising ValueError on the first problem"""
+    _check(isinstance(raw, dict), "the file must contain an object")
+    _check(raw.get('schema_version') == RULES_SCHEMA_VERSION,
+           f"schema_version must be {RULES_SCHEMA_VERSION}")
+    unknown = set(raw) - _RULE_KEYS
+    _check(not unknown, f"unknown keys {sorted(unknown)}")
+    _check(isinstance(raw.get('version'), (str, int)), "version is required")
+
+    _check_pass_mark(raw.get('pass_mark'), "pass_mark")
+    _check_names(raw.get('passed_keywords'), "passed_keywords")
+    _check_names(raw.get('failed_keywords'), "failed_keywords")
+
+    order = raw.get('assessment_order')
+    _check_names(order, "assessment_order")
+    _check(len(order) <= 64, "at most 64 assessments are supported")
+
+    courses = raw.get('courses')
+    _check(isinstance(courses, dict) and courses, "courses must be a non-empty object")
+
+    for course, course_rules in courses.items():
+        where = f"courses.{course}"
+        _check(isinstance(course_rules, dict), f"{where} must be an object")
+        unknown = set(course_rules) - _COURSE_KEYS
+        _check(not unknown, f"{where} has unknown keys {sorted(unknown)}")
+        if 'pass_mark' in course_rules:
+            _check_pass_mark(course_rules['pass_mark'], f"{where}.pass_mark")
+
+        assessments = course_rules.get('assessments')
+        _check_names(assessments, f"{where}.assessments", order)
+
+        ranges = course_rules.get('duration_ranges')
+        _check(isinstance(ranges, list) and ranges, f"{where}.duration_ranges must be a non-empty list")
+
+        previous_max = None
+        for i, duration_range in enumerate(ranges):
+            range_where = f"{where}.duration_ranges[{i}]"
+            _check(isinstance(duration_range, dict), f"{range_where} must be an object")
+            unknown = set(duration_range) - _RANGE_KEYS
+            _check(not unknown, f"{range_where} has unknown keys {sorted(unknown)}")
+
+            weeks = duration_range.get('weeks')
+            _check(isinstance(weeks, list) and len(weeks) == 2 and all(isinstance(w, int) for w in weeks)
+                   and 0 <= weeks[0] <= weeks[1], f"{range_where}.weeks must be [min, max] whole weeks")
+            _check(previous_max is None or weeks[0] > previous_max,
+                   f"{range_where} overlaps or is out of order with the previous range")
+            previous_max = weeks[1]
+
+            if 'assessments' in duration_range:
+                _check('count' not in duration_range and 'start' not in duration_range,
+                       f"{range_where} must use either assessments or start/count")
+                _check_names(duration_range['assessments'], f"{range_where}.assessments", assessments)
+            else:
+                count = duration_range.get('count')
+                start = duration_range.get('start', assessments[0])
+                _check(start in assessments, f"{range_where}.start must be one of the course assessments")
+                _check(isinstance(count, int) and count >= 1
+                       and assessments.index(start) + count <= len(assessments),
+                       f"{range_where}.count must fit within the course assessments")
+
+
+def compile_rules(raw, rules_hash=''):
+    """Compile validated rules into lookup arrays for vectorized evaluation
+
+    Each course gets sorted lower/upper week bounds and a bitmask of required
+    assessments per range (bit i = assessment_order[i]).
+    """
+    order = list(raw['assessment_order'])
+    bits = {name: 1 << i for i, name in enumerate(order)}
+
+    def to_mask(names):
+        mask = 0
+        for name in names:
+            mask |= bits[name]
+        return mask
+
+    courses = {}
+    for course, course_rules in raw['courses'].items():
+        assessments = list(course_rules['assessments'])
+        duration_ranges = []
+        for duration_range in course_rules['duration_ranges']:
+            if 'assessments' in duration_range:
+                tests = list(duration_range['assessments'])
+            else:
+                start = assessments.index(duration_range.get('start', assessments[0]))
+                tests = assessments[start:start + duration_range['count']]
+            duration_ranges.append((duration_range['weeks'][0], duration_range['weeks'][1], tests))
+
+        pass_mark = float(course_rules.get('pass_mark', raw['pass_mark']))
+        fingerprint = hashlib.sha256(json.dumps(
+            [assessments, duration_ranges, pass_mark, raw['passed_keywords'], raw['failed_keywords']]
+        ).encode()).hexdigest()
+
+        courses[course] = {
+            'short_name': course_rules.get('short_name', course),
+            'assessments': assessments,
+            'duration_ranges': duration_ranges,
+            'pass_mark': pass_mark,
+            'lower': np.array([r[0] for r in duration_ranges], dtype=float),
+            'upper': np.array([r[1] for r in duration_ranges], dtype=float),
+            'range_masks': np.array([to_mask(r[2]) for r in duration_ranges], dtype=np.uint64),
+            'all_mask': np.uint64(to_mask(assessments)),
+            'fingerprint': fingerprint
+        }
+
+    return {
+        'version': raw['version'],
+        'hash': rules_hash,
+        'pass_mark': float(raw['pass_mark']),
+        'passed_keywords': list(raw['passed_keywords']),
+        'failed_keywords': list(raw['failed_keywords']),
+        'assessment_order': order,
+        'courses': courses
+    }
+
+
+def load_rules(path=RULES_PATH):
+    """Load, validate and compile a rules file, reusing the compiled form if its hash is unchanged"""
+    with open(path, 'rb') as f:
+        content = f.read()
+
+    rules_hash = hashlib.sha256(content).hexdigest()
+    if rules_hash not in _compiled_rules:
+        try:
+            raw = json.loads(content)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid assessment rules: {e}") from e
+        validate_rules(raw)
+        _compiled_rules[rules_hash] = compile_rules(raw, rules_hash)
+
+    return _compiled_rules[rules_hash]
+
+
+def get_rules(path=RULES_PATH):
+    """Get the compiled rules, only rereading the file when it has changed on disk"""
+    stat = os.stat(path)
+    file_state = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _rules_file_state.get(path)
+    if cached is None or cached[0] != file_state:
+        _rules_file_state[path] = (file_state, load_rules(path))
+
+    return _rules_file_state[path][1]
+
+
+def changed_courses(old_rules, new_rules):
+    """Courses whose compiled rules differ between two rule sets"""
+    return {
+        course for course in set(old_rules['courses']) | set(new_rules['courses'])
+        if old_rules['courses'].get(course, {}).get('fingerprint') != new_rules['courses'].get(course, {}).get('fingerprint')
+    }
+
+
+STUDENT_DATA_PATH = "SMEI Student Progression.xlsx"
+STUDENT_SHEET_NAME = "SMEI"
+
+# Declared layout of the student sheet - these columns (plus the assessment
+# columns named in the rules) each have their own converter, so nothing is left
+# to dtype inference. Any other column is kept as text.
+STUDENT_COLUMNS = {
+    'StudentID': 'id',
+    'Name': 'text',
+    'Phone': 'phone',
+    'Start Date': 'date',
+    'Finish Date': 'date',
+    'Duration (weeks)': 'weeks',
+    'Course': 'text',
+    'Attendance': 'number'
+}
+REQUIRED_STUDENT_COLUMNS = ['StudentID', 'Name', 'Start Date', 'Finish Date', 'Duration (weeks)', 'Course']
+
+# Text pandas reads as a missing value by default. Text columns still treat it as
+# missing; date and number columns keep it so it can be reported as unreadable.
+MISSING_TEXT = {
+    '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+}
+TYPED_COLUMN_TYPES = ('date', 'weeks', 'number')
+
+# Read the workbook with calamine (Rust, several times faster) when python-calamine
+# is installed (needs pandas 2.2+), otherwise with openpyxl
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = 'openpyxl'
+
+# Status codes used in the vectorized status matrix
+PENDING, PASSED, FAILED = 0, 1, 2
+STATUS_NAMES = {PENDING: 'Pending', PASSED: 'Passed', FAILED: 'Failed'}
+STATUS_TYPES = {PENDING: 'pending', PASSED: 'passed', FAILED: 'failed'}
+
+
+def _to_weeks(values):
+    weeks = pd.to_numeric(values, errors='coerce')
+    # Whole weeks stay integers; a blank or fractional duration makes the column float
+    if weeks.notna().all() and (weeks % 1 == 0).all():
+        return weeks.astype('int64')
+    return weeks.astype(float)
+
+
+def _to_phone(values):
+    phones = values.str.strip()
+    # Numbers stored as numbers lose their leading 0 (e.g. 412345678 for 0412 345 678)
+    phones = phones.where(~phones.str.fullmatch(r'[1-9]\d{8}', na=False), '0' + phones)
+    return phones.str.replace(r'^\+61 (?!0)', '+61 0', regex=True)
+
+
+# Converter for each column type in STUDENT_COLUMNS; 'result' is an assessment column
+_COLUMN_CONVERTERS = {
+    'id': lambda values: values.str.strip().fillna(''),
+    'text': lambda values: values.str.strip(),
+    'phone': _to_phone,
+    'date': lambda values: pd.to_datetime(values, errors='coerce'),
+    'weeks': _to_weeks,
+    'number': lambda values: pd.to_numeric(values, errors='coerce').astype(float),
+    'result': lambda values: values.str.strip()
+}
+
+def student_schema(rules=None):
+    """Column name -> column type for the student sheet, including the rules' assessment columns"""
+    rules = rules or get_rules()
+    return {**STUDENT_COLUMNS, **{test: 'result' for test in rules['assessment_order']}}
+
+
+def read_student_workbook(path=STUDENT_DATA_PATH, sheet_name=STUDENT_SHEET_NAME, rules=None, engine=None,
+                          return_unreadable=False):
+    """Read the student sheet as text, converting each declared column to its declared type
+
+    Columns outside the schema are kept as text. Assessment columns that aren't
+    in the sheet are left out; a missing required column raises ValueError.
+    With return_unreadable, also returns the workbook text of every date or
+    number cell that couldn't be converted (Column and Value, indexed by row).
+    """
+    schema = student_schema(rules)
+    # Every cell is read as text (whole-number cells arrive as '72', not '72.0') and typed below
+    df = pd.read_excel(
+        path, sheet_name=sheet_name, engine=engine or EXCEL_ENGINE, dtype=str, keep_default_na=False, na_values=['']
+    )
+
+    missing = [col for col in REQUIRED_STUDENT_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Sheet '{sheet_name}' is missing columns: {', '.join(missing)}")
+
+    unreadable = []
+    for col in df.columns:
+        text = df[col]
+        if schema.get(col) not in TYPED_COLUMN_TYPES:
+            df[col] = _COLUMN_CONVERTERS[schema.get(col, 'text')](text.mask(text.isin(MISSING_TEXT)))
+            continue
+        df[col] = _COLUMN_CONVERTERS[schema[col]](text)
+        failed = df[col].isna() & (text.str.strip().fillna('') != '')
+        unreadable.append(pd.DataFrame({'Column': col, 'Value': text[failed]}))
+
+    if return_unreadable:
+        return df, pd.concat(unreadable)
+    return df
+
+
+def extract_scores(values):
+    """Vectorized extract_score: parse a Series of recorded values into floats (NaN if no score)"""
+    text = values.astype(object).where(values.notna(), '').astype(str).str.strip()
+    cleaned = text.str.replace(r'[^\d.]', '', regex=True)
+    return pd.to_numeric(cleaned, errors='coerce').astype(float)
+
+
+def classify_test_values(values, pass_mark=None, rules=None):
+    """Vectorized get_test_status: map a Series of recorded values to status codes
+
+    pass_mark may be a single number or an array with one pass mark per value.
+    """
+    rules = rules or get_rules()
+    if pass_mark is None:
+        pass_mark = rules['pass_mark']
+
+    text = values.astype(object).where(values.notna(), '').astype(str).str.strip().str.lower()
+    scores = extract_scores(values)
+
+    codes = np.full(len(values), PENDING, dtype=np.int8)
+    has_score = scores.notna().to_numpy()
+    codes[has_score] = np.where((scores.to_numpy() >= pass_mark)[has_score], PASSED, FAILED)
+
+    passed_kw = text.str.contains('|'.join(map(re.escape, rules['passed_keywords'])), regex=True).to_numpy()
+    failed_kw = text.str.contains('|'.join(map(re.escape, rules['failed_keywords'])), regex=True).to_numpy()
+    codes[~has_score & passed_kw] = PASSED
+    codes[~has_score & ~passed_kw & failed_kw] = FAILED
+
+    return pd.Series(codes, index=values.index)
+
+
+def course_pass_marks(df, rules=None):
+    """Pass mark that applies to each student's course"""
+    rules = rules or get_rules()
+    marks = df['Course'].map({course: c['pass_mark'] for course, c in rules['courses'].items()})
+    return marks.astype(float).fillna(rules['pass_mark']).to_numpy()
+
+
+def build_status_matrix(df, assessments=None, rules=None):
+    """Status codes for every student (rows) and assessment (columns)"""
+    rules = rules or get_rules()
+    assessments = assessments or rules['assessment_order']
+    pass_marks = course_pass_marks(df, rules)
+
+    return pd.DataFrame({
+        test: classify_test_values(df[test], pass_marks, rules) if test in df.columns
+        else pd.Series(PENDING, index=df.index, dtype=np.int8)
+        for test in assessments
+    }, index=df.index)
+
+
+def build_score_matrix(df, assessments=None, rules=None):
+    """Numeric scores for every student (rows) and assessment (columns), NaN where no score was recorded"""
+    assessments = assessments or (rules or get_rules())['assessment_order']
+    return pd.DataFrame({
+        test: extract_scores(df[test]) if test in df.columns
+        else pd.Series(np.nan, index=df.index)
+        for test in assessments
+    }, index=df.index)
+
+
+# Score bands used for the per-assessment histograms
+SCORE_BINS = np.arange(0, 101, 10)
+
+
+def score_statistics(scores, pass_mark=None, near_band=5):
+    """Per-assessment score statistics over a score matrix, computed column-wise with NumPy
+
+    Returns one row per assessment with at least one score, plus a histogram
+    frame of counts per score band.
+    """
+    if pass_mark is None:
+        pass_mark = get_rules()['pass_mark']
+
+    values = scores.to_numpy(dtype=float)
+    has_scores = ~np.isnan(values).all(axis=0)
+    values = values[:, has_scores]
+    columns = scores.columns[has_scores]
+
+    if values.shape[1] == 0:
+        return pd.DataFrame(), pd.DataFrame()
+
+    scored = ~np.isnan(values)
+    p10, p25, median, p75, p90 = np.nanpercentile(values, [10, 25, 50, 75, 90], axis=0)
+    near = scored & (np.abs(values - pass_mark) <= near_band)
+
+    stats = pd.DataFrame({
+        'Scores': scored.sum(axis=0),
+        'Mean': np.nanmean(values, axis=0),
+        'Median': median,
+        'Std Dev': np.nanstd(values, axis=0),
+        'Min': np.nanmin(values, axis=0),
+        'P10': p10,
+        'P25': p25,
+        'P75': p75,
+        'P90': p90,
+        'Max': np.nanmax(values, axis=0),
+        'Pass Rate': (np.where(scored, values >= pass_mark, False).sum(axis=0) / scored.sum(axis=0) * 100),
+        f'Near Pass Mark ({pass_mark - near_band:g}-{pass_mark + near_band:g})': near.sum(axis=0)
+    }, index=columns).round(1)
+
+    # Scores above the top band (e.g. marks out of more than 100) fall in the last band
+    band = np.clip(np.digitize(np.where(scored, values, -1), SCORE_BINS[1:-1]), 0, len(SCORE_BINS) - 2)
+    labels = [f"{low}-{high - 1}" if high < 100 else f"{low}-100" for low, high in zip(SCORE_BINS[:-1], SCORE_BINS[1:])]
+    histograms = pd.DataFrame({
+        test: np.bincount(band[scored[:, i], i], minlength=len(labels))
+        for i, test in enumerate(columns)
+    }, index=labels)
+
+    return stats, histograms
+
+
+def required_assessment_masks(df, rules=None):
+    """Bitmask of required assessments for each student, from the compiled week intervals"""
+    rules = rules or get_rules()
+    masks = np.zeros(len(df), dtype=np.uint64)
+    duration = pd.to_numeric(df['Duration (weeks)'], errors='coerce').to_numpy(dtype=float)
+    courses = df['Course'].to_numpy()
+
+    for course, compiled in rules['courses'].items():
+        in_course = courses == course
+        if not in_course.any():
+            continue
+
+        weeks = duration[in_course]
+        idx = np.searchsorted(compiled['lower'], weeks, side='right') - 1
+        idx_clipped = idx.clip(0)
+        in_range = (idx >= 0) & (weeks <= compiled['upper'][idx_clipped])
+
+        # If beyond max range (or between ranges), all assessments are required
+        masks[in_course] = np.where(in_range, compiled['range_masks'][idx_clipped], compiled['all_mask'])
+
+    return masks
+
+
+def build_required_matrix(df, assessments=None, rules=None):
+    """Boolean matrix of which assessments each student is required to take"""
+    rules = rules or get_rules()
+    order = rules['assessment_order']
+    assessments = assessments or order
+
+    masks = required_assessment_masks(df, rules)
+    shifts = np.array([order.index(test) if test in order else 64 for test in assessments], dtype=np.uint64)
+    bits = np.where(shifts < 64, (masks[:, None] >> shifts.clip(0, 63)) & np.uint64(1), 0).astype(bool)
+
+    return pd.DataFrame(bits, index=df.index, columns=assessments)
+
+
+def calculate_progression_rate(df, rows=None, rules=None):
+    """Calculate progression rate for each student and add to DataFrame
+
+    Pass a boolean mask as rows to recompute only those students.
+    """
+    rules = rules or get_rules()
+    subset = df if rows is None else df[rows]
+    required = build_required_matrix(subset, rules=rules)
+    passed = build_status_matrix(subset, rules=rules) == PASSED
+
+    required_count = required.sum(axis=1)
+    passed_count = (required & passed).sum(axis=1)
+    rates = (passed_count / required_count.where(required_count > 0) * 100).fillna(0)
+
+    if rows is None or 'Progression Rate' not in df.columns:
+        df['Progression Rate'] = 0.0
+    df.loc[subset.index, 'Progression Rate'] = rates
+
+    return df
+
+
+def extract_score(value_str):
+    """Extract numeric score from a string"""
+    if pd.isna(value_str) or value_str == '':
+        return None
+        
+    # Convert to string and clean
+    value_str = str(value_str).strip()
+    
+    # Remove all non-digit characters (except decimal point)
+    cleaned = re.sub(r'[^\d.]', '', value_str)
+    
+    try:
+        score = float(cleaned)
+        return score
+    except (ValueError, TypeError):
+        return None
+
+
+def get_test_status(test_value, pass_mark=None, rules=None):
+    """Determine the status of a test based on its value"""
+    rules = rules or get_rules()
+    if pass_mark is None:
+        pass_mark = rules['pass_mark']
+
+    if pd.isna(test_value) or str(test_value).strip() == '':
+        return 'Pending', 'pending'
+
+    value_str = str(test_value).strip()
+    
+    # Convert to lowercase for case-insensitive matching
+    value_lower = value_str.lower()
+
+    # First, check if it's a numeric score
+    score = extract_score(value_str)
+    if score is not None:
+        if score >= pass_mark:
+            return 'Passed', 'passed'
+        else:
+            return 'Failed', 'failed'
+
+    # Check passed status (case-insensitive)
+    if any(keyword in value_lower for keyword in rules['passed_keywords']):
+        return 'Passed', 'passed'
+
+    # Check failed status (case-insensitive)
+    if any(keyword in value_lower for keyword in rules['failed_keywords']):
+        return 'Failed', 'failed'
+
+    # Default to pending if any value exists but doesn't match patterns
+    return 'Pending', 'pending'
+
+
+def get_required_assessments(course, duration_weeks, rules=None):
+    """Get required tests based on course and duration"""
+    course_rules = (rules or get_rules())['courses']
+    if course not in course_rules:
+        return []
+
+    rules = course_rules[course]
+
+    for min_weeks, max_weeks, assessments in rules['duration_ranges']:
+        if min_weeks <= duration_weeks <= max_weeks:
+            return assessments
+
+    # If beyond max range, return all assessments
+    return rules['assessments']
+
+
+def calculate_test_status(student_data, rules=None):
+    """Calculate student's test status"""
+    rules = rules or get_rules()
+    required_tests = get_required_assessments(
+        student_data['Course'],
+        student_data['Duration (weeks)'],
+        rules
+    )
+    course_rules = rules['courses'].get(student_data['Course'])
+    pass_mark = course_rules['pass_mark'] if course_rules else None
+
+    passed_tests = []
+    failed_tests = []
+    pending_tests = []
+    test_details = {}
+
+    for test in required_tests:
+        test_value = student_data.get(test, '')
+        status, status_type = get_test_status(test_value, pass_mark, rules)
+
+        test_details[test] = {
+            'status': status,
+            'type': status_type,
+            'value': test_value if pd.notna(test_value) else ''
+        }
+
+        if status_type == 'passed':
+            passed_tests.append(test)
+        elif status_type == 'failed':
+            failed_tests.append(test)
+        else:
+            pending_tests.append(test)
+
+    total_completed = len(passed_tests) + len(failed_tests)
+    total_required = len(required_tests)
+    
+    # Calculate remaining tests (required - passed)
+    remaining_tests = total_required - len(passed_tests)
+
+    return {
+        'required_tests': required_tests,
+        'passed_tests': passed_tests,
+        'failed_tests': failed_tests,
+        'pending_tests': pending_tests,
+        'remaining_tests': remaining_tests,
+        'test_details': test_details,
+        'completion_rate': total_completed / total_required * 100 if total_required > 0 else 0,
+        'pass_rate': len(passed_tests) / total_required * 100 if total_required > 0 else 0
+    }
+
+
+def get_students_by_assessment(df, assessment_name, course_filter="All", status_filter="All", show_upcoming=False, rules=None):
+    """Get all students who should take a specific assessment"""
+    rules = rules or get_rules()
+    keep = np.ones(len(df), dtype=bool)
+
+    # Apply course filter
+    if course_filter != "All":
+        keep &= (df['Course'] == course_filter).to_numpy()
+
+    # Apply date filter if selected
+    if show_upcoming:
+        today = pd.Timestamp.now()
+        thirty_days_later = today + pd.Timedelta(days=30)
+        keep &= ((df['Finish Date'] >= today) & (df['Finish Date'] <= thirty_days_later)).to_numpy()
+
+    students = df[keep]
+    students = students[build_required_matrix(students, [assessment_name], rules)[assessment_name].to_numpy()]
+
+    if assessment_name in students.columns:
+        test_values = students[assessment_name]
+    else:
+        test_values = pd.Series('', index=students.index, dtype=object)
+    status = classify_test_values(test_values, course_pass_marks(students, rules), rules).map(STATUS_NAMES)
+
+    roster_columns = {
+        'StudentID': students['StudentID'],
+        'Name': students['Name'],
+        'Course': students['Course'],
+        'Start Date': students['Start Date'],
+        'Finish Date': students['Finish Date'],
+        'Duration (weeks)': students['Duration (weeks)'],
+        'Attendance': students['Attendance'] if 'Attendance' in students.columns else 0,
+        'Phone': students.get('Phone'),
+        'Status': status,
+        'Recorded Value': test_values.astype(object).where(test_values.notna(), 'Not Recorded'),
+        'Progression Rate': students['Progression Rate'] if 'Progression Rate' in students.columns else 0
+    }
+    # Role views can project the phone number away
+    if 'Phone' not in students.columns:
+        del roster_columns['Phone']
+    roster = pd.DataFrame(roster_columns)
+
+    # Apply status filter
+    if status_filter != "All":
+        roster = roster[roster['Status'] == status_filter]
+
+    return roster.reset_index(drop=True)
@@ -0,0 +1,141 @@
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+# Append-only journal of assessment results recorded from the app.
+# Records are merged over the base workbook at read time, so recording
+# results never rewrites the Excel file.
+JOURNAL_PATH = "SMEI Results Journal.db"
+
+# Compact once this many superseded records have built up
+COMPACTION_THRESHOLD = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id TEXT NOT NULL,
+    assessment TEXT NOT NULL,
+    value TEXT NOT NULL,
+    recorded_at TEXT NOT NULL
+)
+"""
+
+
+def _connect(path=JOURNAL_PATH):
+    """Open the journal database, creating the results table if needed"""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(_SCHEMA)
+    return conn
+
+
+def record_results(records, path=JOURNAL_PATH):
+    """Append (StudentID, assessment, value) records in a single transaction
+
+    Returns the new journal version.
+    """
+    recorded_at = datetime.now().isoformat(timespec='seconds')
+    rows = [
+        (str(student_id).strip(), assessment, str(value).strip(), recorded_at)
+        for student_id, assessment, value in records
+    ]
+
+    conn = _connect(path)
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT INTO results (student_id, assessment, value, recorded_at) VALUES (?, ?, ?, ?)",
+                rows
+            )
+        version = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM results").fetchone()[0]
+    finally:
+        conn.close()
+
+    if superseded_count(path) >= COMPACTION_THRESHOLD:
+        compact_journal(path)
+
+    return version
+
+
+def journal_version(path=JOURNAL_PATH):
+    """Get the sequence number of the latest record (0 for an empty journal)
+
+    Sequence numbers are never reused, so compaction does not change the version.
+    """
+    conn = _connect(path)
+    try:
+        return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM results").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def load_latest_results(path=JOURNAL_PATH, since=0):
+    """Get the most recent recorded value for each student and assessment
+
+    Pass since to only get values recorded after that journal version.
+    """
+    conn = _connect(path)
+    try:
+        return pd.read_sql_query(
+            """
+            SELECT student_id, assessment, value, recorded_at
+            FROM results
+            WHERE seq IN (SELECT MAX(seq) FROM results WHERE seq > ? GROUP BY student_id, assessment)
+            ORDER BY seq
+            """,
+            conn,
+            params=(since,)
+        )
+    finally:
+        conn.close()
+
+
+def apply_results(df, results):
+    """Merge journal results over the workbook data, one assessment column at a time"""
+    if results.empty:
+        return df
+
+    df = df.copy()
+    for assessment, group in results.groupby('assessment'):
+        values = df['StudentID'].map(group.set_index('student_id')['value'])
+        if assessment in df.columns:
+            df[assessment] = values.where(values.notna(), df[assessment].astype(object))
+        else:
+            df[assessment] = values
+
+    return df
+
+
+def superseded_count(path=JOURNAL_PATH):
+    """Count journal records that have been replaced by a newer value"""
+    conn = _connect(path)
+    try:
+        return conn.execute(
+            """
+            SELECT COUNT(*) - (SELECT COUNT(*) FROM (SELECT 1 FROM results GROUP BY student_id, assessment))
+            FROM results
+            """
+        ).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def compact_journal(path=JOURNAL_PATH):
+    """Drop superseded records, keeping only the latest value per student and assessment
+
+    Returns the number of records removed.
+    """
+    conn = _connect(path)
+    try:
+        with conn:
+            removed = conn.execute(
+                """
+                DELETE FROM results
+                WHERE seq NOT IN (SELECT MAX(seq) FROM results GROUP BY student_id, assessment)
+                """
+            ).rowcount
+        conn.execute("VACUUM")
+        return removed
+    finally:
+        conn.close()
@@ -0,0 +1,114 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from progression import get_students_by_assessment
+
+# Status filters offered in the Assessment Test view and the statuses each one keeps
+STATUS_FILTERS = {
+    "All": None,
+    "Pending + Failed": ['Pending', 'Failed'],
+    "Pending": ['Pending'],
+    "Failed": ['Failed'],
+    "Passed": ['Passed']
+}
+
+# Worker threads used to warm the roster cache after each data load
+WARMER_THREADS = 4
+
+
+def build_roster_entry(df, assessment_name, course_filter="All", show_upcoming=False, rules=None):
+    """Build an assessment roster with a row mask and summary metrics for every status filter"""
+    roster = get_students_by_assessment(df, assessment_name, course_filter, "All", show_upcoming, rules)
+    status = roster['Status'] if 'Status' in roster.columns else pd.Series(dtype=object)
+
+    masks = {}
+    metrics = {}
+    for status_filter, statuses in STATUS_FILTERS.items():
+        mask = np.ones(len(roster), dtype=bool) if statuses is None else status.isin(statuses).to_numpy()
+        selected = status[mask]
+        masks[status_filter] = mask
+        metrics[status_filter] = {
+            'Total Students': int(mask.sum()),
+            'Passed': int((selected == 'Passed').sum()),
+            'Failed': int((selected == 'Failed').sum()),
+            'Pending': int((selected == 'Pending').sum())
+        }
+
+    return {'roster': roster, 'masks': masks, 'metrics': metrics}
+
+
+def new_roster_cache(workers=WARMER_THREADS, executor=None):
+    """Create an empty roster cache with its own warmer thread pool, or sharing the given one"""
+    return {
+        'lock': threading.Lock(),
+        'data_version': None,
+        'entries': {},
+        'executor': executor or ThreadPoolExecutor(max_workers=workers, thread_name_prefix="roster-warmer")
+    }
+
+
+def _roster_key(assessment_name, course_filter, show_upcoming):
+    # Upcoming-completion rosters depend on today's date
+    return (assessment_name, course_filter, show_upcoming, pd.Timestamp.now().date() if show_upcoming else None)
+
+
+def warm_roster_cache(cache, df, data_version, assessments, courses, rules=None):
+    """Precompute every assessment x course x date-filter roster in the background
+
+    Does nothing if the cache is already warm (or warming) for this data version.
+    Work queued for an older data version is cancelled.
+    """
+    with cache['lock']:
+        if cache['data_version'] == data_version:
+            return
+
+        for future in cache['entries'].values():
+            future.cancel()
+
+        cache['data_version'] = data_version
+        cache['entries'] = {}
+
+        for assessment_name in assessments:
+            for course_filter in ["All"] + list(courses):
+                for show_upcoming in (False, True):
+                    key = _roster_key(assessment_name, course_filter, show_upcoming)
+                    cache['entries'][key] = cache['executor'].submit(
+                        build_roster_entry, df, assessment_name, course_filter, show_upcoming, rules
+                    )
+
+
+def get_roster_entry(cache, df, data_version, assessment_name, course_filter="All", show_upcoming=False, rules=None):
+    """Get a roster from the warm cache, building it on demand if the warmer hasn't finished it
+
+    Returns the entry and whether it was served from the cache.
+    """
+    key = _roster_key(assessment_name, course_filter, show_upcoming)
+
+    with cache['lock']:
+        current = cache['data_version'] == data_version
+        future = cache['entries'].get(key) if current else None
+
+    if future is not None and future.done() and not future.cancelled() and future.exception() is None:
+        return future.result(), True
+
+    entry = build_roster_entry(df, assessment_name, course_filter, show_upcoming, rules)
+
+    # Keep the on-demand result unless the warmer is still working on it
+    if current and future is None:
+        done = Future()
+        done.set_result(entry)
+        with cache['lock']:
+            if cache['data_version'] == data_version:
+                cache['entries'].setdefault(key, done)
+
+    return entry, False
+
+
+def warm_count(cache):
+    """Number of finished and total roster entries for the current data version"""
+    with cache['lock']:
+        entries = list(cache['entries'].values())
+    return sum(future.done() for future in entries), len(entries)
@@ -0,0 +1,176 @@
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from progression import (
+    PENDING, STATUS_NAMES, classify_test_values, course_pass_marks, extract_scores, get_rules
+)
+from results_journal import JOURNAL_PATH, record_results
+
+# Rows read from an examiner file at a time
+IMPORT_CHUNK_SIZE = 5000
+
+# Headers accepted for the score column when it isn't named after the assessment
+SCORE_COLUMN_NAMES = ['score', 'result', 'mark', 'value']
+
+
+def _find_columns(header, rules=None):
+    """Find the StudentID and score columns in an examiner file header"""
+    names = [str(col).strip() if col is not None else '' for col in header]
+    lower = [name.lower() for name in names]
+
+    if 'studentid' in lower:
+        id_col = lower.index('studentid')
+    elif 'student id' in lower:
+        id_col = lower.index('student id')
+    else:
+        raise ValueError("No 'StudentID' column found in the uploaded file")
+
+    assessment_order = (rules or get_rules())['assessment_order']
+    for col, name in enumerate(names):
+        if col != id_col and (name in assessment_order or name.lower() in SCORE_COLUMN_NAMES):
+            return id_col, col, name
+
+    # Otherwise take the first other non-empty column
+    for col, name in enumerate(names):
+        if col != id_col and name:
+            return id_col, col, name
+
+    raise ValueError("No score column found in the uploaded file")
+
+
+def _read_csv_chunks(source, chunksize, rules=None):
+    reader = pd.read_csv(source, dtype=str, keep_default_na=False, chunksize=chunksize)
+    first = next(reader, None)
+    if first is None:
+        raise ValueError("The uploaded file is empty")
+
+    id_col, score_col, score_name = _find_columns(first.columns, rules)
+
+    def normalised():
+        for chunk in chain([first], reader):
+            yield pd.DataFrame({
+                'StudentID': chunk.iloc[:, id_col],
+                'Value': chunk.iloc[:, score_col]
+            })
+
+    return score_name, normalised()
+
+
+def _read_xlsx_chunks(source, chunksize, rules=None):
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    rows = workbook.worksheets[0].iter_rows(values_only=True)
+    header = next(rows, None)
+    if header is None:
+        workbook.close()
+        raise ValueError("The uploaded file is empty")
+
+    id_col, score_col, score_name = _find_columns(header, rules)
+
+    def normalised():
+        buffer = []
+        try:
+            for row in rows:
+                buffer.append((
+                    row[id_col] if id_col < len(row) else None,
+                    row[score_col] if score_col < len(row) else None
+                ))
+                if len(buffer) >= chunksize:
+                    yield pd.DataFrame(buffer, columns=['StudentID', 'Value'], dtype=object)
+                    buffer = []
+            if buffer:
+                yield pd.DataFrame(buffer, columns=['StudentID', 'Value'], dtype=object)
+        finally:
+            workbook.close()
+
+    return score_name, normalised()
+
+
+def read_score_file(source, filename, chunksize=IMPORT_CHUNK_SIZE, rules=None):
+    """Open an examiner CSV or xlsx file of StudentID plus score
+
+    Returns the score column header and an iterator of (StudentID, Value) chunks.
+    """
+    if str(filename).lower().endswith(('.xlsx', '.xlsm')):
+        return _read_xlsx_chunks(source, chunksize, rules)
+    return _read_csv_chunks(source, chunksize, rules)
+
+
+def validate_scores(chunks, roster, rules=None):
+    """Join imported scores to the roster (StudentID and Course) on StudentID and classify each value
+
+    Scores are classified against the pass mark of each student's course, as
+    they will be once recorded. Returns a dict with the valid results, unknown
+    IDs, unparseable and blank values, rows with a value but no StudentID, and
+    IDs that appeared more than once (the last value is kept).
+    """
+    rules = rules or get_rules()
+    # Hash index over the roster IDs for the join, with each student's pass mark
+    roster_ids = roster['StudentID'].astype(str).str.strip()
+    first = ~roster_ids.duplicated().to_numpy()
+    roster_index = pd.Index(roster_ids[first])
+    roster_pass_marks = course_pass_marks(roster, rules)[first]
+
+    valid_parts = []
+    unknown_parts = []
+    unparseable_parts = []
+    blank_count = 0
+    missing_id_count = 0
+    total_rows = 0
+
+    for chunk in chunks:
+        total_rows += len(chunk)
+        ids = chunk['StudentID'].astype(object).where(chunk['StudentID'].notna(), '').astype(str).str.strip()
+        values = chunk['Value']
+        text = values.astype(object).where(values.notna(), '').astype(str).str.strip()
+
+        positions = roster_index.get_indexer(ids)
+        known = positions >= 0
+        blank = (text == '').to_numpy()
+
+        # Same rules as get_test_status - values that are neither a score nor a keyword would fall back to Pending
+        pass_marks = np.where(known, roster_pass_marks[positions.clip(0)], rules['pass_mark'])
+        codes = classify_test_values(text, pass_marks, rules)
+        recognised = (extract_scores(text).notna() | (codes != PENDING)).to_numpy()
+
+        unknown_parts.append(ids[~known & (ids != '').to_numpy()])
+        unparseable_parts.append(pd.DataFrame({'StudentID': ids, 'Value': text})[known & ~blank & ~recognised])
+        blank_count += int((known & blank).sum())
+        missing_id_count += int(((ids == '').to_numpy() & ~blank).sum())
+
+        keep = known & ~blank & recognised
+        valid_parts.append(pd.DataFrame({
+            'StudentID': ids[keep],
+            'Value': text[keep],
+            'Status': codes[keep].map(STATUS_NAMES)
+        }))
+
+    valid = pd.concat(valid_parts, ignore_index=True) if valid_parts else pd.DataFrame(columns=['StudentID', 'Value', 'Status'])
+    duplicated = valid['StudentID'][valid['StudentID'].duplicated()].unique().tolist()
+    valid = valid.drop_duplicates('StudentID', keep='last').reset_index(drop=True)
+
+    unknown = pd.concat(unknown_parts).unique().tolist() if unknown_parts else []
+    unparseable = pd.concat(unparseable_parts, ignore_index=True) if unparseable_parts else pd.DataFrame(columns=['StudentID', 'Value'])
+
+    return {
+        'valid': valid,
+        'unknown_ids': unknown,
+        'unparseable': unparseable,
+        'blank_count': blank_count,
+        'missing_id_count': missing_id_count,
+        'duplicate_ids': duplicated,
+        'total_rows': total_rows
+    }
+
+
+def apply_scores(report, assessment, path=JOURNAL_PATH):
+    """Record all valid imported scores for an assessment as one journal batch"""
+    valid = report['valid']
+    if valid.empty:
+        return None
+    return record_results(
+        zip(valid['StudentID'], [assessment] * len(valid), valid['Value']),
+        path
+    )
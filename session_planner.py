@@ -0,0 +1,120 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from progression import FAILED, PASSED, build_required_matrix, build_status_matrix, get_rules
+
+# Test session planner - finds the next assessment each student is due to sit
+# and batches students into test sessions by assessment and week.
+#   python session_planner.py --weeks 4 --capacity 20 --csv plan.csv
+
+# Seats in one test room unless the tenant sets room_capacity
+ROOM_CAPACITY = 20
+
+# Weeks ahead (including this one) the planner schedules
+PLAN_WEEKS = 4
+
+PLAN_COLUMNS = ['Week Starting', 'Assessment', 'Session', 'StudentID', 'Name', 'Course', 'Due Date', 'Reason']
+SESSION_COLUMNS = ['Week Starting', 'Assessment', 'Session', 'Students', 'Resits', 'Overdue']
+
+
+def next_due_assessments(df, status=None, required=None, today=None, rules=None):
+    """Next required assessment each student hasn't passed, with the date it falls due
+
+    A student's required tests are spread evenly over their course, so the
+    j-th of k tests is due j/k of the way through Duration (weeks) from the
+    Start Date. Returns one row per student who still has a test to pass,
+    indexed like df.
+    """
+    rules = rules or get_rules()
+    order = np.array(rules['assessment_order'], dtype=object)
+    today = pd.Timestamp(today or pd.Timestamp.now()).normalize()
+    if status is None:
+        status = build_status_matrix(df, rules=rules)
+    if required is None:
+        required = build_required_matrix(df, rules=rules)
+
+    codes = status[list(order)].to_numpy()
+    needed = required[list(order)].to_numpy()
+    outstanding = needed & (codes != PASSED)
+
+    rows = np.arange(len(df))
+    next_test = outstanding.argmax(axis=1)
+    position = np.cumsum(needed, axis=1)[rows, next_test]
+    share = position / np.maximum(needed.sum(axis=1), 1)
+
+    duration = pd.to_numeric(df['Duration (weeks)'], errors='coerce').to_numpy(dtype=float)
+    due = df['Start Date'] + pd.to_timedelta(np.round(duration * share * 7), unit='D')
+    resit = codes[rows, next_test] == FAILED
+
+    # Students who have finished, or whose dates can't be read, are left out
+    keep = outstanding.any(axis=1) & due.notna().to_numpy() & (df['Finish Date'] >= today).to_numpy()
+
+    return pd.DataFrame({
+        'StudentID': df['StudentID'],
+        'Name': df['Name'],
+        'Course': df['Course'],
+        'Assessment': pd.Categorical(order[next_test], categories=order),
+        'Due Date': due,
+        'Reason': np.select([resit, (due < today).to_numpy()], ['Resit', 'Overdue'], default='Due')
+    }, index=df.index)[keep]
+
+
+def plan_test_sessions(df, capacity=ROOM_CAPACITY, weeks=PLAN_WEEKS, status=None, required=None, today=None, rules=None):
+    """Batch students due in the next few weeks into test sessions of at most capacity students
+
+    Overdue tests and resits go in this week's sessions. Students sitting the
+    same assessment in the same week are split evenly across as few sessions
+    as the room capacity allows. Returns the student plan and one row per session.
+    """
+    today = pd.Timestamp(today or pd.Timestamp.now()).normalize()
+    this_week = today - pd.Timedelta(days=today.dayofweek)
+    due = next_due_assessments(df, status, required, today, rules)
+
+    week = due['Due Date'].dt.normalize() - pd.to_timedelta(due['Due Date'].dt.dayofweek, unit='D')
+    week = week.where(due['Reason'] == 'Due', this_week)
+    plan = due.assign(**{'Week Starting': week})
+    plan = plan[plan['Week Starting'] < this_week + pd.Timedelta(weeks=weeks)]
+    # Assessments sort in course order, so each week's sessions run from the lowest level up
+    plan = plan.sort_values(['Week Starting', 'Assessment', 'Due Date', 'StudentID'], kind='stable')
+
+    group = plan.groupby(['Week Starting', 'Assessment'], sort=False, observed=True)
+    size = group['StudentID'].transform('size').to_numpy()
+    sessions = -(-size // capacity)
+    plan['Session'] = group.cumcount().to_numpy() * sessions // np.maximum(size, 1) + 1
+    plan = plan[PLAN_COLUMNS].reset_index(drop=True)
+
+    summary = plan.assign(
+        Resits=plan['Reason'] == 'Resit',
+        Overdue=plan['Reason'] == 'Overdue'
+    ).groupby(['Week Starting', 'Assessment', 'Session'], sort=False, observed=True).agg(
+        Students=('StudentID', 'size'), Resits=('Resits', 'sum'), Overdue=('Overdue', 'sum')
+    ).reset_index()
+
+    return plan, summary[SESSION_COLUMNS]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Plan the next test sessions from the student workbook")
+    parser.add_argument("--tenant", help="college from tenants.json (defaults to SMEI_TENANT or the default tenant)")
+    parser.add_argument("--weeks", type=int, default=PLAN_WEEKS, help="weeks ahead to plan, including this one")
+    parser.add_argument("--capacity", type=int, help="seats per test room (defaults to the tenant's room_capacity)")
+    parser.add_argument("--csv", help="write the student plan to this CSV file")
+    args = parser.parse_args()
+
+    from tenants import get_tenants, load_tenant_data, select_tenant
+    tenant = select_tenant(get_tenants(), args.tenant)
+    tenant_rules = get_rules(tenant['rules'])
+    df = load_tenant_data(tenant, tenant_rules)[0]
+
+    started = time.perf_counter()
+    plan, sessions = plan_test_sessions(df, args.capacity or tenant['room_capacity'], args.weeks, rules=tenant_rules)
+    elapsed = time.perf_counter() - started
+
+    with pd.option_context('display.width', 200, 'display.max_rows', None):
+        print(sessions.assign(**{'Week Starting': sessions['Week Starting'].dt.strftime('%Y-%m-%d')}).to_string(index=False))
+    print(f"{len(plan)} students in {len(sessions)} sessions, planned in {elapsed:.3f}s")
+    if args.csv:
+        plan.to_csv(args.csv, index=False)
@@ -0,0 +1,322 @@
+import argparse
+import os
+import sqlite3
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from progression import (
+    PASSED, FAILED, PENDING, build_required_matrix, build_status_matrix,
+    extract_scores, get_rules, read_student_workbook
+)
+
+# Snapshot log of each loaded data version. Only cells that changed since the
+# previous snapshot are stored, so trends are rebuilt from the deltas alone.
+SNAPSHOT_PATH = "SMEI Snapshots.db"
+
+# Status code for assessments a student is not (or no longer) required to take
+NOT_REQUIRED = -1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    data_version TEXT NOT NULL UNIQUE,
+    taken_at TEXT NOT NULL,
+    student_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS deltas (
+    snapshot_id INTEGER NOT NULL,
+    student_id TEXT NOT NULL,
+    assessment TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    prev_status INTEGER NOT NULL,
+    score REAL,
+    prev_score REAL
+);
+CREATE INDEX IF NOT EXISTS deltas_by_assessment ON deltas (assessment, snapshot_id);
+CREATE INDEX IF NOT EXISTS deltas_by_snapshot ON deltas (snapshot_id);
+CREATE TABLE IF NOT EXISTS latest_state (
+    student_id TEXT NOT NULL,
+    assessment TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    score REAL,
+    PRIMARY KEY (student_id, assessment)
+);
+CREATE TABLE IF NOT EXISTS attendance_deltas (
+    snapshot_id INTEGER NOT NULL,
+    student_id TEXT NOT NULL,
+    attendance REAL,
+    prev_attendance REAL
+);
+CREATE INDEX IF NOT EXISTS attendance_deltas_by_snapshot ON attendance_deltas (snapshot_id);
+CREATE TABLE IF NOT EXISTS latest_attendance (
+    student_id TEXT PRIMARY KEY,
+    attendance REAL NOT NULL
+);
+"""
+
+
+def _connect(path=SNAPSHOT_PATH):
+    """Open the snapshot database, creating the tables if needed"""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def snapshot_state(df, rules=None):
+    """Status and score of every required assessment, one row per student and assessment"""
+    rules = rules or get_rules()
+    order = rules['assessment_order']
+
+    required = build_required_matrix(df, rules=rules).to_numpy()
+    status = build_status_matrix(df, rules=rules).to_numpy()
+    scores = np.column_stack([
+        extract_scores(df[test]).to_numpy() if test in df.columns else np.full(len(df), np.nan)
+        for test in order
+    ])
+
+    state = pd.DataFrame({
+        'student_id': np.repeat(df['StudentID'].to_numpy(), len(order)),
+        'assessment': np.tile(order, len(df)),
+        'status': status.ravel(),
+        'score': scores.ravel()
+    })
+    state = state[required.ravel()]
+    return state.drop_duplicates(['student_id', 'assessment'], keep='last').reset_index(drop=True)
+
+
+def _attendance_changes(df, conn):
+    """Students whose attendance differs from the latest recorded value"""
+    current = pd.DataFrame({
+        'student_id': df['StudentID'].to_numpy(),
+        'attendance': pd.to_numeric(df['Attendance'], errors='coerce').to_numpy(dtype=float)
+    }).drop_duplicates('student_id', keep='last')
+    previous = pd.read_sql_query("SELECT student_id, attendance FROM latest_attendance", conn)
+
+    merged = current.merge(previous, on='student_id', how='outer', suffixes=('', '_prev'))
+    same = (merged['attendance'] == merged['attendance_prev']) | (merged['attendance'].isna() & merged['attendance_prev'].isna())
+    return merged[~same]
+
+
+def record_snapshot(df, data_version, path=SNAPSHOT_PATH, taken_at=None, rules=None):
+    """Record the changes since the previous snapshot for a data version
+
+    Returns the number of changed cells, or None if the version was already recorded.
+    """
+    taken_at = taken_at or datetime.now().isoformat(timespec='seconds')
+
+    conn = _connect(path)
+    try:
+        if conn.execute("SELECT 1 FROM snapshots WHERE data_version = ?", (data_version,)).fetchone():
+            return None
+
+        current = snapshot_state(df, rules)
+        previous = pd.read_sql_query("SELECT student_id, assessment, status, score FROM latest_state", conn)
+
+        merged = current.merge(previous, on=['student_id', 'assessment'], how='outer', suffixes=('', '_prev'))
+        merged['status'] = merged['status'].fillna(NOT_REQUIRED).astype(int)
+        merged['status_prev'] = merged['status_prev'].fillna(NOT_REQUIRED).astype(int)
+
+        same_score = (merged['score'] == merged['score_prev']) | (merged['score'].isna() & merged['score_prev'].isna())
+        changed = merged[(merged['status'] != merged['status_prev']) | ~same_score]
+        attendance = _attendance_changes(df, conn)
+
+        with conn:
+            snapshot_id = conn.execute(
+                "INSERT INTO snapshots (data_version, taken_at, student_count) VALUES (?, ?, ?)",
+                (data_version, taken_at, len(df))
+            ).lastrowid
+
+            conn.executemany(
+                "INSERT INTO deltas VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (snapshot_id, student_id, assessment, status, prev_status,
+                     None if pd.isna(score) else score, None if pd.isna(prev_score) else prev_score)
+                    for student_id, assessment, status, prev_status, score, prev_score in zip(
+                        changed['student_id'], changed['assessment'], changed['status'],
+                        changed['status_prev'], changed['score'], changed['score_prev']
+                    )
+                ]
+            )
+
+            # Only the changed cells need updating in the latest state
+            conn.executemany(
+                "DELETE FROM latest_state WHERE student_id = ? AND assessment = ?",
+                zip(changed['student_id'], changed['assessment'])
+            )
+            still_required = changed[changed['status'] != NOT_REQUIRED]
+            conn.executemany(
+                "INSERT INTO latest_state VALUES (?, ?, ?, ?)",
+                [
+                    (student_id, assessment, status, None if pd.isna(score) else score)
+                    for student_id, assessment, status, score in zip(
+                        still_required['student_id'], still_required['assessment'],
+                        still_required['status'], still_required['score']
+                    )
+                ]
+            )
+
+            conn.executemany(
+                "INSERT INTO attendance_deltas VALUES (?, ?, ?, ?)",
+                [
+                    (snapshot_id, student_id, None if pd.isna(value) else value, None if pd.isna(prev) else prev)
+                    for student_id, value, prev in zip(
+                        attendance['student_id'], attendance['attendance'], attendance['attendance_prev']
+                    )
+                ]
+            )
+            conn.executemany(
+                "DELETE FROM latest_attendance WHERE student_id = ?",
+                zip(attendance['student_id'])
+            )
+            recorded = attendance[attendance['attendance'].notna()]
+            conn.executemany(
+                "INSERT INTO latest_attendance VALUES (?, ?)",
+                zip(recorded['student_id'], recorded['attendance'])
+            )
+
+        return len(changed)
+    finally:
+        conn.close()
+
+
+def record_backfill(df, workbook, taken_at, path=SNAPSHOT_PATH, rules=None):
+    """Record an old copy of the workbook as the snapshot taken at taken_at
+
+    Each copy is diffed against the latest recorded state, so a copy taken
+    before the latest snapshot raises ValueError. Returns as record_snapshot.
+    """
+    latest = latest_taken_at(path)
+    if latest is not None and pd.Timestamp(taken_at) < pd.Timestamp(latest):
+        raise ValueError(f"taken at {taken_at}, before the latest snapshot ({latest})")
+    return record_snapshot(df, f"backfill:{workbook}:{taken_at}", path, taken_at=taken_at, rules=rules)
+
+
+def load_trend(assessment, path=SNAPSHOT_PATH, freq='W'):
+    """Rebuild passed/failed/pending counts for an assessment from the snapshot deltas
+
+    Counts are accumulated from the deltas (no snapshot is replayed in full) and
+    resampled to the last snapshot in each period.
+    """
+    conn = _connect(path)
+    try:
+        snapshots = pd.read_sql_query("SELECT id, taken_at FROM snapshots ORDER BY taken_at, id", conn)
+        deltas = pd.read_sql_query(
+            "SELECT snapshot_id, status, prev_status, score, prev_score FROM deltas WHERE assessment = ?",
+            conn,
+            params=(assessment,)
+        )
+    finally:
+        conn.close()
+
+    if snapshots.empty:
+        return pd.DataFrame(columns=['Passed', 'Failed', 'Pending', 'Pass Rate', 'Mean Score'])
+
+    net = pd.DataFrame(index=deltas['snapshot_id'].unique())
+    for code, name in [(PASSED, 'Passed'), (FAILED, 'Failed'), (PENDING, 'Pending')]:
+        added = (deltas['status'] == code).groupby(deltas['snapshot_id']).sum()
+        removed = (deltas['prev_status'] == code).groupby(deltas['snapshot_id']).sum()
+        net[name] = added - removed
+    net['score_sum'] = (deltas['score'].fillna(0) - deltas['prev_score'].fillna(0)).groupby(deltas['snapshot_id']).sum()
+    net['score_count'] = (deltas['score'].notna().astype(int) - deltas['prev_score'].notna().astype(int)).groupby(deltas['snapshot_id']).sum()
+
+    totals = net.reindex(snapshots['id'], fill_value=0).cumsum()
+    totals.index = pd.to_datetime(snapshots['taken_at']).to_numpy()
+
+    trend = totals.resample(freq).last().ffill()
+    attempted = trend['Passed'] + trend['Failed']
+    trend['Pass Rate'] = (trend['Passed'] / attempted.where(attempted > 0) * 100).round(1)
+    trend['Mean Score'] = (trend['score_sum'] / trend['score_count'].where(trend['score_count'] > 0)).round(1)
+
+    return trend[['Passed', 'Failed', 'Pending', 'Pass Rate', 'Mean Score']]
+
+
+def load_changes(since=0, path=SNAPSHOT_PATH):
+    """Status and attendance deltas recorded after a snapshot id, with the latest snapshot id
+
+    Only the delta rows are read, so the cost follows the number of changes.
+    """
+    conn = _connect(path)
+    try:
+        latest = conn.execute("SELECT COALESCE(MAX(id), 0) FROM snapshots").fetchone()[0]
+        status = pd.read_sql_query(
+            """
+            SELECT snapshot_id, student_id, assessment, status, prev_status, score
+            FROM deltas WHERE snapshot_id > ? ORDER BY snapshot_id
+            """,
+            conn,
+            params=(since,)
+        )
+        attendance = pd.read_sql_query(
+            """
+            SELECT snapshot_id, student_id, attendance, prev_attendance
+            FROM attendance_deltas WHERE snapshot_id > ? ORDER BY snapshot_id
+            """,
+            conn,
+            params=(since,)
+        )
+        return status, attendance, latest
+    finally:
+        conn.close()
+
+
+def snapshot_recorded(data_version, path=SNAPSHOT_PATH):
+    """Whether a data version has already been recorded"""
+    conn = _connect(path)
+    try:
+        return conn.execute("SELECT 1 FROM snapshots WHERE data_version = ?", (data_version,)).fetchone() is not None
+    finally:
+        conn.close()
+
+
+def latest_taken_at(path=SNAPSHOT_PATH):
+    """When the most recent snapshot was taken, or None if nothing is recorded"""
+    conn = _connect(path)
+    try:
+        return conn.execute("SELECT MAX(taken_at) FROM snapshots").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def snapshot_count(path=SNAPSHOT_PATH):
+    """Number of data versions recorded"""
+    conn = _connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    # Backfill snapshots from old copies of the workbook, oldest first
+    parser = argparse.ArgumentParser(description="Record workbook copies as historical snapshots")
+    parser.add_argument("workbooks", nargs="+", help="xlsx files to record, oldest first")
+    parser.add_argument("--taken-at", nargs="*", help="date of each workbook (defaults to the file's modification time)")
+    parser.add_argument("--tenant", help="college from tenants.json (defaults to SMEI_TENANT or the default tenant)")
+    args = parser.parse_args()
+
+    from tenants import get_tenants, select_tenant
+    tenant = select_tenant(get_tenants(), args.tenant)
+    tenant_rules = get_rules(tenant['rules'])
+
+    for i, workbook in enumerate(args.workbooks):
+        if args.taken_at and i < len(args.taken_at):
+            taken_at = args.taken_at[i]
+        else:
+            taken_at = datetime.fromtimestamp(os.path.getmtime(workbook)).isoformat(timespec='seconds')
+
+        try:
+            changed = record_backfill(
+                read_student_workbook(workbook, tenant['sheet_name'], tenant_rules),
+                workbook,
+                taken_at,
+                tenant['snapshots'],
+                rules=tenant_rules
+            )
+        except ValueError as e:
+            print(f"{workbook}: refused - {e}")
+            sys.exit(1)
+        print(f"{workbook}: {'already recorded' if changed is None else f'{changed} changed assessments'}")
@@ -0,0 +1,98 @@
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from progression import RULES_PATH, build_required_matrix, get_rules
+
+# Synthetic student rosters shaped like the real workbook, for profiling and
+# load testing without real student data
+
+_FIRST_NAMES = ['Aiko', 'Bolor', 'Camila', 'Diksha', 'Emre', 'Farah', 'Gabriel', 'Hana', 'Ivan', 'Jun',
+                'Kavya', 'Luis', 'Mahiro', 'Nima', 'Oyuna', 'Priya', 'Quang', 'Rajani', 'Suji', 'Thiago']
+_LAST_NAMES = ['BASTOLA', 'CHEN', 'DA SILVA', 'ENKHZUL', 'GARCIA', 'KIM', 'LAMICHHANE', 'MAHARJAN',
+               'MORITA', 'NGUYEN', 'PATEL', 'RANI', 'SATO', 'SHRESTHA', 'TANAKA', 'YILMAZ']
+
+
+def make_roster(n, rules=None, seed=0, today=None):
+    """A frame of n synthetic students with results recorded for the tests they should have sat by today"""
+    rules = rules or get_rules()
+    rng = np.random.default_rng(seed)
+    today = pd.Timestamp(today or pd.Timestamp.now()).normalize()
+
+    courses = list(rules['courses'])
+    course = rng.choice(courses, n)
+    max_weeks = pd.Series(course).map({c: rules['courses'][c]['upper'].max() for c in courses}).to_numpy()
+    duration = (rng.random(n) * max_weeks).astype(int) + 1
+
+    # Courses start on a Monday in the last year and finish on a Sunday, sometimes after a two-week break
+    monday = today - pd.Timedelta(days=today.dayofweek)
+    start = monday - pd.to_timedelta(rng.integers(0, 52, n) * 7, unit='D')
+    breaks = rng.choice([0, 0, 0, 14], n)
+    finish = start + pd.to_timedelta(duration * 7 + breaks - 1, unit='D')
+
+    df = pd.DataFrame({
+        'StudentID': [f"SYN{i:06d}" for i in range(1, n + 1)],
+        'Name': [f"{first} {last}" for first, last in zip(rng.choice(_FIRST_NAMES, n), rng.choice(_LAST_NAMES, n))],
+        'Phone': rng.integers(400000000, 499999999, n),
+        'Start Date': start,
+        'Finish Date': finish,
+        'Duration (weeks)': duration,
+        'Course': course,
+        'Progression': np.nan,
+        'Attendance': rng.uniform(0, 100, n).round(2)
+    })
+
+    # Students have sat the share of their required tests that matches how far through the course they are
+    required = build_required_matrix(df, rules=rules).to_numpy()
+    elapsed = ((today - df['Start Date']).dt.days / 7 / df['Duration (weeks)']).clip(0, 1).to_numpy()
+    attempted = np.floor(elapsed * required.sum(axis=1)).astype(int)
+    taken = required & (np.cumsum(required, axis=1) <= attempted[:, None])
+
+    outcome = rng.random(required.shape)
+    scores = rng.integers(30, 101, required.shape).astype(str)
+    values = np.where(outcome < 0.7, 'Passed', np.where(outcome < 0.85, 'Failed', scores))
+    for i, test in enumerate(rules['assessment_order']):
+        df[test] = pd.Series(np.where(taken[:, i], values[:, i], None), dtype=object)
+
+    return df
+
+
+def write_tenant(directory, n, seed=0, rules_path=RULES_PATH, tenant_id='synthetic'):
+    """Write a synthetic workbook and a tenants.json pointing at it into a directory
+
+    Run the app (or a headless job) from that directory to use the synthetic tenant.
+    """
+    os.makedirs(directory, exist_ok=True)
+    rules_path = os.path.abspath(rules_path)
+    workbook = f"Synthetic {n} Students.xlsx"
+
+    df = make_roster(n, get_rules(rules_path), seed)
+    df.to_excel(os.path.join(directory, workbook), sheet_name='SYN', index=False, engine='xlsxwriter')
+
+    with open(os.path.join(directory, 'tenants.json'), 'w', encoding='utf-8') as f:
+        json.dump({
+            'default_tenant': tenant_id,
+            'tenants': {
+                tenant_id: {
+                    'name': f"Synthetic College ({n} students)",
+                    'short_name': 'SYN',
+                    'workbook': workbook,
+                    'sheet_name': 'SYN',
+                    'rules': rules_path
+                }
+            }
+        }, f, indent=2)
+
+    return os.path.join(directory, workbook)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic roster and tenants.json for profiling")
+    parser.add_argument("directory")
+    parser.add_argument("students", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(write_tenant(args.directory, args.students, args.seed))
@@ -0,0 +1,230 @@
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from tenants import cache_info
+
+# Audit log and latency telemetry. Searches, filter changes, roster queries,
+# exports and API requests are recorded as events. Each event is counted in
+# memory for the metrics endpoint and queued for a background thread that
+# appends it to the tenant's rotating JSONL audit log, so recording never
+# waits on the disk. When the queue is full or the log can't be written,
+# events are dropped and counted. Rotation isn't safe across processes, so the
+# app writes the tenant's audit_log and api.py its api_audit_log.
+#   curl http://127.0.0.1:9464/metrics
+
+# Port of the Prometheus-style metrics endpoint served by the app, on localhost only
+TELEMETRY_PORT = 9464
+TELEMETRY_PORT_ENV_VAR = "SMEI_METRICS_PORT"
+
+# Events waiting to be written before new ones are dropped
+EVENT_QUEUE_SIZE = 10000
+
+# Most queued events written in one go
+WRITE_BATCH = 1000
+
+# Each audit log is rotated at this size, keeping this many old files
+AUDIT_LOG_MB = 10
+AUDIT_LOG_BACKUPS = 5
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_shared = {}
+_shared_lock = threading.Lock()
+
+
+def new_telemetry(log_key='audit_log', queue_size=EVENT_QUEUE_SIZE, max_mb=AUDIT_LOG_MB, backups=AUDIT_LOG_BACKUPS):
+    """Create an event recorder writing to each tenant's log_key file and start its writer thread"""
+    telemetry = {
+        'lock': threading.Lock(),
+        'log_key': log_key,
+        'queue': queue.Queue(maxsize=queue_size),
+        'max_bytes': max_mb * 1024 * 1024,
+        'backups': backups,
+        'events': {},
+        'dropped': 0,
+        'caches': {}
+    }
+    threading.Thread(target=_write_events, args=(telemetry,), name="audit-log-writer", daemon=True).start()
+    return telemetry
+
+
+def shared_telemetry(log_key='audit_log'):
+    """The process's recorder for log_key, created on first use
+
+    Streamlit cache clears and repeated imports reuse it instead of starting
+    another writer thread.
+    """
+    with _shared_lock:
+        if log_key not in _shared:
+            _shared[log_key] = new_telemetry(log_key)
+        return _shared[log_key]
+
+
+def _count_dropped(telemetry, count):
+    with telemetry['lock']:
+        telemetry['dropped'] += count
+
+
+def _open_audit_log(telemetry, path):
+    handler = logging.handlers.RotatingFileHandler(
+        path, maxBytes=telemetry['max_bytes'], backupCount=telemetry['backups'], encoding='utf-8'
+    )
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    # A failed write or rollover is reported through handleError instead of raising
+    handler.handleError = lambda record: _count_dropped(telemetry, record.msg.count('\n') + 1)
+    return handler
+
+
+def _write_events(telemetry):
+    """Append queued events to their audit logs, one rotating file handler per log
+
+    Events already waiting are written together, so a burst costs one write per log.
+    A log that can't be opened is retried with the next batch.
+    """
+    handlers = {}
+    while True:
+        batch = [telemetry['queue'].get()]
+        while len(batch) < WRITE_BATCH:
+            try:
+                batch.append(telemetry['queue'].get_nowait())
+            except queue.Empty:
+                break
+
+        lines = {}
+        for path, line in batch:
+            lines.setdefault(path, []).append(line)
+        try:
+            for path, path_lines in lines.items():
+                try:
+                    if path not in handlers:
+                        handlers[path] = _open_audit_log(telemetry, path)
+                except OSError:
+                    _count_dropped(telemetry, len(path_lines))
+                    continue
+                handlers[path].emit(logging.makeLogRecord({'msg': "\n".join(path_lines)}))
+        finally:
+            for _ in batch:
+                telemetry['queue'].task_done()
+
+
+def record_event(telemetry, tenant, event, seconds, cache=None, **fields):
+    """Count an event with its latency and queue it for the tenant's audit log without blocking
+
+    cache is 'hit' or 'miss' when the event was served from (or filled) a cache.
+    """
+    cache = cache or 'none'
+    bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound), len(LATENCY_BUCKETS))
+
+    with telemetry['lock']:
+        counts = telemetry['events'].setdefault(
+            (tenant['id'], event, cache), {'count': 0, 'seconds': 0.0, 'buckets': [0] * (len(LATENCY_BUCKETS) + 1)}
+        )
+        counts['count'] += 1
+        counts['seconds'] += seconds
+        counts['buckets'][bucket] += 1
+
+    line = json.dumps({
+        'time': datetime.now().isoformat(timespec='milliseconds'),
+        'tenant': tenant['id'],
+        'event': event,
+        'seconds': round(seconds, 6),
+        'cache': cache,
+        **fields
+    }, default=str)
+    try:
+        telemetry['queue'].put_nowait((tenant[telemetry['log_key']], line))
+    except queue.Full:
+        _count_dropped(telemetry, 1)
+
+
+def register_cache(telemetry, tenant_id, name, cache):
+    """Report a bounded cache's size and hit/miss counters on the metrics endpoint"""
+    with telemetry['lock']:
+        telemetry['caches'][(tenant_id, name)] = cache
+
+
+def _labels(**labels):
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in labels.values())
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + "}"
+
+
+def render_metrics(telemetry):
+    """Event counts, latency histograms and cache counters in the Prometheus text format"""
+    with telemetry['lock']:
+        events = {key: {**counts, 'buckets': list(counts['buckets'])} for key, counts in telemetry['events'].items()}
+        dropped = telemetry['dropped']
+        caches = dict(telemetry['caches'])
+
+    lines = [
+        "# HELP smei_events_total Audited events by tenant, event and cache outcome.",
+        "# TYPE smei_events_total counter"
+    ]
+    for (tenant_id, event, cache), counts in sorted(events.items()):
+        lines.append(f"smei_events_total{_labels(tenant=tenant_id, event=event, cache=cache)} {counts['count']}")
+
+    lines += [
+        "# HELP smei_event_seconds Latency of audited events.",
+        "# TYPE smei_event_seconds histogram"
+    ]
+    for (tenant_id, event, cache), counts in sorted(events.items()):
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), counts['buckets']):
+            cumulative += count
+            lines.append(f"smei_event_seconds_bucket{_labels(tenant=tenant_id, event=event, cache=cache, le=bound)} {cumulative}")
+        lines.append(f"smei_event_seconds_sum{_labels(tenant=tenant_id, event=event, cache=cache)} {counts['seconds']:.6f}")
+        lines.append(f"smei_event_seconds_count{_labels(tenant=tenant_id, event=event, cache=cache)} {counts['count']}")
+
+    lines += [
+        "# HELP smei_events_dropped_total Events not written to the audit log because the queue was full or the log could not be written.",
+        "# TYPE smei_events_dropped_total counter",
+        f"smei_events_dropped_total {dropped}"
+    ]
+
+    cache_metrics = [
+        ('hits', 'smei_cache_hits_total', 'counter', "Bounded cache lookups served from the cache."),
+        ('misses', 'smei_cache_misses_total', 'counter', "Bounded cache lookups that had to compute the value."),
+        ('evictions', 'smei_cache_evictions_total', 'counter', "Entries evicted to stay within the cache budget."),
+        ('entries', 'smei_cache_entries', 'gauge', "Entries held in the cache."),
+        ('max_entries', 'smei_cache_max_entries', 'gauge', "Entry limit of the cache."),
+        ('mb', 'smei_cache_megabytes', 'gauge', "Approximate memory held by the cache."),
+        ('max_mb', 'smei_cache_max_megabytes', 'gauge', "Memory limit of the cache.")
+    ]
+    infos = {key: cache_info(cache) for key, cache in sorted(caches.items())}
+    for field, metric, kind, description in cache_metrics:
+        lines += [f"# HELP {metric} {description}", f"# TYPE {metric} {kind}"]
+        for (tenant_id, name), info in infos.items():
+            lines.append(f"{metric}{_labels(tenant=tenant_id, cache=name)} {info[field]}")
+
+    return "\n".join(lines) + "\n"
+
+
+def serve_metrics(telemetry, port=TELEMETRY_PORT, host="127.0.0.1"):
+    """Serve /metrics from a background thread; returns the server, or None if the port is taken"""
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = render_metrics(telemetry).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    try:
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+    except OSError:
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
@@ -0,0 +1,375 @@
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from progression import (
+    RULES_PATH, STUDENT_DATA_PATH, STUDENT_SHEET_NAME, calculate_progression_rate, changed_courses,
+    get_rules, read_student_workbook
+)
+from results_journal import JOURNAL_PATH, apply_results, journal_version, load_latest_results
+from roster_cache import WARMER_THREADS, new_roster_cache
+from session_planner import ROOM_CAPACITY
+from snapshots import SNAPSHOT_PATH
+from views import DEFAULT_VIEWS, ROLES, least_privileged_view, new_view_cache
+
+# Colleges served by one deployment. Each tenant has its own workbook, rules,
+# results journal, snapshots and branding, selected by ?tenant= in the URL or
+# the SMEI_TENANT environment variable.
+TENANTS_PATH = "tenants.json"
+TENANT_ENV_VAR = "SMEI_TENANT"
+
+_TENANT_KEYS = {'name', 'short_name', 'logo', 'contact', 'workbook', 'sheet_name', 'rules',
+                'journal', 'snapshots', 'alerts', 'audit_log', 'api_audit_log', 'alert_recipients', 'cache_entries', 'cache_mb',
+                'room_capacity', 'views', 'default_view', 'view_from_url'}
+_VIEW_KEYS = {'role', 'label', 'courses', 'students'}
+
+# Used when there is no tenants file - the original single-college setup
+DEFAULT_TENANTS = {
+    'default_tenant': 'smei',
+    'tenants': {
+        'smei': {
+            'name': "Sydney Metropolitan English Institute",
+            'short_name': "SMEI",
+            'logo': "SMEI Header.png",
+            'contact': [
+                "CRICOS 03846G | Sydney Metropolitan Group Pty Ltd",
+                "Suite 2, Level 5, 545 Kent Street, Sydney NSW 2000",
+                "Tel: +61 02 9744 1356 | Email: info@smel.nsw.edu.au"
+            ],
+            'workbook': STUDENT_DATA_PATH,
+            'sheet_name': STUDENT_SHEET_NAME,
+            'rules': RULES_PATH,
+            'journal': JOURNAL_PATH,
+            'snapshots': SNAPSHOT_PATH
+        }
+    }
+}
+
+# Default per-tenant cache budget
+CACHE_ENTRIES = 64
+CACHE_MB = 256
+
+_tenants_file_state = {}
+
+
+def _check(condition, message):
+    if not condition:
+        raise ValueError(f"Invalid tenants file: {message}")
+
+
+def _with_defaults(tenant_id, tenant):
+    """Fill in the optional settings of a tenant, deriving file names from its short name"""
+    short_name = tenant.get('short_name', tenant_id.upper())
+    views = {
+        view_name: {
+            'name': view_name,
+            'role': view['role'],
+            'label': view.get('label', ROLES[view['role']]['label']),
+            'courses': list(view.get('courses', [])),
+            'students': [str(sid).strip() for sid in view.get('students', [])]
+        }
+        for view_name, view in tenant.get('views', DEFAULT_VIEWS).items()
+    }
+    return {
+        'id': tenant_id,
+        'name': tenant['name'],
+        'short_name': short_name,
+        'logo': tenant.get('logo'),
+        'contact': list(tenant.get('contact', [])),
+        'workbook': tenant['workbook'],
+        'sheet_name': tenant.get('sheet_name', short_name),
+        'rules': tenant.get('rules', RULES_PATH),
+        'journal': tenant.get('journal', f"{short_name} Results Journal.db"),
+        'snapshots': tenant.get('snapshots', f"{short_name} Snapshots.db"),
+        'alerts': tenant.get('alerts', f"{short_name} Alerts.db"),
+        'audit_log': tenant.get('audit_log', f"{short_name} Audit Log.jsonl"),
+        'api_audit_log': tenant.get('api_audit_log', f"{short_name} API Audit Log.jsonl"),
+        'alert_recipients': list(tenant.get('alert_recipients', [])),
+        'cache_entries': tenant.get('cache_entries', CACHE_ENTRIES),
+        'cache_mb': tenant.get('cache_mb', CACHE_MB),
+        'room_capacity': tenant.get('room_capacity', ROOM_CAPACITY),
+        'views': views,
+        # Without a default_view, pages open in the least privileged view
+        'default_view': tenant.get('default_view', least_privileged_view(views)),
+        'view_from_url': tenant.get('view_from_url', False)
+    }
+
+
+def validate_tenants(raw):
+    """Check a parsed tenants file, raising ValueError on the first problem"""
+    _check(isinstance(raw, dict), "the file must contain an object")
+    tenants = raw.get('tenants')
+    _check(isinstance(tenants, dict) and tenants, "tenants must be a non-empty object")
+    _check(raw.get('default_tenant') in tenants, "default_tenant must name one of the tenants")
+
+    paths = {}
+    for tenant_id, tenant in tenants.items():
+        where = f"tenants.{tenant_id}"
+        _check(isinstance(tenant, dict), f"{where} must be an object")
+        unknown = set(tenant) - _TENANT_KEYS
+        _check(not unknown, f"{where} has unknown keys {sorted(unknown)}")
+        _check(isinstance(tenant.get('name'), str) and tenant['name'].strip(), f"{where}.name is required")
+        _check(isinstance(tenant.get('workbook'), str) and tenant['workbook'].strip(), f"{where}.workbook is required")
+        _check(isinstance(tenant.get('alert_recipients', []), list), f"{where}.alert_recipients must be a list")
+        for key in ('cache_entries', 'cache_mb', 'room_capacity'):
+            if key in tenant:
+                _check(isinstance(tenant[key], int) and tenant[key] > 0, f"{where}.{key} must be a positive whole number")
+
+        views = tenant.get('views', DEFAULT_VIEWS)
+        _check(isinstance(views, dict) and views, f"{where}.views must be a non-empty object")
+        for view_name, view in views.items():
+            view_where = f"{where}.views.{view_name}"
+            _check(isinstance(view, dict), f"{view_where} must be an object")
+            unknown = set(view) - _VIEW_KEYS
+            _check(not unknown, f"{view_where} has unknown keys {sorted(unknown)}")
+            _check(view.get('role') in ROLES, f"{view_where}.role must be one of {', '.join(ROLES)}")
+            for key in ('courses', 'students'):
+                _check(isinstance(view.get(key, []), list), f"{view_where}.{key} must be a list")
+        _check(tenant.get('default_view', next(iter(views))) in views, f"{where}.default_view must name one of its views")
+        _check(isinstance(tenant.get('view_from_url', False), bool), f"{where}.view_from_url must be true or false")
+
+        # Tenants must never share a results journal, snapshot log, alert outbox or audit log
+        full = _with_defaults(tenant_id, tenant)
+        for key in ('journal', 'snapshots', 'alerts', 'audit_log', 'api_audit_log'):
+            other = paths.setdefault((key, os.path.abspath(full[key])), tenant_id)
+            _check(other == tenant_id, f"{where}.{key} is also used by {other}")
+        _check(os.path.abspath(full['audit_log']) != os.path.abspath(full['api_audit_log']),
+               f"{where}.api_audit_log must differ from its audit_log")
+
+
+def load_tenants(path=TENANTS_PATH):
+    """Load and validate the tenants file, falling back to the single default college if it doesn't exist"""
+    if not os.path.exists(path):
+        raw = DEFAULT_TENANTS
+    else:
+        with open(path, encoding='utf-8') as f:
+            try:
+                raw = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid tenants file: {e}") from e
+        validate_tenants(raw)
+
+    return {
+        'default_tenant': raw['default_tenant'],
+        'tenants': {tenant_id: _with_defaults(tenant_id, tenant) for tenant_id, tenant in raw['tenants'].items()}
+    }
+
+
+def get_tenants(path=TENANTS_PATH):
+    """Get the tenants, only rereading the file when it has changed on disk"""
+    try:
+        stat = os.stat(path)
+        file_state = (stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        file_state = None
+
+    cached = _tenants_file_state.get(path)
+    if cached is None or cached[0] != file_state:
+        _tenants_file_state[path] = (file_state, load_tenants(path))
+
+    return _tenants_file_state[path][1]
+
+
+def select_tenant(tenants, requested=None):
+    """Pick a tenant: the requested one (URL), then the SMEI_TENANT environment variable, then the default"""
+    tenant_id = requested or os.environ.get(TENANT_ENV_VAR) or tenants['default_tenant']
+    if tenant_id not in tenants['tenants']:
+        raise ValueError(f"Unknown tenant '{tenant_id}'")
+    return tenants['tenants'][tenant_id]
+
+
+def tenant_data_version(file_mtime, results_version, rules):
+    """Version of a tenant's merged data: workbook modification time, journal version and rules hash"""
+    return f"{file_mtime}:{results_version}:{rules['hash'][:12]}"
+
+
+def current_data_version(tenant, rules):
+    """Data version of a tenant's workbook, journal and rules as they are now, without reading the workbook"""
+    return tenant_data_version(os.path.getmtime(tenant['workbook']), journal_version(tenant['journal']), rules)
+
+
+def load_tenant_data(tenant, rules=None):
+    """Read a tenant's workbook with its recorded results merged in and progression calculated
+
+    Returns the frame and its data version. Used by headless jobs; the app
+    keeps its own incrementally updated copy.
+    """
+    rules = rules or get_rules(tenant['rules'])
+    file_mtime = os.path.getmtime(tenant['workbook'])
+    results_version = journal_version(tenant['journal'])
+
+    df = read_student_workbook(tenant['workbook'], tenant['sheet_name'], rules)
+    if results_version > 0:
+        df = apply_results(df, load_latest_results(tenant['journal']))
+    df = calculate_progression_rate(df, rules=rules)
+
+    return df, tenant_data_version(file_mtime, results_version, rules)
+
+
+def new_tenant_state(cache_entries=CACHE_ENTRIES, cache_mb=CACHE_MB):
+    """Create the state shared by everything serving one tenant
+
+    Holds the merged student frame (updated in place as results are recorded),
+    the projected frame and roster cache of each staff view, and a bounded cache
+    with its own memory budget.
+    """
+    return {
+        'lock': threading.Lock(),
+        'store': {
+            'lock': threading.Lock(),
+            'file_mtime': None,
+            'results_version': 0,
+            'rules': None,
+            'data_version': None,
+            'df': None,
+            'unreadable': None,
+            'quality': None
+        },
+        'views': new_view_cache(),
+        'rosters': {},
+        'roster_executor': ThreadPoolExecutor(max_workers=WARMER_THREADS, thread_name_prefix="roster-warmer"),
+        'cache': new_bounded_cache(cache_entries, cache_mb)
+    }
+
+
+def get_view_rosters(state, view_name):
+    """Roster cache for one staff view - all views of a tenant share one warmer thread pool"""
+    with state['lock']:
+        if view_name not in state['rosters']:
+            state['rosters'][view_name] = new_roster_cache(executor=state['roster_executor'])
+        return state['rosters'][view_name]
+
+
+def refresh_tenant_data(tenant, store, rules=None):
+    """Bring a tenant store's student frame up to date, holding the store lock
+
+    The workbook is only reread when the file changes. New journal records and
+    assessment rule changes are applied on top of the current frame and only the
+    affected students' progression rates are recalculated. Returns True if the
+    frame changed.
+    """
+    file_mtime = os.path.getmtime(tenant['workbook'])
+    results_version = journal_version(tenant['journal'])
+    rules = rules or get_rules(tenant['rules'])
+
+    # Reload everything if the workbook changed or the journal was reset
+    if store['file_mtime'] != file_mtime or results_version < store['results_version']:
+        df, store['unreadable'] = read_student_workbook(tenant['workbook'], tenant['sheet_name'], rules, return_unreadable=True)
+        if results_version > 0:
+            df = apply_results(df, load_latest_results(tenant['journal']))
+        df = calculate_progression_rate(df, rules=rules)
+
+    elif store['results_version'] != results_version or store['rules'] is not rules:
+        df = store['df'].copy()
+        affected = np.zeros(len(df), dtype=bool)
+
+        if store['results_version'] != results_version:
+            new_results = load_latest_results(tenant['journal'], since=store['results_version'])
+            df = apply_results(df, new_results)
+            affected |= df['StudentID'].isin(new_results['student_id']).to_numpy()
+
+        # Only courses whose rules changed need their progression recalculated
+        if store['rules'] is not rules:
+            affected |= df['Course'].isin(changed_courses(store['rules'], rules)).to_numpy()
+
+        df = calculate_progression_rate(df, rows=affected, rules=rules)
+
+    else:
+        return False
+
+    store.update(
+        file_mtime=file_mtime,
+        results_version=results_version,
+        rules=rules,
+        data_version=tenant_data_version(file_mtime, results_version, rules),
+        df=df
+    )
+    return True
+
+
+def estimate_size(value):
+    """Approximate memory held by a cached value in bytes"""
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value.values())
+    return sys.getsizeof(value)
+
+
+def new_bounded_cache(max_entries=CACHE_ENTRIES, max_mb=CACHE_MB):
+    """Create an empty least-recently-used cache limited by entry count and memory"""
+    return {
+        'lock': threading.Lock(),
+        'entries': OrderedDict(),
+        'bytes': 0,
+        'max_entries': max_entries,
+        'max_bytes': max_mb * 1024 * 1024,
+        'hits': 0,
+        'misses': 0,
+        'evictions': 0
+    }
+
+
+def cached(cache, key, compute):
+    """Get a value from the cache, computing and storing it on a miss
+
+    The least recently used entries are evicted until the cache is back within
+    its entry and memory limits. A value larger than the whole budget is
+    returned without being stored.
+    """
+    with cache['lock']:
+        if key in cache['entries']:
+            cache['entries'].move_to_end(key)
+            cache['hits'] += 1
+            return cache['entries'][key][0]
+        cache['misses'] += 1
+
+    # Computed outside the lock so a slow miss doesn't block other sessions
+    value = compute()
+    size = estimate_size(value)
+
+    with cache['lock']:
+        if size > cache['max_bytes']:
+            return value
+        if key in cache['entries']:
+            cache['bytes'] -= cache['entries'].pop(key)[1]
+        cache['entries'][key] = (value, size)
+        cache['bytes'] += size
+
+        while len(cache['entries']) > cache['max_entries'] or cache['bytes'] > cache['max_bytes']:
+            _, (_, evicted_size) = cache['entries'].popitem(last=False)
+            cache['bytes'] -= evicted_size
+            cache['evictions'] += 1
+
+    return value
+
+
+def is_cached(cache, key):
+    """Whether a key is currently held in a bounded cache"""
+    with cache['lock']:
+        return key in cache['entries']
+
+
+def cache_info(cache):
+    """Entry count, memory use and hit/miss/eviction counters of a bounded cache"""
+    with cache['lock']:
+        return {
+            'entries': len(cache['entries']),
+            'mb': round(cache['bytes'] / 1024 / 1024, 1),
+            'max_entries': cache['max_entries'],
+            'max_mb': round(cache['max_bytes'] / 1024 / 1024, 1),
+            'hits': cache['hits'],
+            'misses': cache['misses'],
+            'evictions': cache['evictions']
+        }
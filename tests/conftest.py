@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from progression import get_rules  # noqa: E402
+
+
+@pytest.fixture
+def rules():
+    """The compiled assessment rules shipped with the app"""
+    return get_rules(os.path.join(ROOT, "assessment_rules.json"))
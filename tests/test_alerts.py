@@ -0,0 +1,121 @@
+import os
+
+import pandas as pd
+
+from alerts import mark_sent, newly_failed, newly_low_attendance, run_alerts, unsent_alerts
+from conftest import ROOT
+from progression import FAILED, PASSED, PENDING
+from results_journal import record_results
+from tenants import _with_defaults
+
+MID = 'Intermediate Mid Course Test'
+
+
+def _tenant(tmp_path):
+    return _with_defaults('test', {
+        'name': "Test College",
+        'short_name': 'TST',
+        'workbook': str(tmp_path / "students.xlsx"),
+        'sheet_name': 'TST',
+        'rules': os.path.join(ROOT, "assessment_rules.json"),
+        'journal': str(tmp_path / "journal.db"),
+        'snapshots': str(tmp_path / "snapshots.db"),
+        'alerts': str(tmp_path / "alerts.db"),
+        'alert_recipients': ["dos@example.edu"]
+    })
+
+
+def _write_workbook(tenant, attendance, mid=None, mtime=0):
+    """Three EAP students; each rewrite gets a later modification time, so it is a new data version"""
+    pd.DataFrame({
+        'StudentID': ['S1', 'S2', 'S3'],
+        'Name': ['Ana Lima', 'Ben Cho', 'Cy Dee'],
+        'Start Date': pd.Timestamp('2025-01-06'),
+        'Finish Date': pd.Timestamp('2025-03-09'),
+        'Duration (weeks)': 9,
+        'Course': 'EAP',
+        'Attendance': attendance,
+        MID: mid or [None, None, None]
+    }).to_excel(tenant['workbook'], sheet_name=tenant['sheet_name'], index=False)
+    os.utime(tenant['workbook'], (1_700_000_000 + mtime, 1_700_000_000 + mtime))
+
+
+def test_first_run_is_the_baseline(tmp_path):
+    tenant = _tenant(tmp_path)
+    _write_workbook(tenant, [90, 70, 90], mid=['Failed', None, None])
+
+    assert run_alerts(tenant) == 0
+    assert unsent_alerts(tenant['alerts']).empty
+
+
+def test_include_existing_alerts_on_the_first_run(tmp_path):
+    tenant = _tenant(tmp_path)
+    _write_workbook(tenant, [90, 70, 90], mid=['Failed', None, None])
+
+    assert run_alerts(tenant, include_existing=True) == 2
+    assert sorted(unsent_alerts(tenant['alerts'])['kind']) == ['attendance', 'failed_test']
+
+
+def test_new_failure_alerts_once(tmp_path):
+    tenant = _tenant(tmp_path)
+    _write_workbook(tenant, [90, 90, 90])
+    run_alerts(tenant)
+    assert run_alerts(tenant) == 0
+
+    record_results([('S2', MID, '35')], tenant['journal'])
+    assert run_alerts(tenant) == 1
+    assert run_alerts(tenant) == 0
+
+    alert = unsent_alerts(tenant['alerts']).iloc[0]
+    assert (alert['kind'], alert['student_id'], alert['recipients']) == ('failed_test', 'S2', "dos@example.edu")
+    assert alert['subject'] == f"[TST] Ben Cho failed {MID}"
+    assert "with a score of 35" in alert['body']
+
+    # A later failure of the same assessment isn't a new breach
+    record_results([('S2', MID, '40')], tenant['journal'])
+    assert run_alerts(tenant) == 0
+
+
+def test_attendance_threshold_boundary(tmp_path):
+    tenant = _tenant(tmp_path)
+    _write_workbook(tenant, [90, 90, 90])
+    run_alerts(tenant)
+
+    _write_workbook(tenant, [80, 90, 90], mtime=1)
+    assert run_alerts(tenant) == 0
+
+    _write_workbook(tenant, [79.9, 90, 90], mtime=2)
+    assert run_alerts(tenant) == 1
+    assert unsent_alerts(tenant['alerts'])['student_id'].tolist() == ['S1']
+
+    _write_workbook(tenant, [70, 90, 90], mtime=3)
+    assert run_alerts(tenant) == 0
+
+
+def test_mark_sent(tmp_path):
+    tenant = _tenant(tmp_path)
+    _write_workbook(tenant, [70, 70, 90])
+    run_alerts(tenant, include_existing=True)
+
+    queued = unsent_alerts(tenant['alerts'])
+    mark_sent(queued['id'][:1], tenant['alerts'])
+    assert unsent_alerts(tenant['alerts'])['id'].tolist() == queued['id'][1:].tolist()
+
+
+def test_breaches_are_judged_over_the_whole_window():
+    status = pd.DataFrame({
+        'student_id': ['S1', 'S1', 'S2', 'S3'],
+        'assessment': MID,
+        'status': [FAILED, PASSED, FAILED, FAILED],
+        'prev_status': [PENDING, FAILED, PENDING, FAILED],
+        'score': [30.0, 70.0, 20.0, 25.0]
+    })
+    attendance = pd.DataFrame({
+        'student_id': ['S1', 'S1', 'S2'],
+        'attendance': [70.0, 85.0, 60.0],
+        'prev_attendance': [90.0, 70.0, None]
+    })
+
+    # S1 failed and passed again within the window; S3 was already failing
+    assert newly_failed(status)['student_id'].tolist() == ['S2']
+    assert newly_low_attendance(attendance)['student_id'].tolist() == ['S2']
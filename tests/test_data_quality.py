@@ -0,0 +1,111 @@
+from datetime import datetime
+
+import pandas as pd
+from openpyxl import Workbook
+
+from data_quality import QUALITY_COLUMNS, quality_summary, scan_data_quality
+from progression import read_student_workbook
+
+MID = 'Intermediate Mid Course Test'
+
+
+def _roster(*students):
+    base = {
+        'Name': 'Ana Lima',
+        'Course': 'EAP',
+        'Start Date': pd.Timestamp('2025-01-06'),
+        'Finish Date': pd.Timestamp('2025-03-09'),
+        'Duration (weeks)': 9,
+        'Attendance': 90.0,
+        MID: None
+    }
+    return pd.DataFrame([{**base, **student} for student in students])
+
+
+def _found(report):
+    return sorted(zip(report['Check'], report['StudentID'], report['Column']))
+
+
+def test_clean_roster_has_no_issues(rules):
+    report = scan_data_quality(_roster({'StudentID': 'S1'}, {'StudentID': 'S2', MID: '64'}), rules)
+
+    assert report.empty
+    assert report.columns.tolist() == QUALITY_COLUMNS
+    assert quality_summary(report).empty
+
+
+def test_each_check(rules):
+    report = scan_data_quality(_roster(
+        {'StudentID': ''},
+        {'StudentID': 'S2'},
+        {'StudentID': 'S2'},
+        {'StudentID': 'S3', 'Start Date': pd.NaT},
+        {'StudentID': 'S4', 'Finish Date': pd.Timestamp('2024-12-01')},
+        {'StudentID': 'S5', 'Duration (weeks)': 0},
+        {'StudentID': 'S6', 'Duration (weeks)': 4},
+        {'StudentID': 'S7', 'Attendance': 140.0},
+        {'StudentID': 'S8', 'Course': 'IELTS'},
+        {'StudentID': 'S9', MID: 'absent'},
+        {'StudentID': 'S10', MID: '180'}
+    ), rules)
+
+    assert _found(report) == sorted([
+        ('Missing StudentID', '', 'StudentID'),
+        ('Duplicate StudentID', 'S2', 'StudentID'),
+        ('Duplicate StudentID', 'S2', 'StudentID'),
+        ('Bad date', 'S3', 'Start Date'),
+        ('Bad date', 'S4', 'Finish Date'),
+        ('Bad duration', 'S5', 'Duration (weeks)'),
+        ('Duration mismatch', 'S6', 'Duration (weeks)'),
+        ('Attendance out of range', 'S7', 'Attendance'),
+        ('Unknown course', 'S8', 'Course'),
+        ('Unrecognised result', 'S9', MID),
+        ('Score out of range', 'S10', MID)
+    ])
+    assert report.loc[report['StudentID'] == 'S9', 'Value'].tolist() == ['absent']
+    assert report.loc[report['StudentID'] == 'S6', 'Detail'].tolist() == ["Start to Finish Date spans 9 calendar weeks"]
+
+
+def test_holiday_breaks_within_allowance(rules):
+    report = scan_data_quality(_roster(
+        {'StudentID': 'S1', 'Duration (weeks)': 5},
+        {'StudentID': 'S2', 'Duration (weeks)': 4}
+    ), rules)
+
+    # 9 calendar weeks covers a 5 week course plus 4 weeks of breaks, but not a 4 week one
+    assert _found(report) == [('Duration mismatch', 'S2', 'Duration (weeks)')]
+
+
+def test_unreadable_workbook_cells(tmp_path, rules):
+    path = tmp_path / "students.xlsx"
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = 'SMEI'
+    sheet.append(['StudentID', 'Name', 'Course', 'Start Date', 'Finish Date', 'Duration (weeks)', 'Attendance'])
+    sheet.append(['S1', 'Ana Lima', 'EAP', datetime(2025, 1, 6), datetime(2025, 3, 9), 9, 'N/A'])
+    sheet.append(['S2', 'Ben Cho', 'EAP', datetime(2025, 1, 6), 'soon', 'nine', 85])
+    sheet.append(['S3', 'Cy Dee', 'EAP', datetime(2025, 1, 6), None, 9, None])
+    workbook.save(path)
+
+    # Read through the app's loader, which converts these cells to NaN/NaT
+    df, unreadable = read_student_workbook(path, 'SMEI', rules, return_unreadable=True)
+    report = scan_data_quality(df, rules, unreadable)
+
+    assert report[['Check', 'StudentID', 'Value', 'Detail']].values.tolist() == [
+        ['Bad date', 'S2', 'soon', "Unreadable date"],
+        ['Bad date', 'S3', '', "Missing date"],
+        ['Bad duration', 'S2', 'nine',
+         "Missing or not a positive number of weeks - all course assessments are treated as required"],
+        ['Attendance out of range', 'S1', 'N/A', "Attendance is not a number"]
+    ]
+
+
+def test_quality_summary_counts_students(rules):
+    report = scan_data_quality(_roster(
+        {'StudentID': 'S1', 'Course': 'IELTS', MID: 'absent'},
+        {'StudentID': 'S2', 'Course': 'IELTS'}
+    ), rules)
+    summary = quality_summary(report)
+
+    assert summary.loc['Unknown course'].tolist() == [2, 2]
+    assert summary.loc['Unrecognised result'].tolist() == [1, 1]
@@ -0,0 +1,70 @@
+import pandas as pd
+
+import results_journal
+from results_journal import (
+    apply_results, compact_journal, journal_version, load_latest_results, record_results, superseded_count
+)
+
+TEST = 'Intermediate Mid Course Test'
+
+
+def test_latest_value_wins(tmp_path):
+    path = tmp_path / "journal.db"
+    record_results([('S1', TEST, '40'), ('S2', TEST, 'Passed')], path)
+    record_results([(' S1 ', TEST, ' 65 ')], path)
+
+    latest = load_latest_results(path)
+    assert latest[['student_id', 'value']].values.tolist() == [['S2', 'Passed'], ['S1', '65']]
+    assert superseded_count(path) == 1
+
+
+def test_since_only_returns_newer_records(tmp_path):
+    path = tmp_path / "journal.db"
+    first = record_results([('S1', TEST, '40'), ('S2', TEST, '45')], path)
+    record_results([('S2', TEST, '70')], path)
+
+    newer = load_latest_results(path, since=first)
+    assert newer[['student_id', 'value']].values.tolist() == [['S2', '70']]
+
+
+def test_compaction_keeps_latest_values_and_version(tmp_path):
+    path = tmp_path / "journal.db"
+    record_results([('S1', TEST, '40'), ('S2', TEST, '45')], path)
+    version = record_results([('S1', TEST, '60'), ('S1', 'Intermediate End Course Test', 'Failed')], path)
+    before = load_latest_results(path)
+
+    assert compact_journal(path) == 1
+    assert superseded_count(path) == 0
+    assert journal_version(path) == version
+    pd.testing.assert_frame_equal(load_latest_results(path), before)
+
+    # Sequence numbers are never reused after compaction
+    assert record_results([('S3', TEST, '55')], path) == version + 1
+
+
+def test_record_compacts_at_threshold(tmp_path, monkeypatch):
+    monkeypatch.setattr(results_journal, 'COMPACTION_THRESHOLD', 3)
+    path = tmp_path / "journal.db"
+    for value in ('10', '20', '30'):
+        record_results([('S1', TEST, value)], path)
+    assert superseded_count(path) == 2
+
+    record_results([('S1', TEST, '40')], path)
+    assert superseded_count(path) == 0
+    assert load_latest_results(path)['value'].tolist() == ['40']
+
+
+def test_apply_results_overlays_workbook_values():
+    df = pd.DataFrame({'StudentID': ['S1', 'S2', 'S3'], TEST: ['Failed', None, '55']})
+    results = pd.DataFrame({
+        'student_id': ['S1', 'S2', 'S1'],
+        'assessment': [TEST, TEST, 'Advanced End Course Test'],
+        'value': ['Passed', '62', '80'],
+        'recorded_at': ['2025-01-01T00:00:00'] * 3
+    })
+
+    merged = apply_results(df, results)
+    assert merged[TEST].tolist() == ['Passed', '62', '55']
+    assert merged['Advanced End Course Test'][0] == '80'
+    assert merged['Advanced End Course Test'][1:].isna().all()
+    assert df[TEST][0] == 'Failed'
@@ -0,0 +1,136 @@
+import copy
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import ROOT
+from progression import (
+    build_required_matrix, changed_courses, compile_rules, get_required_assessments, load_rules, validate_rules
+)
+
+# The table hard-coded in app.py before the rules moved to assessment_rules.json,
+# with assessments given as positions in ASSESSMENT_ORDER
+ASSESSMENT_ORDER = [
+    'Elementary Mid Course Test',
+    'Elementary End Course Test',
+    'Pre Intermediate Mid Course Test',
+    'Pre Intermediate End Course Test',
+    'Intermediate Mid Course Test',
+    'Intermediate End Course Test',
+    'Upper Intermediate Mid Course Test',
+    'Upper Intermediate End Course Test',
+    'Advanced Mid Course Test',
+    'Advanced End Course Test'
+]
+OLD_ASSESSMENT_RULES = {
+    'EAP': {
+        'assessments': [4, 5, 6, 7, 8, 9],
+        'duration_ranges': [
+            (1, 8, [4]),
+            (9, 14, [4, 5]),
+            (15, 20, [4, 5, 6]),
+            (21, 26, [4, 5, 6, 7]),
+            (27, 32, [4, 5, 6, 7, 8]),
+            (33, 36, [4, 5, 6, 7, 8, 9])
+        ]
+    },
+    'General English': {
+        'assessments': [0, 1, 2, 3, 4, 5, 6, 7, 8, 9],
+        'duration_ranges': [
+            (1, 8, [4]),
+            (9, 14, [4, 5]),
+            (15, 20, [4, 5, 6]),
+            (21, 26, [4, 5, 6, 7]),
+            (27, 32, [0, 1, 2, 3, 4]),
+            (33, 38, [0, 1, 2, 3, 4, 5]),
+            (39, 44, [0, 1, 2, 3, 4, 5, 6]),
+            (45, 50, [0, 1, 2, 3, 4, 5, 6, 7]),
+            (51, 56, [0, 1, 2, 3, 4, 5, 6, 7, 8]),
+            (57, 60, [0, 1, 2, 3, 4, 5, 6, 7, 8, 9])
+        ]
+    }
+}
+
+
+def _names(positions):
+    return [ASSESSMENT_ORDER[i] for i in positions]
+
+
+def _old_required(course, duration_weeks):
+    if course not in OLD_ASSESSMENT_RULES:
+        return []
+    for min_weeks, max_weeks, assessments in OLD_ASSESSMENT_RULES[course]['duration_ranges']:
+        if min_weeks <= duration_weeks <= max_weeks:
+            return _names(assessments)
+    return _names(OLD_ASSESSMENT_RULES[course]['assessments'])
+
+
+def _raw_rules():
+    with open(os.path.join(ROOT, "assessment_rules.json"), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_compiled_rules_match_old_table(rules):
+    assert rules['assessment_order'] == ASSESSMENT_ORDER
+    assert set(rules['courses']) == set(OLD_ASSESSMENT_RULES)
+    for course, old in OLD_ASSESSMENT_RULES.items():
+        compiled = rules['courses'][course]
+        assert compiled['assessments'] == _names(old['assessments'])
+        assert compiled['duration_ranges'] == [(low, high, _names(tests)) for low, high, tests in old['duration_ranges']]
+
+
+def test_required_assessments_match_old_lookup(rules):
+    durations = list(range(0, 66)) + [8.5, 36.5]
+    df = pd.DataFrame(
+        [(course, weeks) for course in ['EAP', 'General English', 'IELTS'] for weeks in durations],
+        columns=['Course', 'Duration (weeks)']
+    )
+    required = build_required_matrix(df, rules=rules)
+
+    for i, (course, weeks) in enumerate(df.itertuples(index=False)):
+        expected = _old_required(course, weeks)
+        assert get_required_assessments(course, weeks, rules) == expected
+        assert required.columns[required.iloc[i].to_numpy()].tolist() == expected
+
+
+def test_range_masks_follow_assessment_order(rules):
+    compiled = rules['courses']['EAP']
+    assert compiled['lower'].tolist() == [1, 9, 15, 21, 27, 33]
+    assert compiled['range_masks'][0] == np.uint64(1 << 4)
+    assert compiled['all_mask'] == np.uint64(0b1111110000)
+
+
+@pytest.mark.parametrize("change, message", [
+    (lambda raw: raw.update(schema_version=2), "schema_version"),
+    (lambda raw: raw.update(pass_mark=120), "pass_mark"),
+    (lambda raw: raw['courses']['EAP']['assessments'].append('Proficiency Test'), "unknown assessments"),
+    (lambda raw: raw['courses']['EAP']['duration_ranges'][1].update(weeks=[5, 14]), "overlaps"),
+    (lambda raw: raw['courses']['EAP']['duration_ranges'][0].update(count=7), "count must fit"),
+    (lambda raw: raw['courses']['EAP'].update(level='B2'), "unknown keys"),
+])
+def test_validation_errors(change, message):
+    raw = _raw_rules()
+    validate_rules(raw)
+    change(raw)
+    with pytest.raises(ValueError, match=message):
+        validate_rules(raw)
+
+
+def test_invalid_json_is_a_value_error(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text("{", encoding='utf-8')
+    with pytest.raises(ValueError, match="Invalid assessment rules"):
+        load_rules(path)
+
+
+def test_changed_courses_uses_fingerprints():
+    raw = _raw_rules()
+    edited = copy.deepcopy(raw)
+    edited['courses']['EAP']['pass_mark'] = 60
+    edited['version'] = "next"
+
+    assert changed_courses(compile_rules(raw), compile_rules(raw)) == set()
+    assert changed_courses(compile_rules(raw), compile_rules(edited)) == {'EAP'}
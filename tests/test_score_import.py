@@ -0,0 +1,98 @@
+import io
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from results_journal import load_latest_results
+from score_import import apply_scores, read_score_file, validate_scores
+
+ROSTER = pd.DataFrame({'StudentID': ['S1', 'S2', 'S3', 'S4'], 'Course': 'General English'})
+
+EXAMINER_CSV = """StudentID,Intermediate Mid Course Test
+S1,72
+S2,Failed
+S3,absent
+S4,
+S9,60
+,55
+S1,81
+"""
+
+
+def _validate(text, chunksize=3, rules=None):
+    score_name, chunks = read_score_file(io.StringIO(text), "scores.csv", chunksize, rules)
+    return score_name, validate_scores(chunks, ROSTER, rules)
+
+
+def test_rejection_categories(rules):
+    score_name, report = _validate(EXAMINER_CSV, rules=rules)
+
+    assert score_name == 'Intermediate Mid Course Test'
+    assert report['total_rows'] == 7
+    assert report['valid'].values.tolist() == [['S2', 'Failed', 'Failed'], ['S1', '81', 'Passed']]
+    assert report['unknown_ids'] == ['S9']
+    assert report['unparseable'].values.tolist() == [['S3', 'absent']]
+    assert report['blank_count'] == 1
+    assert report['missing_id_count'] == 1
+    assert report['duplicate_ids'] == ['S1']
+
+
+def test_chunk_size_does_not_change_the_report(rules):
+    _, whole = _validate(EXAMINER_CSV, chunksize=100, rules=rules)
+    _, chunked = _validate(EXAMINER_CSV, chunksize=1, rules=rules)
+
+    pd.testing.assert_frame_equal(whole['valid'], chunked['valid'])
+    assert whole['duplicate_ids'] == chunked['duplicate_ids']
+    assert whole['blank_count'] == chunked['blank_count']
+
+
+def test_xlsx_matches_csv(rules):
+    workbook = Workbook()
+    sheet = workbook.active
+    for line in EXAMINER_CSV.strip().splitlines():
+        sheet.append([cell or None for cell in line.split(',')])
+    sheet.append([None, None])
+    source = io.BytesIO()
+    workbook.save(source)
+    source.seek(0)
+
+    score_name, chunks = read_score_file(source, "scores.xlsx", 3, rules)
+    report = validate_scores(chunks, ROSTER, rules)
+    _, expected = _validate(EXAMINER_CSV, rules=rules)
+
+    assert score_name == 'Intermediate Mid Course Test'
+    pd.testing.assert_frame_equal(report['valid'], expected['valid'])
+    assert report['unknown_ids'] == expected['unknown_ids']
+    assert report['missing_id_count'] == expected['missing_id_count']
+
+
+def test_score_column_found_by_generic_name(rules):
+    score_name, report = _validate("Student ID,Name,Score\nS1,Ana,55\n", rules=rules)
+
+    assert score_name == 'Score'
+    assert report['valid']['Value'].tolist() == ['55']
+
+
+def test_missing_student_id_column(rules):
+    with pytest.raises(ValueError, match="StudentID"):
+        _validate("Name,Score\nAna,55\n", rules=rules)
+
+
+def test_course_pass_mark_decides_status(rules):
+    rules = {**rules, 'courses': {**rules['courses'], 'EAP': {**rules['courses']['EAP'], 'pass_mark': 70.0}}}
+    roster = pd.DataFrame({'StudentID': ['S1', 'S2'], 'Course': ['EAP', 'General English']})
+    _, chunks = read_score_file(io.StringIO("StudentID,Score\nS1,65\nS2,65\n"), "scores.csv", rules=rules)
+    report = validate_scores(chunks, roster, rules)
+
+    assert report['valid']['Status'].tolist() == ['Failed', 'Passed']
+
+
+def test_apply_scores_records_one_batch(rules, tmp_path):
+    _, report = _validate(EXAMINER_CSV, rules=rules)
+    path = tmp_path / "journal.db"
+
+    assert apply_scores(report, 'Intermediate Mid Course Test', path) == 2
+    latest = load_latest_results(path)
+    assert latest[['student_id', 'value']].values.tolist() == [['S2', 'Failed'], ['S1', '81']]
+    assert latest['recorded_at'].nunique() == 1
@@ -0,0 +1,86 @@
+import pandas as pd
+
+from session_planner import next_due_assessments, plan_test_sessions
+
+TODAY = pd.Timestamp('2025-03-05')
+THIS_WEEK = pd.Timestamp('2025-03-03')
+MID = 'Intermediate Mid Course Test'
+END = 'Intermediate End Course Test'
+
+
+def _students(count, start, prefix, **tests):
+    """EAP students on a 9 week course, who sit MID 32 days and END 63 days after they start"""
+    start = pd.Timestamp(start)
+    return pd.DataFrame({
+        'StudentID': [f"{prefix}{i:03d}" for i in range(count)],
+        'Name': [f"Student {prefix}{i}" for i in range(count)],
+        'Course': 'EAP',
+        'Start Date': start,
+        'Finish Date': start + pd.Timedelta(weeks=9, days=-1),
+        'Duration (weeks)': 9,
+        MID: tests.get('mid'),
+        END: tests.get('end')
+    })
+
+
+def _roster(*parts):
+    return pd.concat(parts, ignore_index=True)
+
+
+def test_next_due_assessment_and_reason(rules):
+    df = _roster(
+        _students(1, '2025-02-02', 'D'),
+        _students(1, '2025-01-10', 'O'),
+        _students(1, '2025-02-02', 'R', mid='Failed'),
+        _students(1, '2025-02-02', 'P', mid='Passed'),
+        _students(1, '2025-02-02', 'F', mid='Passed', end='Passed'),
+        _students(1, '2024-06-01', 'X')
+    )
+    due = next_due_assessments(df, today=TODAY, rules=rules).set_index('StudentID')
+
+    # Finished courses and students with every test passed are left out
+    assert due.index.tolist() == ['D000', 'O000', 'R000', 'P000']
+    assert due['Assessment'].astype(str).tolist() == [MID, MID, MID, END]
+    assert due['Reason'].tolist() == ['Due', 'Overdue', 'Resit', 'Due']
+    assert due.loc['D000', 'Due Date'] == pd.Timestamp('2025-03-06')
+    assert due.loc['P000', 'Due Date'] == pd.Timestamp('2025-04-06')
+
+
+def test_capacity_splits_sessions_evenly(rules):
+    df = _students(45, '2025-02-02', 'S')
+    plan, sessions = plan_test_sessions(df, capacity=20, weeks=1, today=TODAY, rules=rules)
+
+    assert len(plan) == 45
+    assert sessions['Session'].tolist() == [1, 2, 3]
+    assert sessions['Students'].tolist() == [15, 15, 15]
+    assert (sessions['Week Starting'] == THIS_WEEK).all()
+
+
+def test_resits_and_overdue_go_in_this_week(rules):
+    df = _roster(
+        _students(2, '2025-01-10', 'O'),
+        _students(3, '2025-03-01', 'R', mid='Failed'),
+        _students(4, '2025-03-01', 'L')
+    )
+    plan, sessions = plan_test_sessions(df, capacity=20, weeks=2, today=TODAY, rules=rules)
+
+    # The L students aren't due until April, beyond the two weeks planned
+    assert sorted(plan['StudentID'].str[0].unique()) == ['O', 'R']
+    assert sessions[['Week Starting', 'Students', 'Resits', 'Overdue']].values.tolist() == [[THIS_WEEK, 5, 3, 2]]
+
+
+def test_sessions_by_week_and_assessment(rules):
+    df = _roster(
+        _students(3, '2025-02-02', 'A'),
+        _students(2, '2025-01-03', 'B', mid='Passed'),
+        _students(1, '2025-02-09', 'C')
+    )
+    plan, sessions = plan_test_sessions(df, capacity=2, weeks=4, today=TODAY, rules=rules)
+
+    assert sessions[['Week Starting', 'Assessment', 'Session', 'Students']].astype({'Assessment': str}).values.tolist() == [
+        [THIS_WEEK, MID, 1, 2],
+        [THIS_WEEK, MID, 2, 1],
+        [THIS_WEEK, END, 1, 2],
+        [pd.Timestamp('2025-03-10'), MID, 1, 1]
+    ]
+    assert plan['Session'].max() <= 2
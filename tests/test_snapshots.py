@@ -0,0 +1,82 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from progression import FAILED, PASSED, PENDING
+from snapshots import load_changes, load_trend, record_backfill, record_snapshot, snapshot_state
+
+MID = 'Intermediate Mid Course Test'
+END = 'Intermediate End Course Test'
+
+
+def _roster(mid, end=None, attendance=None):
+    """EAP students on a 9 week course, who must sit MID and END"""
+    return pd.DataFrame({
+        'StudentID': [f"S{i}" for i in range(len(mid))],
+        'Course': 'EAP',
+        'Duration (weeks)': 9,
+        'Attendance': attendance or [90.0] * len(mid),
+        MID: mid,
+        END: end or [None] * len(mid)
+    })
+
+
+def _latest_state(path):
+    conn = sqlite3.connect(path)
+    try:
+        return pd.read_sql_query(
+            "SELECT student_id, assessment, status, score FROM latest_state ORDER BY student_id, assessment", conn
+        )
+    finally:
+        conn.close()
+
+
+def test_delta_chain_rebuilds_latest_state(tmp_path, rules):
+    path = tmp_path / "snapshots.db"
+    versions = [
+        _roster([None, None, None]),
+        _roster(['72', '40', None]),
+        _roster(['72', '55', 'Passed'], end=['Failed', None, None], attendance=[90.0, 75.0, 90.0])
+    ]
+
+    assert record_snapshot(versions[0], 'v1', path, rules=rules) == 6
+    assert record_snapshot(versions[1], 'v2', path, rules=rules) == 2
+    assert record_snapshot(versions[2], 'v3', path, rules=rules) == 3
+    assert record_snapshot(versions[2], 'v3', path, rules=rules) is None
+
+    expected = snapshot_state(versions[2], rules).sort_values(['student_id', 'assessment']).reset_index(drop=True)
+    pd.testing.assert_frame_equal(_latest_state(path), expected, check_dtype=False)
+
+    status, attendance, latest = load_changes(since=1, path=path)
+    assert latest == 3
+    assert status[status['student_id'] == 'S1'][['status', 'prev_status', 'score']].values.tolist() == [
+        [FAILED, PENDING, 40.0], [PASSED, FAILED, 55.0]
+    ]
+    assert attendance[['student_id', 'attendance', 'prev_attendance']].values.tolist() == [['S1', 75.0, 90.0]]
+
+
+def test_trend_across_a_week_boundary(tmp_path, rules):
+    path = tmp_path / "snapshots.db"
+    record_snapshot(_roster([None, None, None, None]), 'v1', path, taken_at='2025-03-06T09:00:00', rules=rules)
+    record_snapshot(_roster(['80', '30', None, None]), 'v2', path, taken_at='2025-03-07T09:00:00', rules=rules)
+    record_snapshot(_roster(['80', '60', '40', None]), 'v3', path, taken_at='2025-03-10T09:00:00', rules=rules)
+    record_snapshot(_roster(['80', '60', '40', 'Passed']), 'v4', path, taken_at='2025-03-12T09:00:00', rules=rules)
+
+    trend = load_trend(MID, path)
+
+    # Each week shows the last snapshot in it (weeks end on Sunday)
+    assert trend.index.tolist() == [pd.Timestamp('2025-03-09'), pd.Timestamp('2025-03-16')]
+    assert trend[['Passed', 'Failed', 'Pending']].values.tolist() == [[1, 1, 2], [3, 1, 0]]
+    assert trend['Pass Rate'].tolist() == [50.0, 75.0]
+    assert trend['Mean Score'].tolist() == [55.0, 60.0]
+
+
+def test_backfill_refuses_out_of_order_copies(tmp_path, rules):
+    path = tmp_path / "snapshots.db"
+    assert record_backfill(_roster([None, None]), "march.xlsx", '2025-03-01T00:00:00', path, rules) == 4
+    assert record_backfill(_roster(['70', None]), "april.xlsx", '2025-04-01T00:00:00', path, rules) == 1
+
+    with pytest.raises(ValueError, match="before the latest snapshot"):
+        record_backfill(_roster(['70', '20']), "february.xlsx", '2025-02-01T00:00:00', path, rules)
+    assert load_changes(path=path)[2] == 2
@@ -0,0 +1,75 @@
+import json
+
+from telemetry import new_telemetry, record_event, register_cache, render_metrics
+from tenants import cached, new_bounded_cache
+
+
+def _tenant(tmp_path, name='audit.jsonl'):
+    return {'id': 'test', 'audit_log': str(tmp_path / name), 'api_audit_log': str(tmp_path / "api.jsonl")}
+
+
+def test_events_are_counted_and_logged(tmp_path):
+    telemetry = new_telemetry()
+    tenant = _tenant(tmp_path)
+    record_event(telemetry, tenant, 'search', 0.02, 'hit', query="kim")
+    record_event(telemetry, tenant, 'search', 3.0, 'hit', query="lee")
+    telemetry['queue'].join()
+
+    lines = [json.loads(line) for line in open(tenant['audit_log'], encoding='utf-8')]
+    assert [(line['event'], line['cache'], line['query']) for line in lines] == [('search', 'hit', "kim"), ('search', 'hit', "lee")]
+
+    metrics = render_metrics(telemetry)
+    assert 'smei_events_total{tenant="test",event="search",cache="hit"} 2' in metrics
+    assert 'smei_event_seconds_bucket{tenant="test",event="search",cache="hit",le="0.025"} 1' in metrics
+    assert 'smei_event_seconds_bucket{tenant="test",event="search",cache="hit",le="+Inf"} 2' in metrics
+
+
+def test_api_events_go_to_their_own_log(tmp_path):
+    telemetry = new_telemetry('api_audit_log')
+    tenant = _tenant(tmp_path)
+    record_event(telemetry, tenant, 'api_search', 0.01)
+    telemetry['queue'].join()
+
+    assert (tmp_path / "api.jsonl").exists()
+    assert not (tmp_path / "audit.jsonl").exists()
+
+
+def test_unwritable_log_is_counted_and_the_writer_keeps_going(tmp_path):
+    telemetry = new_telemetry()
+    record_event(telemetry, _tenant(tmp_path, "missing/audit.jsonl"), 'search', 0.01)
+    record_event(telemetry, _tenant(tmp_path, "missing/audit.jsonl"), 'search', 0.01)
+    telemetry['queue'].join()
+
+    good = _tenant(tmp_path)
+    record_event(telemetry, good, 'search', 0.01)
+    telemetry['queue'].join()
+
+    assert telemetry['dropped'] == 2
+    assert 'smei_events_dropped_total 2' in render_metrics(telemetry)
+    assert len(open(good['audit_log'], encoding='utf-8').readlines()) == 1
+
+
+def test_full_queue_drops_events(tmp_path):
+    telemetry = new_telemetry(queue_size=1)
+    tenant = _tenant(tmp_path)
+    for _ in range(200):
+        record_event(telemetry, tenant, 'search', 0.01)
+    telemetry['queue'].join()
+
+    written = len(open(tenant['audit_log'], encoding='utf-8').readlines())
+    assert written + telemetry['dropped'] == 200
+    assert telemetry['events'][('test', 'search', 'none')]['count'] == 200
+
+
+def test_cache_counters_are_exported():
+    telemetry = new_telemetry()
+    cache = new_bounded_cache(max_entries=1)
+    register_cache(telemetry, 'test', 'app', cache)
+    for key in ('a', 'a', 'b'):
+        cached(cache, key, lambda: 1)
+
+    metrics = render_metrics(telemetry)
+    assert 'smei_cache_hits_total{tenant="test",cache="app"} 1' in metrics
+    assert 'smei_cache_misses_total{tenant="test",cache="app"} 2' in metrics
+    assert 'smei_cache_evictions_total{tenant="test",cache="app"} 1' in metrics
+    assert 'smei_cache_entries{tenant="test",cache="app"} 1' in metrics
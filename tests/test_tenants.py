@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from tenants import cache_info, cached, estimate_size, is_cached, new_bounded_cache
+
+
+def _fill(cache, *keys, size=8):
+    for key in keys:
+        cached(cache, key, lambda: np.zeros(size, dtype=np.uint8))
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    cache = new_bounded_cache(max_entries=3)
+    _fill(cache, 'a', 'b', 'c')
+    _fill(cache, 'a')
+    _fill(cache, 'd')
+
+    assert list(cache['entries']) == ['c', 'a', 'd']
+    assert not is_cached(cache, 'b')
+    assert cache_info(cache)['evictions'] == 1
+
+
+def test_memory_budget_evicts_until_it_fits():
+    cache = new_bounded_cache(max_entries=100, max_mb=1)
+    _fill(cache, 'a', 'b', size=400_000)
+    assert cache_info(cache)['entries'] == 2
+
+    _fill(cache, 'c', size=400_000)
+    assert list(cache['entries']) == ['b', 'c']
+    assert cache['bytes'] == 800_000 <= cache['max_bytes']
+
+    # One large value pushes out everything older to make room
+    _fill(cache, 'd', size=1_000_000)
+    assert list(cache['entries']) == ['d']
+    assert cache_info(cache)['evictions'] == 3
+
+
+def test_value_larger_than_the_budget_is_not_stored():
+    cache = new_bounded_cache(max_entries=10, max_mb=1)
+    _fill(cache, 'a')
+    value = cached(cache, 'huge', lambda: np.zeros(2_000_000, dtype=np.uint8))
+
+    assert len(value) == 2_000_000
+    assert not is_cached(cache, 'huge')
+    assert is_cached(cache, 'a')
+
+
+def test_hit_and_miss_counters():
+    cache = new_bounded_cache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return "value"
+
+    assert [cached(cache, 'k', compute) for _ in range(3)] == ["value"] * 3
+    assert len(calls) == 1
+
+    info = cache_info(cache)
+    assert (info['hits'], info['misses'], info['entries'], info['evictions']) == (2, 1, 1, 0)
+
+
+@pytest.mark.parametrize("value, expected", [
+    (np.zeros(1000, dtype=np.float64), 8000),
+    ((np.zeros(10, dtype=np.uint8), np.zeros(20, dtype=np.uint8)), 30)
+])
+def test_estimate_size_counts_array_memory(value, expected):
+    assert expected <= estimate_size(value) <= expected + 200
@@ -0,0 +1,81 @@
+import pandas as pd
+import pytest
+
+from tenants import _with_defaults
+from views import VIEW_ENV_VAR, get_view_frame, new_view_cache, project_view, select_view
+
+STUDENTS = pd.DataFrame({
+    'StudentID': ['S1', 'S2', 'S3'],
+    'Name': ['Ana Lima', 'Ben Cho', 'Cy Dee'],
+    'Course': ['EAP', 'General English', 'EAP'],
+    'Phone': ['0412 345 678', '0498 765 432', '0400 000 000']
+})
+
+VIEWS = {
+    'admin': {'role': 'admin'},
+    'eap': {'role': 'coordinator', 'courses': ['EAP']},
+    'class_a': {'role': 'teacher', 'students': ['S1', 'S2']}
+}
+
+
+def _tenant(**settings):
+    return _with_defaults('test', {'name': "Test College", 'workbook': "students.xlsx", **settings})
+
+
+@pytest.fixture(autouse=True)
+def no_pinned_view(monkeypatch):
+    monkeypatch.delenv(VIEW_ENV_VAR, raising=False)
+
+
+def test_low_privilege_roles_never_see_phone():
+    tenant = _tenant(views=VIEWS)
+
+    for name in ('eap', 'class_a'):
+        assert 'Phone' not in project_view(STUDENTS, tenant['views'][name]).columns
+    assert 'Phone' not in project_view(STUDENTS, _tenant()['views']['staff']).columns
+    assert 'Phone' in project_view(STUDENTS, tenant['views']['admin']).columns
+
+
+def test_views_restrict_courses_and_students():
+    tenant = _tenant(views=VIEWS)
+
+    assert project_view(STUDENTS, tenant['views']['eap'])['StudentID'].tolist() == ['S1', 'S3']
+    assert project_view(STUDENTS, tenant['views']['class_a'])['StudentID'].tolist() == ['S1', 'S2']
+
+
+def test_pages_open_in_the_least_privileged_view():
+    assert select_view(_tenant(views=VIEWS))['name'] == 'class_a'
+    assert select_view(_tenant())['name'] == 'staff'
+    assert select_view(_tenant(views=VIEWS, default_view='eap'))['name'] == 'eap'
+
+
+def test_url_view_is_ignored_by_default():
+    tenant = _tenant(views=VIEWS)
+
+    view = select_view(tenant, 'admin')
+    assert view['name'] == 'class_a'
+    assert 'Phone' not in project_view(STUDENTS, view).columns
+
+
+def test_url_view_when_the_college_allows_it():
+    tenant = _tenant(views=VIEWS, view_from_url=True)
+
+    assert select_view(tenant, 'admin')['name'] == 'admin'
+    with pytest.raises(ValueError, match="Unknown view"):
+        select_view(tenant, 'principal')
+
+
+def test_pinned_view_wins(monkeypatch):
+    monkeypatch.setenv(VIEW_ENV_VAR, 'eap')
+
+    assert select_view(_tenant(views=VIEWS), None)['name'] == 'eap'
+    assert select_view(_tenant(views=VIEWS, view_from_url=True), 'admin')['name'] == 'eap'
+
+
+def test_view_frame_is_projected_once_per_data_version():
+    cache = new_view_cache()
+    view = _tenant(views=VIEWS)['views']['eap']
+
+    first = get_view_frame(cache, view, STUDENTS, 'v1')
+    assert get_view_frame(cache, view, STUDENTS, 'v1') is first
+    assert get_view_frame(cache, view, STUDENTS, 'v2') is not first
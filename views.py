@@ -0,0 +1,68 @@
+import os
+import threading
+
+import numpy as np
+
+# Staff roles, least privileged first, and the columns each one never sees.
+# Which courses and students a view covers is set per tenant in tenants.json.
+ROLES = {
+    'teacher': {'label': "Teacher", 'hidden_columns': ['Phone']},
+    'coordinator': {'label': "Course Coordinator", 'hidden_columns': ['Phone']},
+    'admin': {'label': "Administrator", 'hidden_columns': []}
+}
+
+# Used when a tenant defines no views - staff see every student without phone numbers
+DEFAULT_VIEWS = {'staff': {'role': 'teacher', 'label': "Staff"}, 'admin': {'role': 'admin'}}
+
+# Pins the view for a whole deployment (e.g. an admin instance behind the college login).
+# Views are only chosen with ?view= in the URL when the tenant sets view_from_url.
+VIEW_ENV_VAR = "SMEI_VIEW"
+
+
+def least_privileged_view(views):
+    """Name of the view with the least privileged role (the first one listed among equals)"""
+    return min(views, key=lambda view_name: list(ROLES).index(views[view_name]['role']))
+
+
+def select_view(tenant, requested=None):
+    """Pick one of the tenant's views: the pinned one (SMEI_VIEW), otherwise the tenant's default view
+
+    A requested view (?view= in the URL) is only used when nothing is pinned
+    and the tenant sets view_from_url; otherwise it is ignored, so a URL can
+    never widen what a page shows.
+    """
+    pinned = os.environ.get(VIEW_ENV_VAR)
+    view_name = pinned or tenant['default_view']
+    if requested and not pinned and tenant['view_from_url']:
+        view_name = requested
+    if view_name not in tenant['views']:
+        raise ValueError(f"Unknown view '{view_name}'")
+    return tenant['views'][view_name]
+
+
+def project_view(df, view):
+    """Restrict the student frame to a view's courses and class list and drop the role's hidden columns"""
+    keep = np.ones(len(df), dtype=bool)
+    if view['courses']:
+        keep &= df['Course'].isin(view['courses']).to_numpy()
+    if view['students']:
+        keep &= df['StudentID'].isin(view['students']).to_numpy()
+
+    hidden = set(ROLES[view['role']]['hidden_columns'])
+    columns = [col for col in df.columns if col not in hidden]
+    return df.loc[keep, columns]
+
+
+def new_view_cache():
+    """Create an empty cache of projected view frames"""
+    return {'lock': threading.Lock(), 'entries': {}}
+
+
+def get_view_frame(cache, view, df, data_version):
+    """Get a view's projected frame, materialising it once per data version for every session using the view"""
+    with cache['lock']:
+        version, frame = cache['entries'].get(view['name'], (None, None))
+        if version != data_version:
+            frame = project_view(df, view)
+            cache['entries'][view['name']] = (data_version, frame)
+        return frame